@@ -0,0 +1,240 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Benchmark suite of the solvers.
+For every problem, solver and tolerance it measures the wall time of the integration (the best of some repetitions),
+the evaluations of f and of the Jacobian, the accepted and rejected steps and the error achieved at the final time,
+against the analytical solution or a reference one. The results are written as JSON, so the runs of two commits can be
+compared (comparar), and they give the work-precision diagrams (error against time and against nfev) with Picture.
+The problems are the ones of Exe_runge_kutta_1D, Exe_runge_kutta_2D and proves, and the standard Lorenz, Robertson
+(stiff) and Brusselator problems.
+
+Usage:
+python Benchmarks.py [-o results.json] [-p problem ...] [-s solver ...] [-t tol ...] [-r repetitions] [--plot]
+python Benchmarks.py --compare old.json new.json
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import timeit
+
+import numpy as np
+import Exe_runge_kutta_1D
+import Exe_runge_kutta_2D
+import proves
+from Runge_Kutta import RungeKutta_nd
+from Step_Control import Controlador, ControladorPI
+from Stiff import Rosenbrock_nd, RungeKutta_auto
+
+
+"""
+Right hand sides of the problems, f(t, y) of the state.
+"""
+def _f_1d(t, y): return np.array([Exe_runge_kutta_1D.f(t, y[0])])
+def _van_der_pol_4(t, y): return np.array([Exe_runge_kutta_2D.g(t, *y), Exe_runge_kutta_2D.f_1(t, *y)])
+def _van_der_pol_1(t, y): return np.array([Exe_runge_kutta_2D.g(t, *y), Exe_runge_kutta_2D.f_2(t, *y)])
+def _tiro_vertical(t, y): return np.array([y[1], -9.81])
+def _lorenz(t, y): return np.array([10. * (y[1] - y[0]), y[0] * (28. - y[2]) - y[1], y[0] * y[1] - 8. / 3. * y[2]])
+def _robertson(t, y):
+    return np.array([-0.04 * y[0] + 1e4 * y[1] * y[2],
+                     0.04 * y[0] - 1e4 * y[1] * y[2] - 3e7 * y[1] ** 2,
+                     3e7 * y[1] ** 2])
+def _brusselator(t, y): return np.array([1. + y[0] ** 2 * y[1] - 4. * y[0], 3. * y[0] - y[0] ** 2 * y[1]])
+
+
+def _referencia(problema):
+    """
+    Solution at tf with a much smaller tolerance than the benchmarked ones, for the problems without an analytical one.
+    """
+    rk = RungeKutta_nd(problema['t0'], problema['y0'], problema['tf'], None, 1e-14, f=problema['f'], tabla='DOP853')
+    return rk.integrar().y[-1]
+
+
+"""
+Problems: initial and final times, initial state, right hand side, solution at tf (a function that gives it) and the
+solvers that make sense for them (the stiff Robertson problem is not integrated with the explicit ones). The absolute
+tolerance is the relative one times atol (1 by default): the second component of Robertson is about 1e-5, so it needs
+a much smaller one.
+"""
+EXPLICITOS = ('RKF45', 'DOPRI5', 'BS32', 'DOP853', 'DOPRI5 PI')
+RIGIDOS = ('Rosenbrock', 'Auto')
+
+PROBLEMAS = {
+    '1D': {'f': _f_1d, 't0': 1., 'y0': [1.], 'tf': 10.,
+           'solucion': lambda: np.array([Exe_runge_kutta_1D.f_analytic(10.)]), 'solvers': EXPLICITOS},
+    'van der Pol mu=4': {'f': _van_der_pol_4, 't0': 0., 'y0': [2., 0.], 'tf': 50.,
+                         'solvers': EXPLICITOS + ('Auto',)},
+    'van der Pol mu=1': {'f': _van_der_pol_1, 't0': 0., 'y0': [0.01, 0.01], 'tf': 50.,
+                         'solvers': EXPLICITOS + ('Auto',)},
+    'vertical shot': {'f': _tiro_vertical, 't0': 0., 'y0': [0., 25.], 'tf': 5.,
+                      'solucion': lambda: np.array([proves.vert_shot_analytic(0., 25., 5.).posicion[1],
+                                                    25. - 9.81 * 5.]),
+                      'solvers': EXPLICITOS},
+    'Lorenz': {'f': _lorenz, 't0': 0., 'y0': [1., 1., 1.], 'tf': 10., 'solvers': EXPLICITOS},
+    #Reference solution at t = 40 from Radau IIA with rtol = 1e-13.
+    'Robertson': {'f': _robertson, 't0': 0., 'y0': [1., 0., 0.], 'tf': 40.,
+                  'solucion': lambda: np.array([7.1582706871940693e-01, 9.1855347645577914e-06,
+                                                2.8416374574583014e-01]),
+                  'atol': 1e-6, 'solvers': RIGIDOS},
+    'Brusselator': {'f': _brusselator, 't0': 0., 'y0': [1.5, 3.], 'tf': 20., 'solvers': EXPLICITOS + ('Auto',)},
+}
+
+
+"""
+Solvers: functions that build the integrator object of a problem for a tolerance.
+"""
+def _control(clase, problema, tol):
+    return clase(tol * problema.get('atol', 1.), tol)
+
+
+def _explicito(tabla, control=Controlador):
+    def construir(problema, tol):
+        return RungeKutta_nd(problema['t0'], problema['y0'], problema['tf'], None, tol, f=problema['f'], tabla=tabla,
+                             control=_control(control, problema, tol))
+    return construir
+
+
+def _implicito(clase):
+    def construir(problema, tol):
+        return clase(problema['t0'], problema['y0'], problema['tf'], None, tol, f=problema['f'],
+                     control=_control(Controlador, problema, tol))
+    return construir
+
+
+SOLVERS = {
+    'RKF45': _explicito('RKF45'),
+    'DOPRI5': _explicito('DOPRI5'),
+    'BS32': _explicito('BS32'),
+    'DOP853': _explicito('DOP853'),
+    'DOPRI5 PI': _explicito('DOPRI5', ControladorPI),
+    'Rosenbrock': _implicito(Rosenbrock_nd),
+    'Auto': _implicito(RungeKutta_auto),
+}
+
+TOLERANCIAS = (1e-4, 1e-6, 1e-8)
+
+
+
+def medir(problema, solver, tol, repeticiones=3):
+    """
+    Runs one benchmark and returns its result as a dictionary. The time is the best of repeticiones integrations
+    without statistics; the counters come from one more integration with them.
+    """
+    construir = SOLVERS[solver]
+    datos = PROBLEMAS[problema]
+    tiempo = min(timeit.repeat(lambda: construir(datos, tol).integrar(), number=1, repeat=repeticiones))
+    rec = construir(datos, tol).integrar(estadisticas=True)
+    stats = rec.estadisticas
+    return {'problem': problema, 'solver': solver, 'tol': tol, 'time': tiempo, 'nfev': stats.nfev, 'njev': stats.njev,
+            'accepted': stats.aceptados, 'rejected': stats.rechazados,
+            'error': float(np.max(np.abs(rec.y[-1] - solucion(problema))))}
+
+
+"""
+Solutions at tf, computed once.
+"""
+_soluciones = {}
+
+
+def solucion(problema):
+    if problema not in _soluciones:
+        datos = PROBLEMAS[problema]
+        _soluciones[problema] = datos['solucion']() if 'solucion' in datos else _referencia(datos)
+    return _soluciones[problema]
+
+
+def _version():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL,
+                                       universal_newlines=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def ejecutar(problemas=None, solvers=None, tolerancias=TOLERANCIAS, repeticiones=3, salida=sys.stdout):
+    """
+    Runs the benchmarks of the given problems and solvers (all of them by default) and returns the report: a
+    dictionary with the commit, the versions and the list of results. Every result is also written to salida.
+    """
+    resultados = []
+    for problema in problemas or sorted(PROBLEMAS):
+        for solver in PROBLEMAS[problema]['solvers']:
+            if solvers and solver not in solvers:
+                continue
+            for tol in tolerancias:
+                r = medir(problema, solver, tol, repeticiones)
+                resultados.append(r)
+                if salida is not None:
+                    salida.write('{problem:18} {solver:11} tol {tol:.0e}: {time:9.4f} s, nfev {nfev:7}, '
+                                 'rejected {rejected:5}, error {error:.2e}\n'.format(**r))
+    return {'commit': _version(), 'python': platform.python_version(), 'numpy': np.__version__,
+            'results': resultados}
+
+
+def _leer(nombre):
+    with open(nombre) as fichero:
+        return json.load(fichero)
+
+
+def comparar(antes, despues, salida=sys.stdout):
+    """
+    Compares two reports (dictionaries or names of JSON files) and writes, for every benchmark in both, the ratio of
+    the times and of the nfev (new / old). Returns the list of (problem, solver, tol, time ratio, nfev ratio).
+    """
+    antes, despues = [_leer(r) if isinstance(r, str) else r for r in (antes, despues)]
+    previos = {(r['problem'], r['solver'], r['tol']): r for r in antes['results']}
+    filas = []
+    for r in despues['results']:
+        p = previos.get((r['problem'], r['solver'], r['tol']))
+        if p is not None:
+            filas.append((r['problem'], r['solver'], r['tol'], r['time'] / p['time'], r['nfev'] / float(p['nfev'])))
+    if salida is not None:
+        salida.write('{} -> {}\n'.format(antes.get('commit'), despues.get('commit')))
+        for fila in filas:
+            salida.write('{:18} {:11} tol {:.0e}: time x{:.3f}, nfev x{:.3f}\n'.format(*fila))
+    return filas
+
+
+def graficar(informe):
+    """
+    Work-precision diagrams of a report, error against time and error against nfev, one figure per problem.
+    """
+    from Picture_1 import Picture
+
+    for problema in sorted(set(r['problem'] for r in informe['results'])):
+        for clave, nombre in (('time', 'time (s)'), ('nfev', 'nfev')):
+            items = []
+            for solver in SOLVERS:
+                rs = [r for r in informe['results'] if r['problem'] == problema and r['solver'] == solver]
+                if rs:
+                    items.append({'x': [r['error'] for r in rs], 'y': [r[clave] for r in rs], 'legend': solver,
+                                  'marker': 'o'})
+            Picture({'items': items, 'title': problema, 'xlabel': 'error', 'ylabel': nombre,
+                     'xscale': 'log', 'yscale': 'log'}).show_plot()
+
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmarks of the solvers.')
+    parser.add_argument('-o', '--output', help='JSON file for the results')
+    parser.add_argument('-p', '--problems', nargs='+', choices=sorted(PROBLEMAS))
+    parser.add_argument('-s', '--solvers', nargs='+', choices=sorted(SOLVERS))
+    parser.add_argument('-t', '--tol', nargs='+', type=float, default=TOLERANCIAS)
+    parser.add_argument('-r', '--repeat', type=int, default=3)
+    parser.add_argument('--plot', action='store_true', help='show the work-precision diagrams')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help='compare two JSON files')
+    args = parser.parse_args()
+
+    if args.compare:
+        comparar(*args.compare)
+    else:
+        informe = ejecutar(args.problems, args.solvers, args.tol, args.repeat)
+        if args.output:
+            with open(args.output, 'w') as fichero:
+                json.dump(informe, fichero, indent=1)
+        if args.plot:
+            graficar(informe)
@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Method Checkpoint and functions guardar and reanudar.
+They save the complete state of an integration (the solver, its step controller, the Recorder so far and the events
+found) in a NumPy .npz file, and restore it in a new solver object, so a long integration can be continued after a
+crash with exactly the same steps it would have made. Checkpoint is a hook for integrar that saves every some
+seconds of wall time or every some accepted steps. The file is written in a temporary file of the same directory and
+then renamed over the old one, so a crash while saving never leaves a broken checkpoint.
+Usage:
+rk.integrar(hooks=[Checkpoint('run.npz', intervalo=600)])
+and after a crash, with the solver built again with the same data and functions:
+rec = reanudar('run.npz', rk)
+rk.integrar(recorder=rec, hooks=[Checkpoint('run.npz', intervalo=600)])
+An in-memory Recorder is written whole into every checkpoint, so the cost of the checkpoints grows with the square of
+the length of the run. For long runs give integrar a MemmapRecorder: its steps are already on disk, and a checkpoint
+only saves its directory and number of steps.
+The dense output (rk.sol) is not saved. After reanudar, integrar(dense_output=True) builds it only for the steps
+after the checkpoint; the Recorder keeps the derivatives of all the steps, for Dense_Output.DenseOutput(t, y, dy).
+"""
+
+import os
+import tempfile
+import timeit
+
+import numpy as np
+from Memmap_Recorder import MemmapRecorder
+from Recorder import Recorder
+
+
+"""
+Attributes of the solvers that are saved when they exist (the last ones are the ones of Rosenbrock_nd and
+RungeKutta_auto).
+"""
+ATRIBUTOS = ('t', 'estado', 'tf', 'h', 'h_ultimo', 'k', 'etapa', 'aux', 'J', 'J_paso', 'rigido', 'contador')
+
+
+
+def _escribir(archivo, datos):
+    directorio = os.path.dirname(os.path.abspath(archivo))
+    descriptor, temporal = tempfile.mkstemp(dir=directorio, suffix='.tmp')
+    try:
+        with os.fdopen(descriptor, 'wb') as fichero:
+            np.savez(fichero, **datos)
+            fichero.flush()
+            os.fsync(fichero.fileno())
+        os.replace(temporal, archivo)
+    except BaseException:
+        os.remove(temporal)
+        raise
+
+
+def guardar(rk, archivo):
+    """
+    Saves the state of the solver rk, of its controller, its Recorder and the events found in archivo. The steps of
+    an in-memory Recorder are all written again every time; a MemmapRecorder is only flushed.
+    """
+    datos = {}
+    for nombre in ATRIBUTOS:
+        valor = getattr(rk, nombre, None)
+        if valor is not None:
+            datos['rk_' + nombre] = np.asarray(valor)
+    if hasattr(rk, 'cambios'):
+        datos['rk_cambios'] = np.asarray(rk.cambios, dtype=float)
+    for nombre, valor in vars(rk.control).items():
+        if isinstance(valor, (int, float, np.number, np.ndarray)):
+            datos['control_' + nombre] = np.asarray(valor)
+
+    rec = getattr(rk, 'recorder', None)
+    if isinstance(rec, MemmapRecorder):
+        #The steps are already in their files: only where they are and how many belong to this checkpoint.
+        rec.flush()
+        datos['rec_directorio'] = np.array(os.path.abspath(rec.directorio))
+        datos['rec_cuenta'] = np.array(len(rec))
+        datos['rec_capacidad'] = np.array(len(rec._t))
+        datos['rec_derivadas'] = np.array(rec.derivadas)
+    elif rec is not None:
+        datos['rec_t'], datos['rec_y'], datos['rec_h'] = rec.t, rec.y, rec.h
+        if rec.dy is not None:
+            datos['rec_dy'] = rec.dy
+    encontrados = getattr(rk, 'encontrados', [])
+    datos['eventos_t'] = np.array([t for t, i, y in encontrados], dtype=float)
+    datos['eventos_i'] = np.array([i for t, i, y in encontrados], dtype=int)
+    datos['eventos_y'] = np.array([y for t, i, y in encontrados], dtype=float).reshape(-1, rk.estado.size)
+    _escribir(archivo, datos)
+
+
+def _valor(array):
+    return array.item() if array.ndim == 0 else array
+
+
+def reanudar(archivo, rk):
+    """
+    Restores in rk, a solver built with the same class, data and functions as the saved one, the state saved in
+    archivo. Returns the Recorder, to be given to rk.integrar(recorder=...), or None if it was not saved. A
+    MemmapRecorder is opened again on its files, which are cut to the steps it had when the checkpoint was saved.
+    rk.sol is not restored.
+    """
+    with np.load(archivo) as datos:
+        for clave in datos.files:
+            if clave.startswith('rk_'):
+                setattr(rk, clave[3:], _valor(datos[clave]))
+            elif clave.startswith('control_'):
+                setattr(rk.control, clave[8:], _valor(datos[clave]))
+        if 'rk_cambios' in datos.files:
+            rk.cambios = list(datos['rk_cambios'])
+        rk.encontrados = [(t, i, y) for t, i, y in zip(datos['eventos_t'], datos['eventos_i'], datos['eventos_y'])]
+
+        if 'rec_directorio' in datos.files:
+            rec = MemmapRecorder(str(datos['rec_directorio']), rk.estado.size, int(datos['rec_capacidad']),
+                                 bool(datos['rec_derivadas']), cuenta=int(datos['rec_cuenta']))
+            rk.recorder = rec
+            return rec
+        if 'rec_t' not in datos.files:
+            return None
+        dy = datos['rec_dy'] if 'rec_dy' in datos.files else None
+        rec = Recorder(rk.estado.size, capacidad=max(1, len(datos['rec_t'])), derivadas=dy is not None)
+        rec.extend(datos['rec_t'], datos['rec_y'], datos['rec_h'], dy)
+    rk.recorder = rec
+    return rec
+
+
+
+class Checkpoint(object):
+    """
+    Builder of Checkpoint class, a hook for integrar:
+    archivo: Name of the checkpoint file (.npz).
+    intervalo: Seconds of wall time between checkpoints, or None.
+    pasos: Accepted steps between checkpoints, or None.
+    A checkpoint is saved when any of them is reached. self.guardados counts the checkpoints saved.
+    """
+    def __init__(self, archivo, intervalo=None, pasos=None):
+        self.archivo = archivo
+        self.intervalo = intervalo
+        self.pasos = pasos
+        self.contador = 0
+        self.guardados = 0
+        self.ultimo = timeit.default_timer()
+
+    def __call__(self, rk):
+        self.contador += 1
+        ahora = timeit.default_timer()
+        if ((self.pasos is not None and self.contador >= self.pasos) or
+                (self.intervalo is not None and ahora - self.ultimo >= self.intervalo)):
+            guardar(rk, self.archivo)
+            self.contador = 0
+            self.ultimo = ahora
+            self.guardados += 1
@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Function estudio.
+It runs a convergence study of a solver: the solver is run for a ladder of values of its parameter (a fixed step dt
+or a tolerance), in parallel, and the global error of every run is measured against an analytical solution, evaluated
+at once over all the times of the run. Then the observed order is computed between consecutive runs, with respect to
+the parameter (error ~ dt^p for a fixed step method) and with respect to the number of steps (error ~ N^-p, which also
+works for the adaptive methods). The results are given as a table.
+A solver is a function solver(parametro) that returns the solution as a Recorder, a PosicionTiempo of proves or a
+tuple (t, y). To run in parallel it must be picklable: a function defined at module level, functools.partial of it, or
+the objects PasoFijo and Adaptativo below.
+"""
+
+import multiprocessing
+import sys
+
+import numpy as np
+from Runge_Kutta import RungeKutta_nd
+
+
+
+def escalera(inicial, factor=0.5, niveles=6):
+    """
+    Geometric ladder of niveles values: inicial, inicial * factor, inicial * factor^2...
+    """
+    return inicial * factor ** np.arange(niveles)
+
+
+def _serie(resultado):
+    """
+    Times and values of a solution: (t, y) with y of shape (len(t), n).
+    """
+    if hasattr(resultado, 'tiempo'):
+        t, y = resultado.tiempo, resultado.posicion
+    elif hasattr(resultado, 't'):
+        t, y = resultado.t, resultado.y
+    else:
+        t, y = resultado
+    t = np.asarray(t, dtype=float)
+    return t, np.asarray(y, dtype=float).reshape(t.size, -1)
+
+
+def _ejecutar(argumentos):
+    solver, parametro = argumentos
+    return _serie(solver(parametro))
+
+
+def estudio(solver, referencia, parametros, procesos=None, componentes=None):
+    """
+    Runs solver for every value of parametros (in a pool of procesos processes, all the cores by default; with
+    procesos=1 they run one after the other in this process) and returns a list with one dictionary per run:
+    'parametro', 'pasos' (number of steps, len(t) - 1), 'error' (largest absolute error over all the times and
+    components) and 'orden_parametro' and 'orden_pasos' (the observed orders with respect to the previous run, NaN for
+    the first one).
+    referencia: Function referencia(t) of an array of times that returns the exact values, with shape (len(t),) or
+    (len(t), n).
+    componentes: Indices of the components of the solution that are compared with referencia, all by default.
+    """
+    parametros = list(parametros)
+    tareas = [(solver, parametro) for parametro in parametros]
+    if procesos == 1:
+        series = [_ejecutar(tarea) for tarea in tareas]
+    else:
+        pool = multiprocessing.Pool(procesos)
+        try:
+            series = pool.map(_ejecutar, tareas)
+        finally:
+            pool.close()
+            pool.join()
+
+    filas = []
+    for parametro, (t, y) in zip(parametros, series):
+        if componentes is not None:
+            y = y[:, componentes]
+        exacta = np.asarray(referencia(t), dtype=float).reshape(t.size, -1)
+        fila = {'parametro': parametro, 'pasos': t.size - 1, 'error': float(np.max(np.abs(y - exacta))),
+                'orden_parametro': np.nan, 'orden_pasos': np.nan}
+        if filas:
+            previa = filas[-1]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                cociente = np.log(previa['error'] / fila['error'])
+                fila['orden_parametro'] = float(cociente / np.log(previa['parametro'] / parametro))
+                fila['orden_pasos'] = float(cociente / np.log(float(fila['pasos']) / previa['pasos']))
+        filas.append(fila)
+    return filas
+
+
+def tabla(filas, titulo='', salida=sys.stdout):
+    """
+    Writes the results of estudio as a table.
+    """
+    if titulo:
+        salida.write(titulo + '\n')
+    salida.write('{:>12} {:>9} {:>12} {:>10} {:>10}\n'.format('parameter', 'steps', 'error', 'order', 'order(N)'))
+    for fila in filas:
+        salida.write('{parametro:12.4e} {pasos:9d} {error:12.4e} {orden_parametro:10.3f} {orden_pasos:10.3f}\n'.format(
+            **fila))
+
+
+
+class PasoFijo(object):
+    """
+    Solver of y' = f(t, y) with a fixed step dt (the parameter) and a tableau of RungeKutta_nd. If dt does not
+    divide tf - t the last step is shorter, so dt should divide it for a clean order.
+    """
+    def __init__(self, f, t, y, tf, tabla='RKF45'):
+        self.f, self.t, self.y, self.tf, self.tabla = f, t, y, tf, tabla
+
+    def __call__(self, dt):
+        return RungeKutta_nd(self.t, self.y, self.tf, dt, 1., f=self.f, tabla=self.tabla).integrar(adaptativo=False)
+
+
+class Adaptativo(object):
+    """
+    Solver of y' = f(t, y) with the adaptive RungeKutta_nd for a tolerance (the parameter), used as absolute and
+    relative tolerance.
+    """
+    def __init__(self, f, t, y, tf, tabla='RKF45'):
+        self.f, self.t, self.y, self.tf, self.tabla = f, t, y, tf, tabla
+
+    def __call__(self, tol):
+        return RungeKutta_nd(self.t, self.y, self.tf, None, tol, f=self.f, tabla=self.tabla).integrar()
+
+
+
+"""
+Functions of the example below, defined at module level so that the worker processes can unpickle them.
+"""
+def _tiro(t): return 25. * t - 0.5 * 9.81 * t ** 2
+def _escalar(f, t, y): return np.array([f(t, y[0])])
+
+
+
+if __name__ == '__main__':
+    """
+    The schemes of proves for the vertical shot, and the problem of Exe_runge_kutta_1D with the fixed step and the
+    adaptive Runge Kutta methods.
+    """
+    import functools
+    import proves
+    from Exe_runge_kutta_1D import f, f_analytic
+
+    f_1d = functools.partial(_escalar, f)
+
+    for nombre, esquema in (('BT', proves.vert_shot), ('FT', proves.vert_shot_ft), ('CT', proves.vert_shot_ct)):
+        tabla(estudio(functools.partial(esquema, 0., 25.), _tiro, escalera(0.5, 0.5, 8)),
+              'Vertical shot, {}'.format(nombre))
+    for nombre in ('RKF45', 'DOPRI5', 'BS32'):
+        tabla(estudio(PasoFijo(f_1d, 1., [1.], 10., nombre), f_analytic, 9. / 2 ** np.arange(5, 10)),
+              '1D, {} with a fixed step'.format(nombre))
+    for nombre in ('RKF45', 'DOP853'):
+        tabla(estudio(Adaptativo(f_1d, 1., [1.], 10., nombre), f_analytic, escalera(1e-3, 0.1, 6)),
+              '1D, adaptive {}'.format(nombre))
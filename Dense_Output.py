@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Method DenseOutput and functions evaluar, hermite and hermite_coeficientes.
+They give the solution of an integration at any time inside the integrated interval, not only at the step points.
+Inside every step the solution is a polynomial in s = (t - t0) / h, the fraction of the step:
+y(t0 + s h) = y0 + Q[0] s + Q[1] s^2 + ... + Q[q - 1] s^q
+The coefficients Q of a step are given by the solver (RungeKutta_nd.interpolante): the continuous extension of its
+tableau, built from the stages of the step, which is as accurate as the steps themselves, or else the cubic Hermite
+polynomial that matches the state and its derivative at both ends of the step (the derivatives are the first stage of
+every step, so it does not need new evaluations of f, but its error is O(h^4) whatever the order of the method).
+"""
+
+import numpy as np
+
+
+
+def evaluar(t0, h, y0, Q, t):
+    """
+    Evaluates the polynomials of the steps that start at t0, of length h, at t. t is an array of length k, t0 and h
+    numbers or arrays of length k, y0 an array (n,) or (k, n) and Q an array (q, n) or (k, q, n) with the
+    coefficients. Returns an array (k, n).
+    """
+    s = np.reshape((t - t0) / h, (-1, 1))
+    Q = np.asarray(Q)
+    y = np.zeros(np.broadcast(s, Q[..., -1, :]).shape)
+    for j in range(Q.shape[-2] - 1, -1, -1):  #Horner.
+        y = (y + Q[..., j, :]) * s
+    return y + y0
+
+
+def hermite_coeficientes(h, y0, y1, f0, f1):
+    """
+    Coefficients Q (3, n), for evaluar, of the cubic Hermite polynomial of a step of length h from y0 to y1 with the
+    derivatives f0 and f1 at its ends.
+    """
+    dy = y1 - y0
+    return np.array([h * f0, 3. * dy - h * (2. * f0 + f1), h * (f0 + f1) - 2. * dy])
+
+
+def hermite(t0, t1, y0, y1, f0, f1, t):
+    """
+    Evaluates the cubic Hermite interpolants of the steps [t0, t1] at t. t is an array of length k, t0 and t1
+    numbers or arrays of length k and y0, y1, f0, f1 arrays of shape (n,) or (k, n) with the states and derivatives
+    at both ends. Returns an array (k, n).
+    """
+    h = np.reshape(t1 - t0, (-1, 1))
+    s = np.reshape(t - t0, (-1, 1)) / h
+    s2 = s * s
+    return ((1. + 2. * s) * (1. - s) ** 2 * y0 + s * (1. - s) ** 2 * h * f0 +
+            s2 * (3. - 2. * s) * y1 + s2 * (s - 1.) * h * f1)
+
+
+
+class DenseOutput(object):
+    """
+    Builder of DenseOutput class:
+    t: Times of the steps, increasing, an array (k + 1,).
+    y: States at the steps, array (k + 1, n).
+    dy: Derivatives of the states at the steps, array (k + 1, n), for the cubic Hermite polynomials. Not needed if
+    coeficientes is given.
+    coeficientes: Coefficients of the polynomial of every step, array (k, q, n), or None.
+    h: Lengths of the steps of the polynomials, t[1:] - t[:-1] by default. They differ only in a step cut by a
+    terminal event, whose polynomial is the one of the whole step.
+    The object is called with an array of times and returns the interpolated states, one row per time.
+    """
+    def __init__(self, t, y, dy=None, coeficientes=None, h=None):
+        self.t = np.asarray(t, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+        self.dy = dy
+        self.h = np.diff(self.t) if h is None else np.asarray(h, dtype=float)
+        if coeficientes is None:
+            coeficientes = hermite_coeficientes(self.h[:, None], self.y[:-1], self.y[1:], dy[:-1], dy[1:])
+            coeficientes = np.swapaxes(coeficientes, 0, 1)
+        self.coeficientes = coeficientes
+
+    def __call__(self, t):
+        """
+        Evaluates the solution on the whole array t in one vectorized pass. Times out of [t[0], t[-1]] take the
+        polynomial of the first or last step.
+        """
+        t = np.atleast_1d(np.asarray(t, dtype=float))
+        i = np.clip(np.searchsorted(self.t, t, side='right') - 1, 0, len(self.t) - 2)
+        return evaluar(self.t[i], self.h[i], self.y[i], self.coeficientes[i], t)
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Method Event and functions brent and buscar_eventos.
+An event is a function g(t, y) of the time and the state whose zeros we want to find during an integration, for
+instance the position when a body reaches the ground. The integrator checks the sign of every g at the end of each
+accepted step and, when it changes, the zero is located inside the step on the interpolant of the step, so it is
+found to machine precision whatever the size of the step.
+"""
+
+import numpy as np
+
+EPS = np.finfo(float).eps
+
+
+
+class Event(object):
+    """
+    Builder of Event class:
+    funcion: Function g(t, y) that returns a number. The event happens when it crosses zero.
+    terminal: If True, the integration stops at the first zero of the event.
+    direction: 0 to find all the zeros, 1 only the ones where g goes from negative to positive and -1 only the ones
+    where g goes from positive to negative.
+    """
+    def __init__(self, funcion, terminal=False, direction=0):
+        self.funcion = funcion
+        self.terminal = terminal
+        self.direction = direction
+
+    def __call__(self, t, y):
+        return self.funcion(t, y)
+
+    def cruza(self, g0, g1):
+        """
+        Tells if going from g0 to g1 is a zero of the event in the wanted direction. A step that starts exactly at a
+        zero does not count, it was already reported by the previous step.
+        """
+        if g0 == 0. or g0 * g1 > 0.:
+            return False
+        return self.direction == 0 or self.direction * (g1 - g0) > 0.
+
+
+
+def brent(fun, a, b, fa, fb):
+    """
+    Brent's method for the zero of fun in [a, b], with fa and fb of different signs. It combines bisection, the
+    secant and inverse quadratic interpolation, and stops when the bracket is as small as the floating point numbers
+    allow.
+    """
+    pre, fpre, cur, fcur = a, fa, b, fb
+    blk, fblk, spre, scur = a, fa, 0., 0.
+    escala = EPS * abs(b - a)  #Absolute part of the tolerance, for zeros near t = 0.
+    while True:
+        if fpre != 0. and fcur != 0. and (fpre < 0.) != (fcur < 0.):
+            blk, fblk = pre, fpre
+            spre = scur = cur - pre
+        if abs(fblk) < abs(fcur):
+            pre, cur, blk = cur, blk, cur
+            fpre, fcur, fblk = fcur, fblk, fcur
+        delta = 2. * EPS * abs(cur) + escala
+        sbis = 0.5 * (blk - cur)
+        if fcur == 0. or abs(sbis) <= delta:
+            return cur
+        if abs(spre) > delta and abs(fcur) < abs(fpre):
+            if pre == blk or fblk == fpre:
+                stry = -fcur * (cur - pre) / (fcur - fpre)
+            else:
+                dpre = (fpre - fcur) / (pre - cur)
+                dblk = (fblk - fcur) / (blk - cur)
+                stry = -fcur * (fblk * dblk - fpre * dpre) / (dblk * dpre * (fblk - fpre)) if dblk * dpre else sbis
+            if 2. * abs(stry) < min(abs(spre), 3. * abs(sbis) - delta):
+                spre, scur = scur, stry
+            else:
+                spre = scur = sbis
+        else:
+            spre = scur = sbis
+        pre, fpre = cur, fcur
+        cur += scur if abs(scur) > delta else (delta if sbis > 0. else -delta)
+        fcur = fun(cur)
+
+
+
+def buscar_eventos(eventos, valores, t0, t1, valores_nuevos, interpolante):
+    """
+    Looks for the zeros of the events inside the step [t0, t1]. valores and valores_nuevos are the values of the
+    events at t0 and t1 and interpolante(t) gives the state inside the step. Returns a list of tuples
+    (t, index of the event, state) ordered by time, ending at the first terminal event if there is one.
+    """
+    encontrados = []
+    for i, evento in enumerate(eventos):
+        if evento.cruza(valores[i], valores_nuevos[i]):
+            fun = lambda t: evento(t, interpolante(t))
+            t = brent(fun, t0, t1, valores[i], valores_nuevos[i])
+            encontrados.append((t, i, interpolante(t)))
+    encontrados.sort(key=lambda e: e[0])
+    for j, (t, i, y) in enumerate(encontrados):
+        if eventos[i].terminal:
+            return encontrados[:j + 1]
+    return encontrados
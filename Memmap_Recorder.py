@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Method MemmapRecorder and function abrir.
+MemmapRecorder works as Recorder, but it keeps in memory only a chunk of capacidad steps: when the chunk is full it
+is appended to the files of a directory, one raw float64 file per quantity (t.bin, y.bin, h.bin and dy.bin), and
+meta.json is updated with the number of steps written. So the length of an integration is limited by the disk, not
+by the memory. It is given to integrar as its recorder, which flushes it at the end:
+rec = rk.integrar(recorder=MemmapRecorder('run', rk.estado.size))
+The data files are synced to the disk before meta.json is replaced, and meta.json is replaced atomically, so after a
+crash meta.json never counts steps that are not in the files.
+abrir reads a trajectory, finished or still being written, as NumPy memory maps: nothing is read until it is used,
+and only the pages that are used are read, so Picture and NumPy work on trajectories larger than the memory.
+"""
+
+import json
+import os
+import tempfile
+
+import numpy as np
+from Recorder import Recorder
+
+VERSION = 1
+
+
+
+def _columnas(derivadas):
+    return ('t', 'y', 'h', 'dy') if derivadas else ('t', 'y', 'h')
+
+
+def _mapa(directorio, columna, cuenta, n):
+    """
+    Read only memory map of the first cuenta steps of a column.
+    """
+    forma = (cuenta,) if columna in ('t', 'h') else (cuenta, n)
+    if cuenta == 0:
+        return np.empty(forma)
+    return np.memmap(os.path.join(directorio, columna + '.bin'), dtype=np.float64, mode='r', shape=forma)
+
+
+
+class MemmapRecorder(Recorder):
+    """
+    Builder of MemmapRecorder class:
+    directorio: Directory of the files. It is created if it does not exist.
+    n: Number of components of the state.
+    capacidad: Number of steps of a chunk, the ones kept in memory.
+    derivadas: If True, the derivative of the state at every step is also stored (needed for dense output).
+    cuenta: None to start a new trajectory (the old files are overwritten), or the number of steps of the existing
+    trajectory to keep and continue (the later ones are discarded), as Checkpoint.reanudar does.
+    """
+    def __init__(self, directorio, n, capacidad=4096, derivadas=False, cuenta=None):
+        super(MemmapRecorder, self).__init__(n, capacidad, derivadas)
+        self.directorio = directorio
+        self.derivadas = derivadas
+        self.escritos = cuenta or 0
+        if not os.path.isdir(directorio):
+            os.makedirs(directorio)
+        self._ficheros = {}
+        for columna in _columnas(derivadas):
+            ruta = os.path.join(directorio, columna + '.bin')
+            if cuenta is None:
+                fichero = open(ruta, 'wb')
+            else:
+                fichero = open(ruta, 'r+b')
+                fichero.truncate(cuenta * self._ancho(columna) * 8)
+                fichero.seek(0, os.SEEK_END)
+            self._ficheros[columna] = fichero
+        self._escribir_meta()
+
+    def _ancho(self, columna):
+        return 1 if columna in ('t', 'h') else self.n
+
+    def _escribir_meta(self):
+        meta = {'version': VERSION, 'n': self.n, 'derivadas': self.derivadas, 'dtype': 'float64',
+                'columnas': list(_columnas(self.derivadas)), 'cuenta': self.escritos}
+        descriptor, temporal = tempfile.mkstemp(dir=self.directorio, suffix='.tmp')
+        with os.fdopen(descriptor, 'w') as fichero:
+            json.dump(meta, fichero)
+            fichero.flush()
+            os.fsync(fichero.fileno())
+        os.replace(temporal, os.path.join(self.directorio, 'meta.json'))
+
+    def _volcar(self, bloques, k):
+        for columna, bloque in zip(_columnas(self.derivadas), bloques):
+            fichero = self._ficheros[columna]
+            fichero.write(np.ascontiguousarray(bloque, dtype=np.float64).tobytes())
+            fichero.flush()
+            os.fsync(fichero.fileno())
+        self.escritos += k
+        self._escribir_meta()
+
+    def flush(self):
+        """
+        Appends the steps kept in memory to the files and updates meta.json.
+        """
+        if self.size:
+            bloques = [self._t, self._y, self._h, self._dy][:len(self._ficheros)]
+            self._volcar([b[:self.size] for b in bloques], self.size)
+            self.size = 0
+
+    def _ampliar(self, minimo=0):
+        #The chunk is full: it goes to the files instead of growing.
+        self.flush()
+
+    def extend(self, t, y, h, dy=None):
+        """
+        Stores a block of steps. A block larger than a chunk goes straight to the files.
+        """
+        if len(t) <= len(self._t):
+            return super(MemmapRecorder, self).extend(t, y, h, dy)
+        self.flush()
+        bloques = [np.asarray(t), np.asarray(y).reshape(len(t), self.n), np.asarray(h)]
+        if self.derivadas:
+            bloques.append(np.asarray(dy).reshape(len(t), self.n))
+        self._volcar(bloques, len(t))
+
+    def __len__(self):
+        return self.escritos + self.size
+
+    def cerrar(self):
+        self.flush()
+        for fichero in self._ficheros.values():
+            fichero.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.cerrar()
+
+    """
+    Memory maps of the steps already written to the files. Reading them writes nothing: the steps still in memory
+    (len(self) counts them too) are not in the maps until flush is called, as integrar does when it ends.
+    """
+    @property
+    def t(self):
+        return _mapa(self.directorio, 't', self.escritos, self.n)
+
+    @property
+    def y(self):
+        return _mapa(self.directorio, 'y', self.escritos, self.n)
+
+    @property
+    def h(self):
+        return _mapa(self.directorio, 'h', self.escritos, self.n)
+
+    @property
+    def dy(self):
+        if not self.derivadas:
+            return None
+        return _mapa(self.directorio, 'dy', self.escritos, self.n)
+
+
+
+class Trajectory(object):
+    """
+    Trajectory read by abrir. t, y, h and dy (None if it was not stored) are read only memory maps, and meta the
+    contents of meta.json.
+    """
+    def __init__(self, directorio):
+        self.directorio = directorio
+        with open(os.path.join(directorio, 'meta.json')) as fichero:
+            self.meta = json.load(fichero)
+        cuenta, n = self.meta['cuenta'], self.meta['n']
+        self.n = n
+        self.t = _mapa(directorio, 't', cuenta, n)
+        self.y = _mapa(directorio, 'y', cuenta, n)
+        self.h = _mapa(directorio, 'h', cuenta, n)
+        self.dy = _mapa(directorio, 'dy', cuenta, n) if self.meta['derivadas'] else None
+
+    def __len__(self):
+        return len(self.t)
+
+
+def abrir(directorio):
+    """
+    Opens the trajectory of a directory written by MemmapRecorder, with the steps written until now.
+    """
+    return Trajectory(directorio)
@@ -0,0 +1,279 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Methods NystromTableau and RungeKutta_nystrom.
+Runge Kutta Nystrom methods for second order systems x'' = f(t, x, x'), as the van der Pol problem of
+Exe_runge_kutta_2D. RungeKutta_2d writes them as a first order system, with g(t, x, v) = v, so every stage calls g only
+to get back its own velocity and builds the argument of the position from the velocities of the previous stages.
+Here the acceleration f is given directly and position and velocity advance together: every stage costs one call of f
+and no call of g. The position of a stage is x + c h v + h^2 sum(Abar * K), from the accelerations K of the previous
+stages, and the velocity v + h sum(A * K).
+Any tableau of Tableaus gives a Nystrom method with Abar = A A (RungeKutta_nystrom(..., tabla='DOPRI5')), valid for
+any f(t, x, v). It takes the same steps as RungeKutta_2d with its embedded error estimate, with the same number of
+calls of f: it only saves the calls of g.
+When the acceleration does not depend on the velocity, x'' = f(t, x), as in the pendulum or the Kepler problem, a
+method of order p needs less stages than a Runge Kutta method of order p (especial methods):
+RKN43 is the embedded pair 4(3) of Dormand and Prince (RKN4(3)4FM), adaptive, with 4 stages of which the last one is
+f at the new point (FSAL), so it costs 3 evaluations of f per step, while DOPRI5 costs 6 and RKF45 6.
+RKN4 is the 3 stages Nystrom method of order 4. It has no error estimate, so it runs with a fixed step:
+integrar(adaptativo=False).
+They are an explicit choice: with them f is given as f(t, x), without the velocity, so a force that depends on it
+cannot be integrated by them by mistake. The default tableau is RKF45, whose Nystrom method is valid for any
+f(t, x, v).
+"""
+
+import numpy as np
+import Tableaus
+from Runge_Kutta import RungeKutta_nd
+
+
+
+class NystromTableau(Tableaus.ButcherTableau):
+    """
+    Builder of NystromTableau class. The data are the ones of ButcherTableau, for the velocities, and:
+    Abar: Array (s, s), Abar[i, :i] are the weights of the accelerations of the previous stages in the position of
+    stage i.
+    Bbar: Weights of the accelerations in the new position.
+    Ebar, E3bar: Weights of the error estimates of the position.
+    E: None if the method has no error estimate (it can only run with a fixed step).
+    especial: True if the method is only valid for an acceleration independent of the velocity. Its f is f(t, x) and
+    the velocities of its stages, given by A, are not used.
+    derivada: True if Abar = A A, Bbar = B A and Ebar = E A (the Nystrom method of a Runge Kutta tableau, built by
+    nystrom). Then the positions of the stages are also x + h sum(A * V) with the velocities V of the stages, which
+    costs less.
+    """
+    def __init__(self, nombre, A, Abar, B, Bbar, C, E, Ebar, orden, orden_error, E3=None, E3bar=None,
+                 especial=False, derivada=False):
+        self.adaptativo = E is not None
+        if E is None:
+            E = Ebar = np.zeros(len(C))
+        super(NystromTableau, self).__init__(nombre, A, B, C, E, orden, orden_error, E3)
+        self.Abar = np.array(Abar, dtype=float)
+        self.Bbar = np.array(Bbar, dtype=float)
+        self.Ebar = np.array(Ebar, dtype=float)
+        self.E3bar = None if E3bar is None else np.array(E3bar, dtype=float)
+        self.especial = especial
+        self.derivada = derivada
+        self.pesos = np.stack((self.Abar, self.A), axis=1)  #pesos[i] = (Abar[i], A[i]).
+        if not derivada:
+            #FSAL if the last stage is at the new position. The velocity of f is the new one only if A[-1] = B, which
+            #does not matter for an especial method, whose f has no velocity.
+            self.fsal = (self.C[-1] == 1. and np.array_equal(self.Abar[-1], self.Bbar) and
+                         (especial or np.array_equal(self.A[-1], self.B)))
+
+    def _norma(self, pesos, k, h, escala, out):
+        """
+        The stages k hold the velocity and the acceleration of every stage, (s, 2n); the error of the position comes
+        from the accelerations.
+        """
+        if self.derivada:
+            return super(NystromTableau, self)._norma(pesos, k, h, escala, out)
+        barra = self.Ebar if pesos is self.E else self.E3bar
+        aceleraciones = k[:, k.shape[1] // 2:]
+        err = np.concatenate((h * h * np.dot(barra, aceleraciones), h * np.dot(pesos, aceleraciones)))
+        return np.max(np.abs(err) / escala)
+
+
+def nystrom(tabla):
+    """
+    Nystrom method of the Runge Kutta tableau tabla (a ButcherTableau or the name of a registered one): the same
+    steps as tabla applied to x' = v, v' = f(t, x, v).
+    """
+    tabla = Tableaus.obtener(tabla)
+    E3bar = None if tabla.E3 is None else np.dot(tabla.E3, tabla.A)
+    nystrom = NystromTableau(tabla.nombre, tabla.A, np.dot(tabla.A, tabla.A), tabla.B, np.dot(tabla.B, tabla.A),
+                             tabla.C, tabla.E, np.dot(tabla.E, tabla.A), tabla.orden, tabla.orden_error, tabla.E3,
+                             E3bar, derivada=True)
+    #Its stages are the ones of tabla on the first order system, so it has the same continuous extension.
+    nystrom.P, nystrom.A_extra, nystrom.C_extra = tabla.P, tabla.A_extra, tabla.C_extra
+    return nystrom
+
+
+"""
+Nystrom method of order 4 with 3 stages, for x'' = f(t, x). The weights A of the velocities of the stages are not
+used.
+"""
+RKN4 = NystromTableau(
+    'RKN4',
+    A=[[0., 0., 0.],
+       [1. / 2., 0., 0.],
+       [0., 1., 0.]],
+    Abar=[[0., 0., 0.],
+          [1. / 8., 0., 0.],
+          [0., 1. / 2., 0.]],
+    B=[1. / 6., 2. / 3., 1. / 6.],
+    Bbar=[1. / 6., 1. / 3., 0.],
+    C=[0., 1. / 2., 1.],
+    E=None, Ebar=None, orden=4, orden_error=None, especial=True)
+
+"""
+Embedded pair RKN4(3)4FM of Dormand and Prince, for x'' = f(t, x): order 4 with an error estimate of order 3. The
+last stage is at the new position (FSAL). The velocities of the stages are the ones of the Euler method, v + c h K0.
+"""
+RKN43 = NystromTableau(
+    'RKN43',
+    A=[[0., 0., 0., 0.],
+       [1. / 4., 0., 0., 0.],
+       [7. / 10., 0., 0., 0.],
+       [1., 0., 0., 0.]],
+    Abar=[[0., 0., 0., 0.],
+          [1. / 32., 0., 0., 0.],
+          [7. / 1000., 119. / 500., 0., 0.],
+          [1. / 14., 8. / 27., 25. / 189., 0.]],
+    B=[1. / 14., 32. / 81., 250. / 567., 5. / 54.],
+    Bbar=[1. / 14., 8. / 27., 25. / 189., 0.],
+    C=[0., 1. / 4., 7. / 10., 1.],
+    E=[1. / 14. - 13. / 21., 32. / 81. + 20. / 27., 250. / 567. - 275. / 189., 5. / 54. + 1. / 3.],
+    Ebar=[1. / 14. + 7. / 150., 8. / 27. - 67. / 150., 25. / 189. - 3. / 20., 1. / 20.],
+    orden=4, orden_error=3, especial=True)
+
+TABLAS = {'RKN4': RKN4, 'RKN43': RKN43}
+
+
+def obtener(tabla):
+    """
+    Returns the Nystrom tableau tabla: a NystromTableau, 'RKN4', 'RKN43' or the Nystrom method of a tableau of
+    Tableaus.
+    """
+    if isinstance(tabla, NystromTableau):
+        return tabla
+    if tabla in TABLAS:
+        return TABLAS[tabla]
+    return nystrom(tabla)
+
+
+
+class RungeKutta_nystrom(RungeKutta_nd):
+    """
+    Builder of RungeKutta_nystrom class. We give the needed data in order to solve the problem x'' = f(t, x, x'):
+    t: Initial time.
+    x: Initial position, a number or an array.
+    v: Initial velocity, with the shape of x.
+    tf, h, error, control: As in RungeKutta_nd.
+    f: Function f(t, x, v) that returns the acceleration, with the shape of x. With an especial tableau (RKN43, RKN4)
+    it is f(t, x), without the velocity. It may also be given later, as obj.f = f.
+    tabla: NystromTableau, 'RKN43', 'RKN4' or the name of a tableau of Tableaus (its Nystrom method), RKF45 by default.
+    The state is (x, v) joined, as the one of RungeKutta_2d, so integrar, the Recorder, the dense output and the events
+    work as in RungeKutta_nd. Every row of self.k holds the velocity and the acceleration of a stage.
+    """
+    def __init__(self, t, x, v, tf, h, error, f=None, tabla='RKF45', control=None, *args, **kwargs):
+        self.escalar = np.ndim(x) == 0  #A scalar problem gets numbers in f, as in RungeKutta_2d.
+        x, v = np.atleast_1d(np.array(x, dtype=float)), np.atleast_1d(np.array(v, dtype=float))
+        self.n = x.size
+        tabla = obtener(tabla)
+        if h is None and not tabla.adaptativo:
+            raise ValueError('{} has no error estimate, it needs the step h'.format(tabla.nombre))
+        super(RungeKutta_nystrom, self).__init__(t, np.concatenate((x, v)), tf, h, error, f, tabla, control,
+                                                 *args, **kwargs)
+
+    x = property(lambda self: self.estado[:self.n])
+    v = property(lambda self: self.estado[self.n:])
+
+    def derivada(self, t, y):
+        if self.escalar:
+            x, v = y[0], y[1]
+        else:
+            x, v = y[:self.n], y[self.n:]
+        a = self.f(t, x) if self.tabla.especial else self.f(t, x, v)
+        if self.escalar:
+            return np.array([v, a])
+        return np.concatenate((v, a))
+
+    def calcular_etapa(self, i):
+        if self.tabla.derivada:
+            return super(RungeKutta_nystrom, self).calcular_etapa(i)
+        while self.etapa <= i:
+            j = self.etapa
+            if j:
+                #Weights of the position and of the velocity at once.
+                pesos = np.dot(self.tabla.pesos[j, :, :j], self.k[:j, self.n:])
+                pesos[0] = self.tabla.C[j] * self.v + self.h * pesos[0]
+                y = self.estado + self.h * pesos.ravel()
+            else:
+                y = self.estado
+            self.k[j] = self.derivada(self.t + self.tabla.C[j] * self.h, y)
+            self.etapa += 1
+
+    def actualizar_estado(self):
+        super(RungeKutta_nystrom, self).actualizar_estado()
+        if self.tabla.fsal and not self.tabla.derivada:
+            self.k[0, :self.n] = self.v  #The last stage had the acceleration at the new point, not its velocity.
+
+    def solucion(self):
+        if self.tabla.derivada:
+            return super(RungeKutta_nystrom, self).solucion()
+        aceleraciones = self.k[:, self.n:]
+        x = self.x + self.h * (self.v + self.h * np.dot(self.tabla.Bbar, aceleraciones))
+        v = self.v + self.h * np.dot(self.tabla.B, aceleraciones)
+        return np.concatenate((x, v))
+
+    def intentar(self):
+        if not self.tabla.adaptativo:
+            raise ValueError('{} has no error estimate, it runs with a fixed step: integrar(adaptativo=False)'.format(
+                self.tabla.nombre))
+        return super(RungeKutta_nystrom, self).intentar()
+
+    def estimar_error(self):
+        if self.tabla.derivada:
+            return super(RungeKutta_nystrom, self).estimar_error()
+        aceleraciones = self.k[:, self.n:]
+        return np.concatenate((self.h * self.h * np.dot(self.tabla.Ebar, aceleraciones),
+                               self.h * np.dot(self.tabla.E, aceleraciones)))
+
+
+
+if __name__ == '__main__':
+    """
+    The van der Pol problem of Exe_runge_kutta_2D, whose acceleration depends on the velocity, with RungeKutta_2d and
+    RungeKutta_nystrom (the same steps and evaluations of f, without the ones of g). The pendulum, x'' = -sin(x), with
+    the adaptive RKN43 against RungeKutta_2d, and with RKN4 and the classical Runge Kutta of order 4 with a fixed step.
+    The especial methods get the acceleration of the pendulum as f(t, x), the others as f(t, x, v).
+    """
+    import timeit
+    from Exe_runge_kutta_2D import f_1, g
+    from Runge_Kutta import RungeKutta_2d
+
+    for tabla in ('RKF45', 'DOPRI5'):
+        rk = RungeKutta_2d(0., 2., 0., 50., 0.5, 1e-6, tabla=tabla)
+        rk.f, rk.g = f_1, g
+        inicio = timeit.default_timer()
+        rec = rk.integrar(estadisticas=True)
+        print('van der Pol, RungeKutta_2d {}: {} steps, {} evaluations of f and g, {:.3f} s'.format(
+            tabla, len(rec) - 1, rec.estadisticas.nfev, timeit.default_timer() - inicio))
+        rkn = RungeKutta_nystrom(0., 2., 0., 50., 0.5, 1e-6, f=f_1, tabla=tabla)
+        inicio = timeit.default_timer()
+        rec_n = rkn.integrar(estadisticas=True)
+        print('van der Pol, RungeKutta_nystrom {}: {} steps, {} evaluations of f, {:.3f} s, largest difference '
+              '{:.1e}'.format(tabla, len(rec_n) - 1, rec_n.estadisticas.nfev, timeit.default_timer() - inicio,
+                              np.max(np.abs(rec.y - rec_n.y))))
+
+    def pendulo(t, x): return -np.sin(x)
+    def pendulo_v(t, x, v): return pendulo(t, x)
+    def velocidad(t, x, v): return v
+    referencia = RungeKutta_nystrom(0., 1., 0., 20., None, 1e-13, f=pendulo_v, tabla='DOP853')
+    referencia.integrar()
+    print('Pendulum, evaluations of f and error at t = 20 (compare the evaluations at the same error: the estimate '
+          'of RKN43 is of order 3, so it is more cautious with the same tolerance)')
+    for tol in (1e-4, 1e-6, 1e-8):
+        columnas = []
+        for tabla in ('RKF45', 'DOPRI5'):
+            rk = RungeKutta_2d(0., 1., 0., 20., None, tol, tabla=tabla)
+            rk.f, rk.g = pendulo_v, velocidad
+            rec = rk.integrar(estadisticas=True)
+            columnas.append('RungeKutta_2d {} {} {:.1e}'.format(tabla, rec.estadisticas.nfev,
+                                                                np.max(np.abs(rk.estado - referencia.estado))))
+        rkn = RungeKutta_nystrom(0., 1., 0., 20., None, tol, f=pendulo, tabla='RKN43')
+        rec = rkn.integrar(estadisticas=True)
+        columnas.append('RungeKutta_nystrom {} {} {:.1e}'.format(rkn.tabla.nombre, rec.estadisticas.nfev,
+                                                                 np.max(np.abs(rkn.estado - referencia.estado))))
+        print('  tol {:.0e}: {}'.format(tol, ' | '.join(columnas)))
+
+    RK4 = Tableaus.ButcherTableau('RK4', [[0., 0., 0., 0.], [0.5, 0., 0., 0.], [0., 0.5, 0., 0.], [0., 0., 1., 0.]],
+                                  [1. / 6., 1. / 3., 1. / 3., 1. / 6.], [0., 0.5, 0.5, 1.], [0., 0., 0., 0.], 4, 3)
+    for h in (0.125, 0.0625, 0.03125):
+        for tabla in ('RKN4', RK4):
+            rkn = RungeKutta_nystrom(0., 1., 0., 20., h, 1., f=pendulo if tabla == 'RKN4' else pendulo_v, tabla=tabla)
+            rec = rkn.integrar(adaptativo=False, estadisticas=True)
+            print('Pendulum, {} h = {}: {} evaluations, error {:.2e}'.format(
+                rkn.tabla.nombre, h, rec.estadisticas.nfev, np.max(np.abs(rkn.estado - referencia.estado))))
@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Function parareal.
+Parallel in time integration of one long trajectory with the Parareal algorithm (Lions, Maday and Turinici, 2001).
+The interval is split in time slices. A cheap coarse propagator G (a large tolerance or a few fixed steps) runs
+over all of them one after the other, and the accurate fine propagator F runs on all the slices at once in a pool of
+processes, from the starting points of the previous iteration. Then the starting points are corrected in order:
+U[n+1] = G(U[n]) + F(U_previous[n]) - G(U_previous[n])
+and this is repeated until they stop changing. After k iterations the first k slices are exact, so the algorithm
+always ends, but it only pays off when it converges in a few iterations, much less than the number of slices.
+The propagators are given as specs, as in Sweep.barrido: dictionaries with the class, the arguments of the builder
+and the attributes to set, with picklable functions. The initial time, state and final time of the spec are replaced
+by the ones of every slice. 'pasos' in a spec makes it a fixed step propagator with that number of steps per slice.
+The speedup is measured against one real serial fine integration over the whole interval, run in this process before
+the parallel one. The slices are timed with the CPU time of their process, so that the ideal speedup does not count
+the waits of the workers for a free core.
+"""
+
+import multiprocessing
+import time
+import timeit
+
+import numpy as np
+from Sweep import _construir
+
+
+
+def _propagar(argumentos):
+    """
+    Integrates the spec from (t0, y0) to t1 and returns the final state and the CPU time it took.
+    """
+    spec, t0, y0, t1 = argumentos
+    inicio = time.process_time()
+    rk = _construir(spec)
+    rk.t, rk.estado, rk.tf, rk.etapa = t0, np.array(y0, dtype=float), t1, 0
+    if 'pasos' in spec:
+        rk.h = (t1 - t0) / spec['pasos']
+        for i in range(spec['pasos']):
+            rk.avanzar(adaptativo=False)
+        if not np.all(np.isfinite(rk.estado)):
+            raise FloatingPointError('The fixed step propagator diverged in [{}, {}], it needs more pasos'.format(
+                t0, t1))
+    else:
+        while rk.t < t1:
+            rk.paso()
+    return rk.estado, time.process_time() - inicio
+
+
+def _recorrer(argumentos):
+    """
+    Integrates the spec from (t0, y0) to t1 with integrar and returns the times and states of the Recorder.
+    """
+    spec, t0, y0, t1 = argumentos
+    rk = _construir(spec)
+    rk.t, rk.estado, rk.tf, rk.etapa = t0, np.array(y0, dtype=float), t1, 0
+    rec = rk.integrar()
+    return np.array(rec.t), np.array(rec.y)
+
+
+
+class Resultado(object):
+    """
+    Result of parareal:
+    t: Times of the slices, T[0] ... T[N].
+    y: States at them, shape (N + 1, n).
+    iteraciones: Number of iterations of the fine propagator.
+    correcciones: Largest scaled change of the starting points in every iteration.
+    tiempo: Wall time of the parallel run.
+    tiempo_serie: Wall time of the serial fine integration over [t0, tf]. If it was not run (serie=False), the sum of
+    the CPU times of the fine propagator over all the slices in the first iteration, which ignores the cost of
+    restarting the integration at every slice.
+    y_serie: Final state of the serial fine integration, or None if it was not run.
+    aceleracion: tiempo_serie / tiempo, the measured speedup.
+    aceleracion_ideal: The speedup with one process per slice: tiempo_serie divided by the coarse time plus the slowest
+    fine slice of every iteration, all of them CPU times.
+    trayectoria: (t, y) of the fine solution over all the slices, if it was asked for.
+    """
+    def __str__(self):
+        return ('{} slices, {} iterations, corrections {}\n'
+                'time {:.3f} s, serial fine time {:.3f} s, speedup {:.2f}, ideal speedup {:.2f}').format(
+            len(self.t) - 1, self.iteraciones, ' '.join('{:.1e}'.format(c) for c in self.correcciones),
+            self.tiempo, self.tiempo_serie, self.aceleracion, self.aceleracion_ideal)
+
+
+def parareal(fino, grueso, t0, y0, tf, rebanadas, tol=1e-6, atol=None, max_iteraciones=None, procesos=None,
+             trayectoria=False, serie=True):
+    """
+    Integrates from (t0, y0) to tf in rebanadas time slices of the same length and returns a Resultado.
+    fino, grueso: Specs of the fine and coarse propagators.
+    tol, atol: Relative and absolute tolerance of the convergence of the starting points (atol = tol by default). It
+    should be near the accuracy of the fine propagator.
+    max_iteraciones: Largest number of iterations, rebanadas by default (then the result is the serial fine one).
+    procesos: Processes of the pool, all the cores by default. With procesos=1 everything runs in this process.
+    trayectoria: If True, the fine propagator runs once more on the converged starting points with integrar, and the
+    steps of all the slices are joined in resultado.trayectoria.
+    serie: If True, the fine propagator first integrates the whole interval in this process, alone, and its wall time
+    is the baseline of the speedup.
+    """
+    resultado = Resultado()
+    resultado.y_serie = None
+    if serie:
+        inicio = timeit.default_timer()
+        resultado.y_serie = _propagar((fino, t0, y0, tf))[0]
+        tiempo_serie = timeit.default_timer() - inicio
+
+    inicio = timeit.default_timer()
+    atol = tol if atol is None else atol
+    max_iteraciones = max_iteraciones or rebanadas
+    T = np.linspace(t0, tf, rebanadas + 1)
+    U = np.empty((rebanadas + 1, np.size(y0)))
+    U[0] = y0
+    G = np.empty_like(U)  #G[n + 1] is the coarse solution of the slice n from U[n].
+    tiempo_grueso = 0.
+    for n in range(rebanadas):
+        G[n + 1], tiempo = _propagar((grueso, T[n], U[n], T[n + 1]))
+        U[n + 1] = G[n + 1]
+        tiempo_grueso += tiempo
+
+    pool = multiprocessing.Pool(procesos) if procesos != 1 else None
+    mapa = pool.map if pool is not None else lambda funcion, tareas: list(map(funcion, tareas))
+    resultado.correcciones = []
+    camino, suma_fina = tiempo_grueso, 0.
+    try:
+        for k in range(max_iteraciones):
+            #The slices before k are already exact: only the fine solutions of the rest are needed.
+            finas = mapa(_propagar, [(fino, T[n], U[n], T[n + 1]) for n in range(k, rebanadas)])
+            if k == 0:
+                suma_fina = sum(tiempo for y, tiempo in finas)
+            camino += max(tiempo for y, tiempo in finas)
+            F = np.array([y for y, tiempo in finas])
+            U_nou = U.copy()
+            for n in range(k, rebanadas):
+                g, tiempo = _propagar((grueso, T[n], U_nou[n], T[n + 1]))
+                U_nou[n + 1] = g + F[n - k] - G[n + 1]
+                G[n + 1] = g
+                tiempo_grueso += tiempo
+                camino += tiempo
+            correccion = np.max(np.abs(U_nou - U) / (atol + tol * np.abs(U_nou)))
+            U = U_nou
+            resultado.correcciones.append(correccion)
+            if correccion <= 1.:
+                break
+        resultado.iteraciones = k + 1
+        if trayectoria:
+            piezas = mapa(_recorrer, [(fino, T[n], U[n], T[n + 1]) for n in range(rebanadas)])
+            resultado.trayectoria = (np.concatenate([piezas[0][0]] + [t[1:] for t, y in piezas[1:]]),
+                                     np.concatenate([piezas[0][1]] + [y[1:] for t, y in piezas[1:]]))
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    resultado.t, resultado.y = T, U
+    resultado.tiempo = timeit.default_timer() - inicio
+    resultado.tiempo_serie = tiempo_serie if serie else suma_fina
+    resultado.aceleracion = resultado.tiempo_serie / resultado.tiempo
+    resultado.aceleracion_ideal = resultado.tiempo_serie / camino
+    return resultado
+
+
+
+"""
+Functions of the example below, at module level so that the worker processes can unpickle them.
+"""
+def _g(t, x, v): return v
+def _duffing(t, x, v): return -0.3 * v - x - 0.5 * x ** 3 + np.cos(t)
+
+
+
+if __name__ == '__main__':
+    """
+    A forced Duffing oscillator written as RungeKutta_2d problems, as the ones of Exe_runge_kutta_2D, over 200 time
+    units in 40 slices: RKF45 with tolerance 1e-9 as the fine propagator and 20 fixed RKF45 steps per slice as the
+    coarse one, compared with the serial fine integration. The number of processes may be given as argument.
+    """
+    import sys
+    from Runge_Kutta import RungeKutta_2d
+
+    atributos = {'f': _duffing, 'g': _g}
+    fino = {'clase': RungeKutta_2d, 'args': (0., 1., 0., 200., None, 1e-9), 'atributos': atributos}
+    grueso = {'clase': RungeKutta_2d, 'args': (0., 1., 0., 200., None, 1.), 'atributos': atributos, 'pasos': 20}
+    procesos = int(sys.argv[1]) if len(sys.argv) > 1 else None
+
+    resultado = parareal(fino, grueso, 0., [1., 0.], 200., 40, tol=1e-8, procesos=procesos)
+    print(resultado)
+    print('Largest difference with the serial solution at t = 200: {:.1e}'.format(
+        np.max(np.abs(resultado.y[-1] - resultado.y_serie))))
@@ -2,7 +2,96 @@
 # coding: utf-8
 
 
-import matplotlib.pyplot as plt
+import collections
+import os
+import sys
+import threading
+
+import numpy as np
+from Recorder import Recorder
+
+
+"""
+Headless mode: if the environment variable PICTURE_HEADLESS is set (or headless() is called) the figures are not shown
+but saved in that directory, with the Agg backend, so the scripts can be run without a display and without blocking.
+"""
+_headless = {'directorio': None, 'contador': 0}
+
+
+def headless(directorio='.'):
+    """
+    Switches to the headless mode: show_plot saves every figure in directorio and closes it.
+    """
+    _headless['directorio'] = directorio
+    if 'matplotlib.pyplot' in sys.modules:
+        _pyplot().switch_backend('Agg')
+
+
+def _pyplot():
+    """
+    matplotlib.pyplot, imported when the first figure is made and not with this module, so the scripts that import
+    it start fast and do not need matplotlib to integrate. In the headless mode the Agg backend is chosen first.
+    """
+    if _headless['directorio'] is not None and 'matplotlib.pyplot' not in sys.modules:
+        import matplotlib
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+
+if os.environ.get('PICTURE_HEADLESS'):
+    headless(os.environ['PICTURE_HEADLESS'])
+
+
+def lttb(x, y, puntos):
+    """
+    Largest Triangle Three Buckets decimation (Steinarsson, 2013): it keeps the first and last points and, from every
+    one of puntos - 2 buckets of consecutive points, the one that makes the largest triangle with the point kept in
+    the previous bucket and the mean of the next bucket. It keeps the peaks and the shape of the curve.
+    Returns the indices of the kept points.
+    """
+    n = len(x)
+    if puntos >= n or puntos < 3:
+        return np.arange(n)
+    bordes = (np.arange(puntos - 1) * (n - 2.) / (puntos - 2)).astype(int) + 1
+    indices = np.empty(puntos, dtype=int)
+    indices[0], indices[-1] = 0, n - 1
+    a = 0
+    for i in range(puntos - 2):
+        inicio, fin = bordes[i], bordes[i + 1]
+        if i + 2 < puntos - 1:
+            cx, cy = x[fin:bordes[i + 2]].mean(), y[fin:bordes[i + 2]].mean()
+        else:
+            cx, cy = x[-1], y[-1]
+        area = np.abs((x[a] - cx) * (y[inicio:fin] - y[a]) - (x[a] - x[inicio:fin]) * (cy - y[a]))
+        a = inicio + int(np.argmax(area))
+        indices[i + 1] = a
+    return indices
+
+
+def minmax(x, y, puntos):
+    """
+    Min/max decimation: the points are split in puntos / 2 bins of consecutive points and the smallest and largest
+    y of every bin are kept, in their order. Faster than lttb, and no peak is lost. Returns the indices of the kept
+    points.
+    """
+    n = len(y)
+    bins = max(1, puntos // 2)
+    if puntos >= n:
+        return np.arange(n)
+    k = -(-n // bins)
+    relleno = np.full(bins * k, np.nan)
+    relleno[:n] = y
+    relleno = relleno.reshape(bins, k)
+    base = np.arange(bins) * k
+    validos = ~np.all(np.isnan(relleno), axis=1)  #The last bins may be only padding.
+    relleno, base = relleno[validos], base[validos]
+    minimos = base + np.nanargmin(relleno, axis=1)
+    maximos = base + np.nanargmax(relleno, axis=1)
+    return np.unique(np.concatenate(([0, n - 1], minimos, maximos)))
+
+
+DECIMACIONES = {'lttb': lttb, 'minmax': minmax}
 
 
 """
@@ -20,22 +109,42 @@ Sample:
         'x': [1, 2, 3, 4],
         'y': [5, 5, 5, 5],
         'legend': caption 2',
-        'linestyle': '-'
+        'linestyle': '-',
+        'marker': 'o'
     }
     ],
     'title': 'Title of the graph',
     'xlabel': 'Tiempo',
     'ylabel': 'Posicion',
+    'xscale': 'log',
+    'yscale': 'log',
+    'decimation': 'lttb',
+    'max_points': 2000,
+    'file': 'figure.png'
 }
+The series longer than max_points (by default twice the width of the figure in pixels) are decimated to it with the
+decimation method ('lttb' by default, 'minmax', or None to plot all the points). If file is given, show_plot saves the
+figure there instead of showing it.
 """
 class Picture:
 
-    def __init__(self, params=None):
+    def __init__(self, params=None, pyplot=True):
         """
-        Here we create an empty space, with a grid.
+        Here we create an empty space, with a grid. With pyplot=False the figure is not registered in pyplot, so it
+        is freed with the object and it can only be saved (it is the way render builds its figures).
         """
-        plt.figure()
-        plt.grid()
+        params = params or {}
+        self.params = params
+        if pyplot:
+            self.figura = _pyplot().figure()
+        else:
+            from matplotlib.figure import Figure
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            self.figura = Figure()
+            FigureCanvasAgg(self.figura)
+        self.pyplot = pyplot
+        self.ejes = self.figura.add_subplot(111)
+        self.ejes.grid()
 
         """
         Now the class gets all the other attributes other than items, which are the title and the label for the axis.
@@ -43,33 +152,255 @@ class Picture:
         Lastly it adds the parameters in 'items', which are the data to plot and some additional information about it.)
         """
         if params.get('title'):
-            plt.title(params['title'])
-        
+            self.ejes.set_title(params['title'])
+
         if params.get('xlabel'):
-            plt.xlabel(params['xlabel'])
-            
+            self.ejes.set_xlabel(params['xlabel'])
+
         if params.get('ylabel'):
-            plt.ylabel(params['ylabel'])
-            
+            self.ejes.set_ylabel(params['ylabel'])
+
+        if params.get('xscale'):
+            self.ejes.set_xscale(params['xscale'])
+
+        if params.get('yscale'):
+            self.ejes.set_yscale(params['yscale'])
+
+        self.decimacion = params.get('decimation', 'lttb')
+        self.max_puntos = params.get('max_points', int(2 * self.figura.get_figwidth() * self.figura.dpi))
+
         for item in params.get('items', []):
             self.add_item(item)
-                
-    
+
+
     def add_item(self, item):
         """
-        This method adds the points to plot to the figure and sets the caption and the linestyle to default values
-        (empty for the caption and '-' for the linestyle).
+        This method adds the points to plot to the figure and sets the caption, the linestyle and the marker to
+        default values (empty for the caption, '-' for the linestyle and no marker). Long series are decimated.
         """
-        plt.plot(
-                item['x'],
-                item['y'],
+        x, y = item['x'], item['y']
+        if self.decimacion and len(x) > self.max_puntos:
+            x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+            indices = DECIMACIONES[self.decimacion](x, y, self.max_puntos)
+            x, y = x[indices], y[indices]
+        self.ejes.plot(
+                x,
+                y,
                 label='' if not item.get('legend') else item['legend'],
-                linestyle='-' if not item.get('linestyle') else item['linestyle']
+                linestyle='-' if not item.get('linestyle') else item['linestyle'],
+                marker=item.get('marker')
             )
-    
+
+    def save_plot(self, archivo):
+        """
+        Saves the figure in archivo and closes it.
+        """
+        self.leyenda()
+        self.figura.savefig(archivo)
+        self.close()
+
+    def leyenda(self):
+        """
+        Makes the legend visible, if some item has a caption.
+        """
+        if self.ejes.get_legend_handles_labels()[0]:
+            self.ejes.legend()
+
+    def close(self):
+        if self.pyplot:
+            _pyplot().close(self.figura)
+
     def show_plot(self):
         """
-        Plots the data added to the figure and makes the legend visible.
+        Plots the data added to the figure and makes the legend visible. If the params have a file, or in the
+        headless mode, the figure is saved instead.
+        """
+        if self.params.get('file'):
+            self.save_plot(self.params['file'])
+        elif _headless['directorio'] is not None:
+            _headless['contador'] += 1
+            self.save_plot(os.path.join(_headless['directorio'], 'figure_{:03d}.png'.format(_headless['contador'])))
+        else:
+            self.leyenda()
+            _pyplot().show()
+
+
+def render(lista, directorio='.', formato='png'):
+    """
+    Batch rendering: saves the figure of every params in lista, in its file or in directorio as figure_i.formato,
+    without pyplot (so without a display, and without keeping any figure open). Returns the names of the files.
+    """
+    archivos = []
+    for i, params in enumerate(lista):
+        archivo = params.get('file') or os.path.join(directorio, 'figure_{:03d}.{}'.format(i + 1, formato))
+        Picture(params, pyplot=False).save_plot(archivo)
+        archivos.append(archivo)
+    return archivos
+
+
+
+"""
+Live plotting.
+LivePicture draws the steps of an integration while it runs. It is given to the solver as a hook, so for every
+accepted step the solver thread only appends (t, state) to a queue. The figure is updated by a timer of the GUI, at
+most fps times per second: it takes the queued steps, extends the lines in place and redraws only them over the saved
+background (blitting). The whole figure is redrawn only when the data leave the limits of the axes, which are then
+enlarged with a margin so it happens a few times. The drawing holds the interpreter for some milliseconds per frame,
+so fps also bounds the share of time taken from the solver.
+Sample:
+{
+    'items': [
+    {
+        'x': 't',
+        'y': 0,
+        'legend': 'x(t)'
+    }
+    ],
+    'title': 'X vs t',
+    'fps': 20
+}
+The x and y of an item are 't' (the time) or the index of a component of the state. The other keys are the ones of
+Picture.
+"""
+class LivePicture(Picture):
+
+    def __init__(self, params=None):
+        params = dict(params or {})
+        self.items = params.pop('items', [])
+        super(LivePicture, self).__init__(params)
+        self.intervalo = int(1000. / params.get('fps', 20))
+        self.cola = collections.deque()
+        self.datos = None
+        self.lineas = [self.ejes.plot([], [], label='' if not item.get('legend') else item['legend'],
+                                      linestyle='-' if not item.get('linestyle') else item['linestyle'],
+                                      marker=item.get('marker'), animated=True)[0] for item in self.items]
+        self.fondo = None
+        self.figura.canvas.mpl_connect('draw_event', self._guardar_fondo)
+        self.leyenda()
+
+    def __call__(self, rk):
+        """
+        Hook of the solver: only queues the step.
+        """
+        self.cola.append((rk.t, rk.estado))
+
+    def _columna(self, selector):
+        return self.datos.t if selector == 't' else self.datos.y[:, selector]
+
+    def _guardar_fondo(self, evento):
+        self.fondo = self.figura.canvas.copy_from_bbox(self.figura.bbox)
+        for linea in self.lineas:
+            self.ejes.draw_artist(linea)
+
+    def actualizar(self):
+        """
+        Moves the queued steps to the lines and redraws them. Returns the number of steps taken from the queue.
+        """
+        nuevos = []
+        while True:
+            try:
+                nuevos.append(self.cola.popleft())
+            except IndexError:
+                break
+        if not nuevos:
+            return 0
+        if self.datos is None:
+            self.datos = Recorder(len(nuevos[0][1]))
+        self.datos.extend(np.array([t for t, y in nuevos]), np.array([y for t, y in nuevos]),
+                          np.zeros(len(nuevos)))
+
+        ampliar = False
+        for item, linea in zip(self.items, self.lineas):
+            x, y = self._columna(item['x']), self._columna(item['y'])
+            if self.decimacion and len(x) > self.max_puntos:
+                indices = DECIMACIONES[self.decimacion](x, y, self.max_puntos)
+                x, y = x[indices], y[indices]
+            linea.set_data(x, y)
+            ampliar = ampliar or self._fuera(x, y)
+        if ampliar or self.fondo is None:
+            self._ampliar()
+            self.figura.canvas.draw_idle()
+        else:
+            canvas = self.figura.canvas
+            canvas.restore_region(self.fondo)
+            for linea in self.lineas:
+                self.ejes.draw_artist(linea)
+            canvas.blit(self.figura.bbox)
+        return len(nuevos)
+
+    def _fuera(self, x, y):
+        (x0, x1), (y0, y1) = self.ejes.get_xlim(), self.ejes.get_ylim()
+        return x.min() < x0 or x.max() > x1 or y.min() < y0 or y.max() > y1
+
+    def _ampliar(self):
+        """
+        Limits of the axes that hold all the data with a margin of a quarter of their range.
         """
-        plt.legend()
-        plt.show()
\ No newline at end of file
+        x = np.concatenate([linea.get_xdata() for linea in self.lineas])
+        y = np.concatenate([linea.get_ydata() for linea in self.lineas])
+        for datos, fijar in ((x, self.ejes.set_xlim), (y, self.ejes.set_ylim)):
+            minimo, maximo = datos.min(), datos.max()
+            margen = 0.25 * (maximo - minimo) or 1.
+            fijar(minimo - margen, maximo + margen)
+
+    def terminar(self):
+        """
+        Takes the last steps and draws the figure normally, with the limits fitted to the data.
+        """
+        self.actualizar()
+        for linea in self.lineas:
+            linea.set_animated(False)
+        self.ejes.relim()
+        self.ejes.autoscale_view()
+        self.figura.canvas.draw_idle()
+
+
+def en_vivo(rk, figuras, **kwargs):
+    """
+    Integrates rk in a background thread (rk.integrar(**kwargs), with the LivePicture objects in figuras added to its
+    hooks) while the figures are drawn in this thread. It returns the Recorder of the integration when the windows
+    are closed. With a backend without windows (Agg, or the headless mode) the integration runs first and then the
+    figures are saved by show_plot.
+    An exception of the integration in the thread is raised again here, after the windows are closed, so the figures
+    still show the steps taken until it happened.
+    """
+    for figura in figuras:
+        figura(rk)  #The initial point.
+    kwargs['hooks'] = list(kwargs.get('hooks', ())) + list(figuras)
+    plt = _pyplot()
+    if _headless['directorio'] is not None or plt.get_backend().lower() == 'agg':
+        rec = rk.integrar(**kwargs)
+        for figura in figuras:
+            figura.terminar()
+            figura.show_plot()
+        return rec
+
+    resultado = {}
+
+    def integrar():
+        try:
+            resultado['rec'] = rk.integrar(**kwargs)
+        except Exception as error:  #The exceptions of a thread are lost, this one is raised again after join.
+            resultado['error'] = error
+
+    hilo = threading.Thread(target=integrar)
+    hilo.daemon = True
+    temporizadores = []
+    for figura in figuras:
+        temporizador = figura.figura.canvas.new_timer(interval=figura.intervalo)
+
+        def actualizar(figura=figura, temporizador=temporizador):
+            figura.actualizar()
+            if not hilo.is_alive():
+                temporizador.stop()
+                figura.terminar()
+        temporizador.add_callback(actualizar)
+        temporizadores.append(temporizador)
+    hilo.start()
+    for temporizador in temporizadores:
+        temporizador.start()
+    plt.show()
+    hilo.join()
+    if 'error' in resultado:
+        raise resultado['error']
+    return resultado['rec']
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Method Recorder.
+It stores the accepted steps of an integration (t, state, h and optionally the derivative of the state) in float64
+arrays, one for each quantity, that double their capacity when they are full. The stored data is given back as
+NumPy views, without copies.
+"""
+
+import numpy as np
+
+
+
+class Recorder(object):
+    """
+    Builder of Recorder class:
+    n: Number of components of the state.
+    capacidad: Initial number of steps that fit in the buffers.
+    derivadas: If True, the derivative of the state at every step is also stored (needed for dense output).
+    """
+    def __init__(self, n, capacidad=1024, derivadas=False):
+        self.n = n
+        self.size = 0
+        self._t = np.empty(capacidad)
+        self._y = np.empty((capacidad, n))
+        self._h = np.empty(capacidad)
+        self._dy = np.empty((capacidad, n)) if derivadas else None
+
+    def __len__(self):
+        return self.size
+
+    def _ampliar(self, minimo=0):
+        """
+        Doubles the capacity of the buffers (or more, until minimo steps fit), copying the stored steps.
+        """
+        capacidad = 2 * max(len(self._t), 1)
+        while capacidad < minimo:
+            capacidad *= 2
+        for nombre in ('_t', '_y', '_h', '_dy'):
+            viejo = getattr(self, nombre)
+            if viejo is None:
+                continue
+            nuevo = np.empty((capacidad,) + viejo.shape[1:])
+            nuevo[:self.size] = viejo[:self.size]
+            setattr(self, nombre, nuevo)
+
+    def append(self, t, y, h, dy=None):
+        """
+        Stores one step. y is the state, a sequence or array with n components, and dy its derivative.
+        """
+        if self.size == len(self._t):
+            self._ampliar()
+        self._t[self.size] = t
+        self._y[self.size] = y
+        self._h[self.size] = h
+        if self._dy is not None:
+            self._dy[self.size] = dy
+        self.size += 1
+
+    def extend(self, t, y, h, dy=None):
+        """
+        Stores a block of steps: t and h are arrays of length k and y, dy arrays of shape (k, n).
+        """
+        k = len(t)
+        if self.size + k > len(self._t):
+            self._ampliar(self.size + k)
+        self._t[self.size:self.size + k] = t
+        self._y[self.size:self.size + k] = y
+        self._h[self.size:self.size + k] = h
+        if self._dy is not None:
+            self._dy[self.size:self.size + k] = dy
+        self.size += k
+
+    def flush(self):
+        """
+        Nothing to do: the steps are already in memory. Recorders that write to disk write their pending steps.
+        """
+        pass
+
+    """
+    Views of the stored steps. They share memory with the buffers, so a view taken before more steps are appended
+    does not see the new steps.
+    """
+    @property
+    def t(self):
+        return self._t[:self.size]
+
+    @property
+    def y(self):
+        return self._y[:self.size]
+
+    @property
+    def h(self):
+        return self._h[:self.size]
+
+    @property
+    def dy(self):
+        return None if self._dy is None else self._dy[:self.size]
@@ -2,14 +2,352 @@
 # coding: utf-8
 
 """
-Methods RungeKutta and RungeKutta_2d.
+Methods RungeKutta, RungeKutta_2d and RungeKutta_nd.
 They allow to create objects that apply the Runge Kutta 4/5 numerical calculation, with or without the adaptive
 step added by Fehlberg in order to find the solution to 1st order ODEs in 1-D  or 2-D respectively.
+RungeKutta_nd is the engine behind both of them: it integrates a state vector of any length, y' = f(t, y), and
+RungeKutta and RungeKutta_2d are kept as thin wrappers over it.
 """
 
+import numpy as np
+from Recorder import Recorder
+from Dense_Output import DenseOutput, evaluar, hermite_coeficientes
+from Events import buscar_eventos
+from Tableaus import FEHLBERG, obtener
+from Step_Control import Controlador, paso_minimo
+from Stats import Estadisticas
 
 
-class RungeKutta(object):
+"""
+Fehlberg 4(5) tableau, the default one, also kept as module constants. FEHLBERG_A[i, :i] are the weights of the
+previous stages used to build the argument of stage i, FEHLBERG_C[i] its time fraction, FEHLBERG_B the weights of the
+4th order solution and FEHLBERG_E the difference between the 5th and 4th order weights, which gives the local error
+estimate.
+"""
+FEHLBERG_A, FEHLBERG_B, FEHLBERG_C, FEHLBERG_E = FEHLBERG.A, FEHLBERG.B, FEHLBERG.C, FEHLBERG.E
+
+
+
+class RungeKutta_nd(object):
+    """
+    Builder of RungeKutta_nd class. We give the needed data in order to solve the problem y' = f(t, y):
+    t: Initial time. It is updated when the calculations are executed.
+    y: Initial state, a sequence or NumPy array of any length. It is stored as a float array in self.estado.
+    tf: Final time. Given in order to stop the calculation.
+    h: Integration step. It is updated by the step control. If it is None, the initial step is chosen by the
+    controller from f at the initial point.
+    error: Desired error, used as absolute and relative tolerance when control is not given.
+    f: Function f(t, y) that returns the derivative of the state as an array with the length of y.
+    tabla: Butcher tableau of the method, a ButcherTableau or the name of a registered one ('RKF45' by default,
+    'DOPRI5', 'BS32', 'DOP853').
+    control: Step controller (Step_Control.Controlador or ControladorPI), Controlador(error, error) by default. It
+    also counts the accepted and rejected steps.
+    The stages are stored in the rows of self.k, so every stage is computed once for all the components.
+    """
+    def __init__(self, t, y, tf, h, error, f=None, tabla='RKF45', control=None, *args, **kwargs):
+        self.t = t
+        self.estado = np.atleast_1d(np.array(y, dtype=float))
+        self.tf = tf
+        self.h = h
+        self.error = error
+        self.f = f
+        self.tabla = obtener(tabla)
+        self.control = control if control is not None else Controlador(error, error)
+        self.k = np.zeros((self.tabla.etapas, self.estado.size))
+        self.etapa = 0  #Number of stages already computed for the current t, estado and h.
+        self.aux = True
+        self.h_ultimo = h  #Last step tried, accepted or not.
+
+    def derivada(self, t, y):
+        """
+        Evaluates the right hand side. Subclasses override it to adapt other function signatures.
+        """
+        return self.f(t, y)
+
+    def calcular_etapa(self, i):
+        """
+        Computes the stages up to i (included) that are not computed yet for the current step.
+        """
+        while self.etapa <= i:
+            j = self.etapa
+            y = self.estado + self.h * np.dot(self.tabla.A[j, :j], self.k[:j]) if j else self.estado
+            self.k[j] = self.derivada(self.t + self.tabla.C[j] * self.h, y)
+            self.etapa += 1
+
+    def calcular_etapas(self):
+        self.calcular_etapa(self.tabla.etapas - 1)
+
+    def actualizar_estado(self):
+        """
+        Advances t and the state with the solution of the computed stages. With a FSAL tableau the last stage is f at
+        the new point, so it becomes the first stage of the next step.
+        """
+        self.estado = self.solucion()
+        self.t = self.t + self.h
+        if self.tabla.fsal:
+            self.k[0] = self.k[-1]
+            self.etapa = 1
+        else:
+            self.etapa = 0
+
+    def solucion(self):
+        """
+        Returns the state at t + h given by the computed stages.
+        """
+        return self.estado + self.h * np.dot(self.tabla.B, self.k)
+
+    def estimar_error(self):
+        """
+        Returns the local error estimate of every component for the computed stages.
+        """
+        return self.h * np.dot(self.tabla.E, self.k)
+
+    def interpolante(self, t0, y0, f0):
+        """
+        Coefficients Q (q, n) of the polynomial of the last accepted step, from (t0, y0), with f0 = f(t0, y0), to the
+        current point, whose derivative must be already computed in self.k[0]: the state at t0 + s h_ultimo is
+        Dense_Output.evaluar(t0, h_ultimo, y0, Q, t). It is the continuous extension of the tableau, made from the
+        stages of the step (and its extra stages, if it has them), or the cubic Hermite polynomial if the tableau has
+        none. Subclasses whose stages are not the ones of the tableau override it.
+        """
+        h = self.h_ultimo
+        if self.tabla.P is None:
+            return hermite_coeficientes(h, y0, self.estado, f0, self.k[0])
+        K = np.empty((len(self.tabla.P), self.estado.size))
+        s = self.tabla.etapas
+        K[0], K[1:s] = f0, self.k[1:]
+        if not self.tabla.fsal:
+            K[s] = self.k[0]
+            s += 1
+        for a, c in zip(self.tabla.A_extra, self.tabla.C_extra):
+            K[s] = self.derivada(t0 + c * h, y0 + h * np.dot(a[:s], K[:s]))
+            s += 1
+        return h * np.dot(self.tabla.P.T, K)
+
+    def paso_inicial(self):
+        """
+        If h is None, sets it to the initial step chosen by the controller. Any step, chosen or given, is clipped so
+        that tf is not overshot, and a step that falls short of tf by less than a relative 1e-8 (the rounding of a
+        fixed step added many times) is stretched to end at tf, instead of leaving a tiny last step. Returns h.
+        """
+        if self.h is None:
+            if self.etapa == 0:
+                self.k[0] = self.derivada(self.t, self.estado)
+                self.etapa = 1
+            self.h = self.control.paso_inicial(self.derivada, self.t, self.estado, self.k[0],
+                                               self.tabla.orden_error + 1)
+        if self.t < self.tf and self.tf - self.t <= self.h * (1. + 1e-8):
+            self.h = self.tf - self.t
+        return self.h
+
+    def intentar(self):
+        """
+        Computes the stages of a step of length h and asks the controller if it is accepted, with the error of every
+        component scaled by its tolerance. The local error of the estimate is O(h^(orden_error + 1)). Returns
+        (accepted, proposed step); the state is not changed.
+        """
+        self.calcular_etapas()
+        y_nou = self.solucion()
+        err = self.tabla.norma_error(self.k, self.h, self.control.escala(self.estado, y_nou))
+        return self.control.proponer(self.h, err, self.tabla.orden_error + 1)
+
+    def paso(self):
+        """
+        Makes one accepted step. A rejected try is retried at once with the smaller step proposed by the controller,
+        keeping the first stage, since it does not depend on h. Then the state is advanced and h takes the proposed
+        value, clipped so that tf is not overshot. self.h_ultimo keeps the length of the accepted step. Returns
+        self.aux (always True, kept for the loops that test it).
+        Raises RuntimeError if the error estimate is not finite (f returned nan or inf) or if the step falls below
+        Step_Control.paso_minimo, instead of retrying forever.
+        """
+        self.paso_inicial()
+        self.aux, h_nou = self.intentar()
+        while not self.aux:
+            if not np.isfinite(h_nou):
+                raise RuntimeError('The error estimate is not finite at t = {} with h = {:.3e}: f returned nan or '
+                                   'inf'.format(self.t, self.h))
+            if abs(h_nou) < paso_minimo(self.t):
+                raise RuntimeError('The step became too small at t = {} (h = {:.3e})'.format(self.t, h_nou))
+            self.h = h_nou
+            self.etapa = 1
+            self.aux, h_nou = self.intentar()
+        self.h_ultimo = self.h
+        self.actualizar_estado()
+        self.h = min(h_nou, self.tf - self.t) if self.t < self.tf else h_nou
+        return self.aux
+
+    def avanzar(self, adaptativo=True):
+        """
+        One step of an integration loop: an adaptive try (paso) or, if adaptativo is False, a fixed step that is
+        always accepted. The last fixed step is shortened to end at tf, and h keeps the fixed value. Returns if the
+        step was accepted.
+        """
+        if adaptativo:
+            return self.paso()
+        fijo = self.h
+        self.paso_inicial()
+        self.h_ultimo = self.h
+        self.calcular_etapas()
+        self.actualizar_estado()
+        if fijo is not None:
+            self.h = fijo
+        self.aux = True
+        return self.aux
+
+    def iterar(self, chunk=None, adaptativo=True):
+        """
+        Generator over the integration until tf. It yields the initial point and then every accepted step as a
+        tuple (t, state, h), one at a time, so nothing is kept beyond the current step and the consumer can stop at
+        any point. If chunk is given, it yields tuples of arrays (t, states, h) with chunk steps each (the last one
+        may be shorter), with the states as an array of shape (chunk, n).
+        """
+        self.paso_inicial()
+        if chunk is None:
+            yield self.t, self.estado, self.h
+            while self.t < self.tf:
+                if self.avanzar(adaptativo):
+                    yield self.t, self.estado, self.h
+            return
+        bloque = None
+        for t, y, h in self.iterar(adaptativo=adaptativo):
+            if bloque is None:
+                bloque = Recorder(y.size, capacidad=chunk)
+            bloque.append(t, y, h)
+            if len(bloque) == chunk:
+                yield bloque.t, bloque.y, bloque.h
+                bloque = None
+        if bloque is not None:
+            yield bloque.t, bloque.y, bloque.h
+
+    def integrar(self, adaptativo=True, dense_output=False, t_eval=None, eventos=(), estadisticas=False, hooks=(),
+                 recorder=None):
+        """
+        Integrates until tf and returns a Recorder (also kept in self.recorder) with the initial point and the
+        accepted steps. If adaptativo is False the step is kept fixed and every step is accepted.
+        dense_output: If True, the derivative at every step is also recorded and self.sol is set to a DenseOutput,
+        which evaluates the solution at any array of times: self.sol(t_array). Inside every step it uses the
+        continuous extension of the tableau (see interpolante), as accurate as the steps, so the output does not need
+        smaller steps.
+        t_eval: Increasing array of times. If it is given, the recorder only receives the solution interpolated at
+        these times (with the h of the step that contains them) instead of the internal steps.
+        eventos: Sequence of Event objects. Their zeros are located on the interpolant of the step where their sign
+        changes and are given in self.eventos, a table (structured array) with the fields 'evento' (index of the event
+        in eventos), 't' and 'y' (the state). A terminal event ends the integration at its zero.
+        The polynomial of a step is only built when it is needed: always with dense_output, and for t_eval and the
+        events only in the steps with times of t_eval or changes of sign.
+        estadisticas: If True, the Recorder gets an Estadisticas object (recorder.estadisticas) with the evaluations
+        of f, the accepted and rejected steps, the sizes of the steps and the time spent in f and in the solver.
+        Otherwise recorder.estadisticas is None and nothing is measured.
+        hooks: Sequence of functions hook(rk) called with the solver after every accepted step, once its state is
+        advanced and recorded.
+        recorder: Recorder that receives the steps instead of a new one, for instance a MemmapRecorder that writes
+        them to disk. If it is not empty, it is the Recorder of a previous integration to continue (see
+        Checkpoint.reanudar): the steps are appended to it, the current point is not recorded again and the events
+        already found, in self.encontrados, are kept. The recorder is flushed at the end, so its views hold all the
+        steps.
+        """
+        medida = Estadisticas() if estadisticas else None
+        al_paso = list(hooks) + ([medida] if medida is not None else [])
+        if medida is not None:
+            medida.iniciar(self)
+        try:
+            self._integrar(adaptativo, dense_output, t_eval, eventos, al_paso, recorder)
+        finally:
+            if medida is not None:
+                medida.terminar(self)
+        self.recorder.flush()
+        self.recorder.estadisticas = medida
+        return self.recorder
+
+    def _integrar(self, adaptativo, dense_output, t_eval, eventos, al_paso, recorder):
+        self.paso_inicial()
+        denso = dense_output or t_eval is not None or len(eventos) > 0
+        if denso:
+            self.calcular_etapa(0)  #The derivative at the new point is also the first stage of the next step.
+        if t_eval is not None:
+            t_eval = np.asarray(t_eval, dtype=float)
+            j = np.searchsorted(t_eval, self.t, side='right')
+        if recorder is not None and len(recorder) > 0:
+            self.recorder = recorder
+        else:
+            self.recorder = recorder if recorder is not None else Recorder(self.estado.size, derivadas=dense_output)
+            self.encontrados = []
+            if t_eval is None:
+                self.recorder.append(self.t, self.estado, self.h, self.k[0])
+            else:
+                inicio = np.searchsorted(t_eval, self.t, side='left')
+                for te in t_eval[inicio:j]:
+                    self.recorder.append(te, self.estado, self.h)
+        valores = [evento(self.t, self.estado) for evento in eventos]
+
+        terminar = False
+        if dense_output:
+            denso_t, denso_y, denso_h, denso_q = [self.t], [self.estado.copy()], [], []
+        while self.t < self.tf and not terminar:
+            t0, y0 = self.t, self.estado.copy() if denso else self.estado
+            if denso:
+                f0 = self.k[0].copy()
+            if not self.avanzar(adaptativo):
+                continue
+            if denso:
+                self.calcular_etapa(0)
+                t1, h, polinomio = self.t, self.h_ultimo, []
+
+                def estado(t, t0=t0, y0=y0, f0=f0, h=h, polinomio=polinomio):
+                    if not polinomio:
+                        polinomio.append(self.interpolante(t0, y0, f0))
+                    return evaluar(t0, h, y0, polinomio[0], t)
+            if eventos:
+                nuevos = [evento(self.t, self.estado) for evento in eventos]
+                encontrados = buscar_eventos(eventos, valores, t0, t1, nuevos, lambda t: estado(t)[0])
+                self.encontrados.extend(encontrados)
+                valores = nuevos
+                terminar = len(encontrados) > 0 and eventos[encontrados[-1][1]].terminal
+                if terminar:
+                    if dense_output:
+                        estado(t1)  #The polynomial of the whole step, before the state is replaced.
+                    self.t, self.estado = encontrados[-1][0], encontrados[-1][2]
+                    self.etapa = 0
+                    self.calcular_etapa(0)
+            if dense_output:
+                estado(t1)
+                denso_t.append(self.t)
+                denso_y.append(self.estado.copy())
+                denso_h.append(h)
+                denso_q.append(polinomio[0])
+            if t_eval is None:
+                self.recorder.append(self.t, self.estado, self.h, self.k[0])
+            else:
+                fin = np.searchsorted(t_eval, self.t, side='right')
+                if fin > j:
+                    te = t_eval[j:fin]
+                    self.recorder.extend(te, estado(te), np.full(fin - j, t1 - t0))
+                    j = fin
+            for hook in al_paso:
+                hook(self)
+
+        self.eventos = np.array([(i, t, y) for t, i, y in self.encontrados],
+                                dtype=[('evento', int), ('t', float), ('y', float, (self.estado.size,))])
+        if dense_output:
+            q = max([len(Q) for Q in denso_q] + [1])  #RungeKutta_auto mixes polynomials of different degrees.
+            coeficientes = np.zeros((len(denso_q), q, self.estado.size))
+            for i, Q in enumerate(denso_q):
+                coeficientes[i, :len(Q)] = Q
+            self.sol = DenseOutput(denso_t, denso_y, coeficientes=coeficientes, h=denso_h)
+
+
+def _calcular(i):
+    def calcular(self):
+        self.calcular_etapa(i)
+    return calcular
+
+
+def _etapa(i, componente=0):
+    return property(lambda self: self.k[i, componente])
+
+
+
+class RungeKutta(RungeKutta_nd):
     """"
     Builder of RungeKutta class. We give the needed data in order to solve the problem:
     x: Initial x position. It is updated when the calculations are executed.
@@ -18,46 +356,44 @@ class RungeKutta(object):
     h: Integration step. It may be updated when the calculations are executed if
     step update method (actualizar_paso_integracion) is active.
     error: Desired error.
+    It is a wrapper over RungeKutta_nd with a state of length 1: x is the engine time and y its only component.
     """
     def __init__(self, x, y, xf, h, error, *args, **kwargs):
-        self.x = x
-        self.y = y
-        self.xf = xf
-        self.h = h
-        self.error = error
-        self.f = None
+        super(RungeKutta, self).__init__(x, [y], xf, h, error, *args, **kwargs)
         self.aux = True  #Auxiliar used to optimize the calculations.
 
+    x = property(lambda self: self.t, lambda self, value: setattr(self, 't', value))
+    xf = property(lambda self: self.tf, lambda self, value: setattr(self, 'tf', value))
 
+    @property
+    def y(self):
+        return self.estado[0]
+
+    @y.setter
+    def y(self, value):
+        self.estado = np.array([value], dtype=float)
+
+    def derivada(self, t, y):
+        return np.array([self.f(t, y[0])])
+
+
+    """
+    In the next methods, calcular_fi, we calculate the intermediate functions needed for the calculation of yn+1 and
+    the update of the integration step. They are stored by the engine in self.k and can be read as f0..f5.
     """
-    In the next methods, calcular_fi, we implement the calculation of the intermediate functions needed for the 
-    calculation of yn+1 and the update of the integration step. 
-    """
-    
-    def calcular_f0(self):
-        self.f0 = self.f(self.x, self.y)
-    
-    def calcular_f1(self):    
-        self.f1 = self.f(self.x + self.h / 4., self.y + self.h / 4. * self.f0)
-    
-    def calcular_f2(self):
-        self.f2 = self.f(self.x + 3. * self.h / 8., self.y + 3. * self.h / 32 *
-                         self.f0 + 9. * self.h / 32. * self.f1)
-        
-    def calcular_f3(self):
-        self.f3 = self.f(self.x + 12. * self.h/13.2, self.y + 1932. *
-                         self.h / 2197. * self.f0 - 7200. * self.h/2197. *
-                         self.f1 + 7296. * self.h / 2197. * self.f2)
-        
-    def calcular_f4(self):
-        self.f4 =self.f(self.x + self.h, self.y + 439. * self.h / 216. * 
-                        self.f0 - 8. * self.h * self.f1 + 3680. * self.h / 513. *
-                        self.f2 - 845. * self.h / 4104. * self.f3)
-        
-    def calcular_f5(self):
-        self.f5 = self.f(self.x + self.h / 2., self.y - 8. * self.h / 27. * self.f0 + 2. *
-                         self.h * self.f1 - 3544. * self.h / 2565. * self.f2 + 1859. * self.h / 4104. *
-                         self.f3 - 11. * self.h / 40. * self.f4)
+    calcular_f0 = _calcular(0)
+    calcular_f1 = _calcular(1)
+    calcular_f2 = _calcular(2)
+    calcular_f3 = _calcular(3)
+    calcular_f4 = _calcular(4)
+    calcular_f5 = _calcular(5)
+
+    f0 = _etapa(0)
+    f1 = _etapa(1)
+    f2 = _etapa(2)
+    f3 = _etapa(3)
+    f4 = _etapa(4)
+    f5 = _etapa(5)
 
 
     """
@@ -65,30 +401,40 @@ class RungeKutta(object):
     """
     def actualizar_posicion(self):
         self.x += self.h
+        self.etapa = 0
 
     """
     Calculates yn+1 and updates the y value (y is equivalent to the velocity).
     """
     def actualizar_velocidad(self):
-        self.y += self.h * (25. / 216. * self.f0 + 1408. * self.f2 / 2565. + 2197. *
-                            self.f3 / 4104. - self.f4 / 5.)
+        self.estado = self.estado + self.h * np.dot(self.tabla.B, self.k)
+        self.etapa = 0
+        self._aplicar_paso()
 
     """
-    Method that calculates the new value of the integration step, according to Fehlberg method.
-    If the new h value is smaller than the last one it sets the aux to False, in order to avoid adding
-    the same point multiple times, reducing the calculation time. Finally, it updates the value of h.
+    Method that decides, with the step controller, if the step of the computed stages is accepted, and sets aux to
+    False if it is not, in order to avoid adding the same point multiple times. A rejected step is replaced at once
+    by the smaller one proposed and its first stage is kept for the retry. The step proposed after an accepted step
+    is kept until the state is updated: actualizar_velocidad, the last update of the loop, sets it.
     """
     def actualizar_paso_integracion(self):
-        err = self.h * (1 / 360. * self.f0 - 128 / 4275. * self.f2 - 2197 / 75240. *
-                        self.f3 + 1 / 50. * self.f4 + 2 / 55. * self.f5)
-        h_nou = 0.9 * self.h * (abs(self.h) * self.error / (abs(err))) ** (1. / 4.)
-        if h_nou < self.h:
-            self.aux = False      
-        self.h = h_nou
+        self.paso_inicial()
+        self.aux, h_nou = self.intentar()
+        if self.aux:
+            self.h_ultimo = self.h
+            self.h_siguiente = h_nou
+        else:
+            self.h = h_nou
+            self.etapa = 1
+
+    def _aplicar_paso(self):
+        if getattr(self, 'h_siguiente', None) is not None:
+            self.h = min(self.h_siguiente, self.tf - self.t) if self.t < self.tf else self.h_siguiente
+            self.h_siguiente = None
 
     """
     Method that fills lists with the values calculated, in order to graph the results of the calculation.
-    More lists could be added if needed.
+    More lists could be added if needed. Kept for compatibility: integrar() records the accepted steps in a Recorder.
     """
     def fill_lists(self, lista_x, lista_y, lista_h):
         lista_x.append(self.x)
@@ -111,125 +457,69 @@ class RungeKutta_2d(RungeKutta):
     error: Desired error.
     This builder works as the father class, but including time to solve problems in two dimensions.
     The methods included are almost equal to the ones in the father class, serve the same purpose and work in the
-    same way.
+    same way. The engine state is (x, y), with g giving dx/dt and f giving dy/dt.
     """
     def __init__(self, t, x, y, tf, h, error, xf=None, *args, **kwargs):
-        self.t = t
-        self.tf = tf
+        RungeKutta_nd.__init__(self, t, [x, y], tf, h, error, *args, **kwargs)
+        self.xf = xf
         self.f = None  #y function
         self.g = None  #x function
         self.aux = True
-        """
-        With this we apply the heritage from the RungeKutta class
-        """
-        super(RungeKutta_2d, self).__init__(x, y, xf, h, error, *args, **kwargs)
-
-    """
-    In the next methods, calcular_fi, calcular_gi, we implement the calculation of the intermediate functions needed
-    for the calculation of xn+1, yn+1 and the update of the integration step. 
-    """
-    def calcular_f0(self):
-        self.f0 = self.f ( self.t,
-                           self.x,
-                           self.y )
-    
-    def calcular_f1(self):    
-        self.f1 = self.f ( self.t + self.h / 4.,
-                           self.x + self.h / 4. * self.g0,
-                           self.y + self.h / 4. * self.f0 )
-    
-    def calcular_f2(self):
-        self.f2 = self.f ( self.t + 3. * self.h / 8.,
-                           self.x + (3. / 32.) * self.h * self.g0 + (9. / 32.) * self.h * self.g1,
-                           self.y + (3. / 32.) * self.h * self.f0 + (9. / 32.) * self.h * self.f1 )
-        
-    def calcular_f3(self):
-        self.f3 = self.f ( self.t + self.h * (12. / 13.),
-                           self.x + (1932. / 2197.) * self.h * self.g0 - (7200. / 2197.) * self.h * self.g1 +
-                           (7296. / 2197.) * self.h * self.g2,
-                           self.y + (1932. / 2197.) * self.h * self.f0 - (7200. / 2197.) * self.h * self.f1 +
-                           (7296. / 2197.) * self.h * self.f2 )
-        
-    def calcular_f4(self):
-        self.f4 = self.f ( self.t + self.h,
-                           self.x + (439. / 216.) * self.h * self.g0 - 8. * self.h * self.g1 + (3680. / 513.) *
-                           self.h * self.g2 - (845. / 4104.) * self.h * self.g3,
-                           self.y + (439. / 216.) * self.h * self.f0 - 8. * self.h * self.f1 + (3680. / 513.) *
-                           self.h * self.f2 - (845. / 4104.) * self.h * self.f3 )
-        
-    def calcular_f5(self):
-        self.f5 = self.f ( self.t + self.h / 2,
-                           self.x - (8. / 27.) * self.h * self.g0 + 2 * self.h * self.g1 - (3544. / 2565.) * self.h *
-                           self.g2 + (1859. / 4104.) * self.h * self.g3 - (11. / 40.) * self.h * self.g4,
-                           self.y - (8. / 27.) * self.h * self.f0 + 2 * self.h * self.f1 - (3544. / 2565.) * self.h *
-                           self.f2 + (1859. / 4104.) * self.h * self.f3 - (11. / 40.) * self.h * self.f4 )
-    
-
-
-    def calcular_g0(self):
-        self.g0 = self.g ( self.t, 
-                           self.x,
-                           self.y )
-    
-    def calcular_g1(self):
-        self.g1 = self.g ( self.t + self.h / 4.,
-                           self.x + self.h / 4. * self.g0,
-                           self.y + self.h / 4. * self.f0 )
-        
-    def calcular_g2(self):
-        self.g2 = self.g ( self.t + self.h * 3. / 8.,
-                           self.x + (3. / 32.) * self.h * self.g0 + (9. / 32.) * self.h * self.g1,
-                           self.y + (3. / 32.) * self.h * self.f0 + (9. / 32.) * self.h * self.f1 )
-        
-    def calcular_g3(self):
-        self.g3 = self.g ( self.t + self.h * (12. / 13.),
-                           self.x + (1932. / 2197.) * self.h * self.g0 - (7200. / 2197.) * self.h * self.g1 +
-                          (7296. / 2197.) * self.h * self.g2, self.y + (1932. / 2197.) * self.h * self.f0 - 
-                          (7200. / 2197.) * self.h * self.f1 + (7296. / 2197.) * self.h * self.f2 )
-        
-    def calcular_g4(self):
-        self.g4 = self.g ( self.t + self.h,
-                           self.x + (439. / 216.) * self.h * self.g0 - 8. * self.h * self.g1 + (3680. / 513.) *
-                          self.h * self.g2 - (845. / 4104.) * self.h * self.g3,
-                          self.y + (439. / 216.) * self.h * self.f0 - 8. * self.h * self.f1 + (3680. / 513.) *
-                          self.h * self.f2 - (845. / 4104.) * self.h * self.f3 )
-        
-    def calcular_g5(self):
-        self.g5 = self.g( self.t + 0.5 * self.h,
-                          self.x - (8. / 27.) * self.h * self.g0 + 2 * self.h * self.g1 - (3544. / 2565.) * self.h *
-                          self.g2 + (1859. / 4104.) * self.h * self.g3 - (11. / 40.) * self.h * self.g4,
-                          self.y - (8. / 27.) * self.h * self.f0 + 2 * self.h * self.f1 - (3544. / 2565.) * self.h *
-                          self.f2 + (1859. / 4104.) * self.h * self.f3 - (11. / 40.) * self.h * self.f4 )
-
-
-    
+
+    x = property(lambda self: self.estado[0], lambda self, value: self._fijar(0, value))
+    y = property(lambda self: self.estado[1], lambda self, value: self._fijar(1, value))
+    xf = None
+
+    def _fijar(self, i, value):
+        estado = self.estado.copy()
+        estado[i] = value
+        self.estado = estado
+
+    def derivada(self, t, y):
+        return np.array([self.g(t, y[0], y[1]), self.f(t, y[0], y[1])])
+
+    """
+    Each stage gives both derivatives at once, so calcular_fi and calcular_gi compute the same stage of the engine,
+    only once per step: the one called second finds it already computed.
+    """
+    calcular_g0 = _calcular(0)
+    calcular_g1 = _calcular(1)
+    calcular_g2 = _calcular(2)
+    calcular_g3 = _calcular(3)
+    calcular_g4 = _calcular(4)
+    calcular_g5 = _calcular(5)
+
+    f0 = _etapa(0, 1)
+    f1 = _etapa(1, 1)
+    f2 = _etapa(2, 1)
+    f3 = _etapa(3, 1)
+    f4 = _etapa(4, 1)
+    f5 = _etapa(5, 1)
+
+    g0 = _etapa(0, 0)
+    g1 = _etapa(1, 0)
+    g2 = _etapa(2, 0)
+    g3 = _etapa(3, 0)
+    g4 = _etapa(4, 0)
+    g5 = _etapa(5, 0)
+
+
     def actualizar_tiempo(self):
         self.t = self.t + self.h
-        
+        self.etapa = 0
+
     def actualizar_posicion(self):
-        self.x = self.x + self.h * (25. / 216. * self.g0 + 1408. * self.g2 / 2565. + 2197. * self.g3 / 4104. - self.g4 / 5.)
-    
-    def actualizar_velocidad(self):
-        self.y = self.y + self.h * (25. / 216. * self.f0 + 1408. * self.f2 / 2565. + 2197. * self.f3 / 4104. - self.f4 / 5.)
+        self._fijar(0, self.x + self.h * np.dot(self.tabla.B, self.k[:, 0]))
+        self.etapa = 0
 
+    def actualizar_velocidad(self):
+        self._fijar(1, self.y + self.h * np.dot(self.tabla.B, self.k[:, 1]))
+        self.etapa = 0
+        self._aplicar_paso()
 
-    """
-    In the method that calculates the new value of the integration step we calculate one for each function (h_nou_y and 
-    h_nou_x) and then we take the smallest of the two, in order to diminish errors.
-    """
-    def actualizar_paso_integracion(self):
-        Err1 = self.h * (1 / 360. * self.g0 - 128 / 4275. * self.g2 - 2197 / 75240. * self.g3 + 1 / 50. * self.g4 + 2 / 55. * self.g5)
-        Err2 = self.h * (1 / 360. * self.f0 - 128 / 4275. * self.f2 - 2197 / 75240. * self.f3 + 1 / 50. * self.f4 + 2 / 55. * self.f5)
-        h_nou_y = 0.9 * self.h * (self.h * self.error / (abs (Err1))) ** (1. / 4.)
-        h_nou_x = 0.9 * self.h * (self.h * self.error / (abs (Err2))) ** (1. / 4.)
-        h_nou = min (h_nou_x, h_nou_y)
-
-        if h_nou < self.h:
-            self.r = False
-            self.h = h_nou
 
     def fill_lists(self, lista_t, lista_x, lista_y, lista_h):
         lista_t.append(self.t)
         lista_x.append(self.x)
         lista_y.append(self.y)
-        lista_h.append(self.h)
\ No newline at end of file
+        lista_h.append(self.h)
@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Method RungeKutta_ensemble.
+It allows to integrate many independent copies (members) of the same system y' = f(t, y) at once, with the adaptive
+step of RungeKutta_nd and any of its tableaus. All the members advance together as NumPy arrays, but every one of
+them keeps its own integration step and its own accept/reject decision. The members that reach tf leave the active
+set, so the cost of a step decreases while the ensemble finishes.
+A member whose error estimate is not finite (f returned nan or inf) or whose step became too small to advance its time
+fails: it is frozen at its last accepted point, flagged in fallidos and dropped from the active set, while the rest
+of the ensemble goes on.
+"""
+
+import numpy as np
+from Tableaus import obtener
+from Step_Control import Controlador, paso_minimo
+
+
+
+class RungeKutta_ensemble(object):
+    """
+    Builder of RungeKutta_ensemble class. We give the needed data in order to solve the problem:
+    t: Initial time, a number or an array with one value per member.
+    y: Initial states, an array of shape (m, n) for m members of n components.
+    tf: Final time, a number or an array with one value per member.
+    h: Initial integration step, a number or an array with one value per member. If it is None, the controller
+    chooses the initial step of every member.
+    error: Desired error, used as absolute and relative tolerance when control is not given.
+    f: Function f(t, y, *params) evaluated for a block of members: t has shape (k,), y shape (k, n), and it returns
+    the derivatives with shape (k, n).
+    params: Sequence of per-member parameters (numbers or arrays of length m). Only the values of the active members
+    are given to f, in the same order as the rows of y.
+    tabla: Butcher tableau, as in RungeKutta_nd.
+    control: Step controller, as in RungeKutta_nd. It must be an elementary Controlador, which works on the arrays
+    of all the members at once.
+    The first stage of every member (f at its current point) is kept in self.k0, so it is not computed again when a
+    step is rejected, and with a FSAL tableau it is the last stage of the accepted step.
+    self.fallidos is True for the members that failed, which stay at the time self.t where they failed.
+    """
+    def __init__(self, t, y, tf, h, error, f=None, params=(), tabla='RKF45', control=None, *args, **kwargs):
+        self.estado = np.array(y, dtype=float, ndmin=2)
+        m = self.estado.shape[0]
+        self.t = np.full(m, t, dtype=float)
+        self.tf = np.full(m, tf, dtype=float)
+        self.h = None if h is None else np.full(m, h, dtype=float)
+        self.error = error
+        self.f = f
+        self.params = [np.full(m, p, dtype=float) for p in params]
+        self.tabla = obtener(tabla)
+        self.control = control if control is not None else Controlador(error, error)
+        self.k0 = None
+        self.pasos = np.zeros(m, dtype=int)  #Accepted steps of every member.
+        self.rechazos = np.zeros(m, dtype=int)  #Rejected steps of every member.
+        self.rechazado = np.zeros(m, dtype=bool)  #If the last step of every member was rejected.
+        self.fallidos = np.zeros(m, dtype=bool)  #Members stopped by a non-finite error or a too small step.
+        self.activos = np.flatnonzero(self.t < self.tf)  #Indices of the members that have not finished.
+
+    def paso(self):
+        """
+        Tries one step for all the active members. Every member is accepted or rejected on its own, then the
+        members that reached tf or failed are written back and dropped from the active set. Returns the number of
+        members still active.
+        """
+        idx = self.activos
+        t, y = self.t[idx], self.estado[idx]
+        params = [p[idx] for p in self.params]
+        tabla = self.tabla
+        if self.k0 is None:
+            self.k0 = np.empty_like(self.estado)
+            self.k0[idx] = self.f(t, y, *params)
+        if self.h is None:
+            self.h = np.zeros_like(self.t)
+            h0 = self.control.paso_inicial(lambda t, y: self.f(t, y, *params), t, y, self.k0[idx],
+                                           tabla.orden_error + 1)
+            self.h[idx] = h0
+        h = np.minimum(self.h[idx], self.tf[idx] - t)  #A given first step is also clipped to tf.
+
+        k = np.empty((tabla.etapas,) + y.shape)
+        k[0] = self.k0[idx]
+        for i in range(1, tabla.etapas):
+            yi = y + h[:, None] * np.tensordot(tabla.A[i, :i], k[:i], axes=1)
+            k[i] = self.f(t + tabla.C[i] * h, yi, *params)
+
+        y_nou = y + h[:, None] * np.tensordot(tabla.B, k, axes=1)
+        err = tabla.norma_error(k, h, self.control.escala(y, y_nou))
+        acc, h_nou = self.control.proponer(h, err, tabla.orden_error + 1, rechazado=self.rechazado[idx])
+        fallo = ~acc & ~(np.abs(h_nou) >= paso_minimo(t))  #Also true for a nan step, from a non-finite error.
+
+        y[acc] = y_nou[acc]
+        t[acc] += h[acc]
+        if tabla.fsal:
+            self.k0[idx[acc]] = k[-1, acc]
+        elif acc.any():
+            self.k0[idx[acc]] = self.f(t[acc], y[acc], *[p[acc] for p in params])
+        h = np.where(t < self.tf[idx], np.minimum(h_nou, self.tf[idx] - t), h_nou)
+
+        self.estado[idx], self.t[idx], self.h[idx] = y, t, h
+        self.pasos[idx[acc]] += 1
+        self.rechazos[idx[~acc]] += 1
+        self.rechazado[idx] = ~acc
+        self.fallidos[idx[fallo]] = True
+        self.activos = idx[(t < self.tf[idx]) & ~fallo]
+        return self.activos.size
+
+    def integrar(self):
+        """
+        Integrates all the members until their tf and returns the final states. The failed members keep the state
+        where they failed: check self.fallidos.
+        """
+        while self.activos.size:
+            self.paso()
+        return self.estado
+
+
+
+if __name__ == '__main__':
+    """
+    Sweep of the van der Pol problem of Exe_runge_kutta_2D over initial positions and damping coefficients.
+    """
+    def van_der_pol(t, y, mu): return np.stack((y[:, 1], mu * (1. - y[:, 0] ** 2.) * y[:, 1] - y[:, 0]), axis=1)
+
+    x0, mu = np.meshgrid(np.linspace(0.01, 2., 100), np.linspace(1., 4., 100))
+    y0 = np.stack((x0.ravel(), np.zeros(x0.size)), axis=1)
+    ens = RungeKutta_ensemble(0., y0, 50., 0.5, 10 ** (-6), f=van_der_pol, params=(mu.ravel(),))
+    ens.integrar()
+    print('members: {}, accepted steps: {} (mean {:.1f}), rejected steps: {}, failed: {}'.format(
+        y0.shape[0], ens.pasos.sum(), ens.pasos.mean(), ens.rechazos.sum(), ens.fallidos.sum()))
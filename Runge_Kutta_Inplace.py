@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Method RungeKutta_inplace.
+It integrates y' = f(t, y) as RungeKutta_nd, with any of its tableaus and controllers, for very large systems (the
+method of lines for a PDE, with 10^5 or 10^6 states), where the time goes to the memory and not to the arithmetic.
+f is given in place, f(t, y, out), and writes the derivative in out, and all the arrays of a step (the argument of
+every stage, the new state, the scales of the error) are allocated once, when the object is built: the stages are
+combined with np.dot(..., out=...) and in place operations, so a step does not allocate any array of the size of
+the state.
+The state array is reused: self.estado and the one of the previous step swap their memory, so a state given by iterar
+or kept from self.estado must be copied if it is needed after the next step. The Recorder of integrar copies it.
+The operations are the ones of RungeKutta_nd in the same order, so with an f that does the same arithmetic as the
+f(t, y) given to RungeKutta_nd both take the same steps and give the same states, bit for bit. An f written in
+another order (for instance u[i-1] - u[i] + u[i+1] - u[i] instead of u[i-1] - 2 u[i] + u[i+1]) only agrees to the
+rounding, and the steps may then drift apart by some units of the last place.
+"""
+
+import numpy as np
+from Runge_Kutta import RungeKutta_nd
+
+
+
+class RungeKutta_inplace(RungeKutta_nd):
+    """
+    Builder of RungeKutta_inplace class. The data are the ones of RungeKutta_nd, but:
+    f: Function f(t, y, out) that writes the derivative of the state y in the array out, without allocating it.
+    y and out are float arrays with the length of the state. y must not be kept or changed by f.
+    """
+    def __init__(self, t, y, tf, h, error, f=None, tabla='RKF45', control=None, *args, **kwargs):
+        super(RungeKutta_inplace, self).__init__(t, y, tf, h, error, f, tabla, control, *args, **kwargs)
+        n = self.estado.size
+        self._argumento = np.empty(n)  #Argument of the stage being computed.
+        self._nou = np.empty(n)  #Solution of the step, it becomes the state when the step is accepted.
+        self._escala = np.empty(n)
+        self._trabajo = np.empty(n)
+        self._calculado = False  #If self._nou is the solution of the current stages.
+
+    def derivada(self, t, y, out=None):
+        """
+        Evaluates f in out, or in a new array if out is not given (only outside the steps: the initial step).
+        """
+        if out is None:
+            out = np.empty(self.estado.size)
+        self.f(t, y, out)
+        return out
+
+    def calcular_etapa(self, i):
+        while self.etapa <= i:
+            j = self.etapa
+            if j:
+                y = self._argumento
+                np.dot(self.tabla.A[j, :j], self.k[:j], out=y)
+                y *= self.h
+                y += self.estado
+            else:
+                y = self.estado
+            self.derivada(self.t + self.tabla.C[j] * self.h, y, self.k[j])
+            self.etapa += 1
+            self._calculado = False
+
+    def _solucion(self):
+        np.dot(self.tabla.B, self.k, out=self._nou)
+        self._nou *= self.h
+        self._nou += self.estado
+        self._calculado = True
+
+    def intentar(self):
+        self.calcular_etapas()
+        self._solucion()
+        #The scale of Controlador.escala, atol + rtol * max(|y|, |y_nou|).
+        np.abs(self.estado, out=self._escala)
+        np.abs(self._nou, out=self._trabajo)
+        np.maximum(self._escala, self._trabajo, out=self._escala)
+        self._escala *= self.control.rtol
+        self._escala += self.control.atol
+        err = self.tabla.norma_error(self.k, self.h, self._escala, out=self._trabajo)
+        return self.control.proponer(self.h, err, self.tabla.orden_error + 1)
+
+    def actualizar_estado(self):
+        if not self._calculado:
+            self._solucion()
+        self.estado, self._nou = self._nou, self.estado
+        self._calculado = False
+        self.t = self.t + self.h
+        if self.tabla.fsal:
+            self.k[0] = self.k[-1]
+            self.etapa = 1
+        else:
+            self.etapa = 0
+
+    def estimar_error(self):
+        np.dot(self.tabla.E, self.k, out=self._trabajo)
+        self._trabajo *= self.h
+        return self._trabajo
+
+
+
+if __name__ == '__main__':
+    """
+    Heat equation u_t = u_xx on [0, 1] with u = 0 at the ends, by the method of lines with 10^5 points, with
+    RungeKutta_nd and RungeKutta_inplace: time of the integration and memory allocated by a step. f_inplace does the
+    arithmetic of f in the same order, so both give the same solution bit for bit.
+    """
+    import timeit
+    import tracemalloc
+
+    n = 100000
+    dx = 1. / (n + 1)
+    x = np.linspace(dx, 1. - dx, n)
+    u0 = np.sin(np.pi * x) + 0.1 * np.sin(7. * np.pi * x)
+    tf = 50. * dx ** 2
+
+    def f(t, u):
+        du = np.empty_like(u)
+        du[1:-1] = u[:-2] - 2. * u[1:-1] + u[2:]
+        du[0], du[-1] = u[1] - 2. * u[0], u[-2] - 2. * u[-1]
+        return du / dx ** 2
+
+    def f_inplace(t, u, out):
+        np.multiply(u[1:-1], -2., out=out[1:-1])
+        out[1:-1] += u[:-2]
+        out[1:-1] += u[2:]
+        out[0], out[-1] = u[1] - 2. * u[0], u[-2] - 2. * u[-1]
+        out /= dx ** 2
+
+    finales = []
+    for nombre, clase, g in (('RungeKutta_nd', RungeKutta_nd, f),
+                             ('RungeKutta_inplace', RungeKutta_inplace, f_inplace)):
+        rk = clase(0., u0, tf, dx ** 2 / 4, 1e-6, f=g, tabla='DOPRI5')
+        rk.paso()
+        tracemalloc.start()
+        rk.paso()
+        pico = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        rk = clase(0., u0, tf, dx ** 2 / 4, 1e-6, f=g, tabla='DOPRI5')
+        inicio = timeit.default_timer()
+        rec = rk.integrar()
+        print('{}: {} steps, {:.3f} s, {:.1f} kB allocated by a step, u(0.5) = {:.10f}'.format(
+            nombre, len(rec) - 1, timeit.default_timer() - inicio, pico / 1024., rk.estado[n // 2]))
+        finales.append((rec.t.copy(), rk.estado.copy()))
+    igual = all(np.array_equal(a, b) for a, b in zip(*finales))
+    assert igual, 'RungeKutta_inplace does not reproduce RungeKutta_nd'
+    print('Same steps and final state bit for bit: {}'.format(igual))
@@ -0,0 +1,261 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Functions integrar_compilado, integrar_1d and integrar_2d.
+They run the adaptive integration of RungeKutta_nd as a single compiled loop with Numba: the user functions and the
+whole stepping loop (stages, error control, retries and the recording of the steps) are compiled together, so there
+are no method calls or attribute lookups per step. The step control is the one of RungeKutta_nd with the elementary
+Controlador, so both give the same steps (up to the rounding of the sums) and the result is the same Recorder.
+Numba is optional: if it is not installed, the same functions integrate with the pure Python classes.
+"""
+
+import numpy as np
+from Recorder import Recorder
+from Runge_Kutta import RungeKutta, RungeKutta_2d, RungeKutta_nd
+from Step_Control import Controlador
+from Tableaus import obtener
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+NUMBA = numba is not None
+
+
+
+def _bucle(f, t, y, tf, h, A, B, C, E, E3, fsal, atol, rtol, seguridad, fac_min, fac_max, k_exp, rechazado,
+           capacidad):
+    """
+    Adaptive loop of RungeKutta_nd.integrar with the elementary controller. Returns the arrays of the recorded times,
+    states and steps, the number of accepted and rejected steps, if the last step was rejected and a failure code
+    with the time and step where it happened: 0 if the loop reached tf, 1 if the error estimate was not finite and 2
+    if the step became too small. The compiled loop cannot raise formatted errors, integrar_compilado raises them.
+    """
+    n = y.size
+    s = C.size
+    k = np.zeros((s, n))
+    yi = np.empty(n)
+    y_nou = np.empty(n)
+    lista_t = np.empty(capacidad)
+    lista_y = np.empty((capacidad, n))
+    lista_h = np.empty(capacidad)
+    lista_t[0] = t
+    lista_y[0] = y
+    lista_h[0] = h
+    m = 1
+    aceptados = 0
+    rechazados = 0
+    k[0] = f(t, y)
+
+    while t < tf:
+        for i in range(1, s):
+            for c in range(n):
+                suma = 0.
+                for j in range(i):
+                    suma += A[i, j] * k[j, c]
+                yi[c] = y[c] + h * suma
+            k[i] = f(t + C[i] * h, yi)
+
+        err = 0.
+        err3 = 0.
+        finito = True  #max() drops a nan, so the components are checked one by one.
+        for c in range(n):
+            suma = 0.
+            suma_e = 0.
+            suma_e3 = 0.
+            for j in range(s):
+                suma += B[j] * k[j, c]
+                suma_e += E[j] * k[j, c]
+                suma_e3 += E3[j] * k[j, c]
+            y_nou[c] = y[c] + h * suma
+            escala = atol[c] + rtol[c] * max(abs(y[c]), abs(y_nou[c]))
+            e = abs(h * suma_e) / escala
+            finito = finito and np.isfinite(e) and np.isfinite(y_nou[c])
+            err = max(err, e)
+            err3 = max(err3, abs(h * suma_e3) / escala)
+        if E3.any() and err > 0.:
+            err = err ** 2 / np.sqrt(err ** 2 + 0.01 * err3 ** 2)
+
+        if not finito:
+            rechazados += 1
+            return lista_t[:m], lista_y[:m], lista_h[:m], aceptados, rechazados, True, 1, t, h
+        fac = seguridad * err ** (-1. / k_exp) if err > 0. else fac_max
+        fac = min(max(fac, fac_min), fac_max)
+        if not (err <= 1.):
+            rechazados += 1
+            rechazado = True
+            h_nou = h * min(fac, 1.)
+            if abs(h_nou) < 10. * np.spacing(abs(t)):  #Step_Control.paso_minimo.
+                return lista_t[:m], lista_y[:m], lista_h[:m], aceptados, rechazados, True, 2, t, h_nou
+            h = h_nou
+            continue
+
+        aceptados += 1
+        if rechazado:
+            fac = min(fac, 1.)  #The first accepted step after a rejection does not grow.
+            rechazado = False
+        t = t + h
+        y = y_nou.copy()
+        if fsal:
+            k[0] = k[s - 1]
+        else:
+            k[0] = f(t, y)
+        h_nou = h * fac
+        h = min(h_nou, tf - t) if t < tf else h_nou
+
+        if m == lista_t.size:
+            lista_t = np.concatenate((lista_t, np.empty(m)))
+            lista_y = np.concatenate((lista_y, np.empty((m, n))))
+            lista_h = np.concatenate((lista_h, np.empty(m)))
+        lista_t[m] = t
+        lista_y[m] = y
+        lista_h[m] = h
+        m += 1
+
+    return lista_t[:m], lista_y[:m], lista_h[:m], aceptados, rechazados, rechazado, 0, t, h
+
+
+if NUMBA:
+    _bucle = numba.njit(_bucle)
+
+    """
+    Compiled functions by the Python function, so a function is compiled only once.
+    """
+    _compiladas = {}
+
+    def _compilar(f):
+        if isinstance(f, numba.core.dispatcher.Dispatcher):
+            return f
+        if f not in _compiladas:
+            _compiladas[f] = numba.njit(f)
+        return _compiladas[f]
+
+    def _derivada_1d(f):
+        """
+        Compiled f(t, y) of the state (y) for a function f(x, y) of numbers.
+        """
+        if (f,) not in _compiladas:
+            fc = _compilar(f)
+            _compiladas[(f,)] = numba.njit(lambda t, estado: np.array([fc(t, estado[0])]))
+        return _compiladas[(f,)]
+
+    def _derivada_2d(f, g):
+        """
+        Compiled f(t, y) of the state (x, y) for the functions f and g of (t, x, y).
+        """
+        if (f, g) not in _compiladas:
+            fc, gc = _compilar(f), _compilar(g)
+            _compiladas[(f, g)] = numba.njit(
+                lambda t, estado: np.array([gc(t, estado[0], estado[1]), fc(t, estado[0], estado[1])]))
+        return _compiladas[(f, g)]
+
+
+
+def integrar_compilado(f, t, y, tf, h, error, tabla='RKF45', control=None, capacidad=1024):
+    """
+    Integrates y' = f(t, y) from t to tf as RungeKutta_nd(t, y, tf, h, error, f, tabla, control).integrar() and
+    returns the Recorder with the initial point and the accepted steps.
+    f: Function f(t, y) that returns the derivative as a NumPy array. It must be compilable by Numba in nopython
+    mode (or already be a Numba function).
+    control: Controlador, Controlador(error, error) by default. The PI controller is not compiled: with it the pure
+    Python engine is used. Its counters are updated with the steps of the integration.
+    capacidad: Initial length of the arrays of the loop, doubled when they are full.
+    Raises RuntimeError, as RungeKutta_nd.paso, if the error estimate is not finite or the step becomes too small.
+    Without Numba it integrates with RungeKutta_nd.
+    """
+    control = control if control is not None else Controlador(error, error)
+    if not NUMBA or type(control) is not Controlador:
+        return RungeKutta_nd(t, y, tf, h, error, f, tabla, control).integrar()
+
+    f = _compilar(f)
+    tabla = obtener(tabla)
+    y = np.atleast_1d(np.array(y, dtype=float))
+    if h is None:
+        h = control.paso_inicial(f, t, y, f(t, y), tabla.orden_error + 1)
+    if t < tf and tf - t <= h * (1. + 1e-8):
+        h = tf - t  #A given step is also clipped to tf, as in RungeKutta_nd.paso_inicial.
+    E3 = tabla.E3 if tabla.E3 is not None else np.zeros(tabla.etapas)
+    atol = np.broadcast_to(control.atol, y.shape).astype(float)
+    rtol = np.broadcast_to(control.rtol, y.shape).astype(float)
+    lista_t, lista_y, lista_h, aceptados, rechazados, rechazado, fallo, t, h = _bucle(
+        f, float(t), y, float(tf), float(h), tabla.A, tabla.B, tabla.C, tabla.E, E3, tabla.fsal, atol, rtol,
+        float(control.seguridad), float(control.fac_min), float(control.fac_max), float(tabla.orden_error + 1),
+        bool(control.rechazado), capacidad)
+    control.aceptados += aceptados
+    control.rechazados += rechazados
+    control.rechazado = rechazado
+    if fallo == 1:
+        raise RuntimeError('The error estimate is not finite at t = {} with h = {:.3e}: f returned nan or inf'.format(
+            t, h))
+    if fallo == 2:
+        raise RuntimeError('The step became too small at t = {} (h = {:.3e})'.format(t, h))
+
+    rec = Recorder(y.size, capacidad=lista_t.size)
+    rec.extend(lista_t, lista_y, lista_h)
+    return rec
+
+
+def integrar_1d(f, x, y, xf, h, error, tabla='RKF45', control=None):
+    """
+    Compiled version of RungeKutta(x, y, xf, h, error) with obj.f = f (a function f(x, y) of numbers), followed by
+    integrar(). Without Numba it integrates with RungeKutta.
+    """
+    if not NUMBA or (control is not None and type(control) is not Controlador):
+        rk = RungeKutta(x, y, xf, h, error, tabla=tabla, control=control)
+        rk.f = f
+        return rk.integrar()
+
+    return integrar_compilado(_derivada_1d(f), x, [y], xf, h, error, tabla, control)
+
+
+def integrar_2d(f, g, t, x, y, tf, h, error, tabla='RKF45', control=None):
+    """
+    Compiled version of RungeKutta_2d(t, x, y, tf, h, error) with obj.f = f (dy/dt) and obj.g = g (dx/dt), both
+    functions of (t, x, y), followed by integrar(). Without Numba it integrates with RungeKutta_2d.
+    """
+    if not NUMBA or (control is not None and type(control) is not Controlador):
+        rk = RungeKutta_2d(t, x, y, tf, h, error, tabla=tabla, control=control)
+        rk.f, rk.g = f, g
+        return rk.integrar()
+
+    return integrar_compilado(_derivada_2d(f, g), t, [x, y], tf, h, error, tabla, control)
+
+
+
+if __name__ == '__main__':
+    """
+    Comparison with the Python classes on the problems of Exe_runge_kutta_1D and Exe_runge_kutta_2D. The first call
+    of every compiled function includes its compilation, so it is timed apart.
+    """
+    import timeit
+
+    def f_1d(x, y): return (1. / (x ** 2.) + 4. * (x - 6.) * np.exp(-2. * (x - 6.) ** 2.)) * (-1.)
+    def f_vdp(t, x, v): return 4. * (1. - x ** 2.) * v - x
+    def g(t, x, v): return v
+
+    def python_1d():
+        rk = RungeKutta(1., 1., 10., 0.01, 1e-6)
+        rk.f = f_1d
+        return rk.integrar()
+
+    def python_2d():
+        rk = RungeKutta_2d(0., 2., 0., 50., 0.5, 1e-6)
+        rk.f, rk.g = f_vdp, g
+        return rk.integrar()
+
+    problemas = (('1D', python_1d, lambda: integrar_1d(f_1d, 1., 1., 10., 0.01, 1e-6)),
+                 ('2D van der Pol', python_2d, lambda: integrar_2d(f_vdp, g, 0., 2., 0., 50., 0.5, 1e-6)))
+    print('Numba: {}'.format('yes' if NUMBA else 'no, the pure Python engine is used'))
+    for nombre, python, compilado in problemas:
+        inicio = timeit.default_timer()
+        rec = compilado()
+        primera = timeit.default_timer() - inicio
+        ref = python()
+        t_python = min(timeit.repeat(python, number=1, repeat=5))
+        t_compilado = min(timeit.repeat(compilado, number=1, repeat=5))
+        print('{}: {} steps (Python {}), max difference {:.1e}, Python {:.2f} ms, compiled {:.3f} ms '
+              '(x{:.0f}), first call {:.2f} s'.format(
+                  nombre, len(rec), len(ref), np.max(np.abs(rec.y - ref.y)) if len(rec) == len(ref) else np.nan,
+                  1e3 * t_python, 1e3 * t_compilado, t_python / t_compilado, primera))
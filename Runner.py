@@ -0,0 +1,278 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Command line runner of problems given as JSON or TOML specs, for batch jobs without a display:
+python -m Runner problem.json [other.toml ...] [--no-plot] [-q]
+python -m Runner --cold-start [BUDGET]
+A spec gives the problem and what to do with it (the keys are the ones of the problems of Benchmarks):
+{
+    "nombre": "van der Pol",                   (optional, the name of the file by default)
+    "f": "Exe_runge_kutta_2D:f_1",             (module:function, the module may also be the path of a .py file,
+                                                relative to the spec)
+    "forma": "txv",                            (signature of f: "ty" f(t, y) of the state, by default; "xy" f(x, y)
+    "g": "Exe_runge_kutta_2D:g",                of numbers as in Exe_runge_kutta_1D; "txv" f and g of (t, x, v) as in
+                                                Exe_runge_kutta_2D, f gives dv/dt and g dx/dt)
+    "jac": "module:function",                  (optional, jac(t, y) for the implicit solvers)
+    "t0": 0, "tf": 50, "y0": [2, 0],
+    "h": null, "tol": 1e-6, "atol": 1e-6,      (h null lets the controller choose it; atol is tol by default)
+    "solver": "RungeKutta_nd",                 (RungeKutta_nd, Rosenbrock_nd, RungeKutta_auto or module:Class)
+    "tabla": "DOPRI5", "control": "PI",        (optional, the tableau and the PI controller, null or absent for the
+                                                elementary one)
+    "t_eval": 501,                             (optional, a list of times or a number of equispaced ones)
+    "salida": "resultados/vdp.npz",            (.npz or .csv file, or a directory for a MemmapRecorder)
+    "grafica": "resultados/vdp.png"            (optional, the components against t)
+}
+A file may also hold a list of specs under "problemas". The solution (t, y, h) is written to salida and the
+statistics of the integration (evaluations, steps, times) to a JSON file next to it (salida.json, as vdp.npz.json,
+or stats.json in the directory). A spec whose outputs would overwrite one of the spec files given fails before it is
+integrated. matplotlib is only imported if some spec asks for a figure.
+--cold-start measures the time this runner takes to start (to import it and the solvers), the best of some runs in
+new processes, and fails if it is over the budget in seconds.
+"""
+
+import argparse
+import importlib
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import timeit
+
+import numpy as np
+
+PRESUPUESTO = 0.5  #Budget of the cold start, in seconds.
+
+"""
+Solvers by name, imported only when a spec uses them.
+"""
+SOLVERS = {
+    'RungeKutta_nd': 'Runge_Kutta:RungeKutta_nd',
+    'Rosenbrock_nd': 'Stiff:Rosenbrock_nd',
+    'RungeKutta_auto': 'Stiff:RungeKutta_auto',
+}
+
+_modulos = {}
+
+
+
+def _cargar(referencia, directorio='.'):
+    """
+    Object of a reference 'module:name'. The module is imported by name or, if it ends in .py, from its file.
+    """
+    modulo, nombre = referencia.rsplit(':', 1)
+    if modulo.endswith('.py'):
+        ruta = os.path.abspath(os.path.join(directorio, modulo))
+        if ruta not in _modulos:
+            spec = importlib.util.spec_from_file_location(os.path.splitext(os.path.basename(ruta))[0], ruta)
+            _modulos[ruta] = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(_modulos[ruta])
+        return getattr(_modulos[ruta], nombre)
+    if directorio not in sys.path:
+        sys.path.append(directorio)
+    return getattr(importlib.import_module(modulo), nombre)
+
+
+def leer(archivo):
+    """
+    List of the specs of a JSON or TOML file, each with the directory of the file in '_directorio' and its path in
+    '_archivo'. Raises ValueError
+    if the file does not hold specs, besides the errors of reading and parsing it.
+    """
+    if archivo.endswith('.toml'):
+        try:
+            import tomllib
+        except ImportError:
+            import tomli as tomllib
+        with open(archivo, 'rb') as fichero:
+            datos = tomllib.load(fichero)
+    else:
+        with open(archivo) as fichero:
+            datos = json.load(fichero)
+    specs = datos.get('problemas', [datos]) if isinstance(datos, dict) else None
+    if not isinstance(specs, list) or not all(isinstance(spec, dict) for spec in specs):
+        raise ValueError('The file must hold a spec or a list of specs under "problemas"')
+    base = os.path.splitext(os.path.basename(archivo))[0]
+    for i, spec in enumerate(specs):
+        spec.setdefault('nombre', base if len(specs) == 1 else '{}_{}'.format(base, i))
+        spec['_directorio'] = os.path.dirname(os.path.abspath(archivo))
+        spec['_archivo'] = os.path.abspath(archivo)
+    return specs
+
+
+def _derivada(spec):
+    """
+    f(t, y) of the state for the signature of the spec.
+    """
+    directorio = spec['_directorio']
+    f = _cargar(spec['f'], directorio)
+    forma = spec.get('forma', 'ty')
+    if forma == 'ty':
+        return f
+    if forma == 'xy':
+        return lambda t, y: np.array([f(t, y[0])])
+    if forma == 'txv':
+        g = _cargar(spec['g'], directorio)
+        return lambda t, y: np.array([g(t, y[0], y[1]), f(t, y[0], y[1])])
+    raise ValueError('Unknown forma {}, it must be ty, xy or txv'.format(forma))
+
+
+def construir(spec):
+    """
+    Solver object of a spec. Raises ValueError if the spec lacks a needed key or has an unknown control.
+    """
+    faltan = [clave for clave in ('f', 't0', 'y0', 'tf') if spec.get(clave) is None]
+    if faltan:
+        raise ValueError('The spec has no {}'.format(', '.join(faltan)))
+    nombre_control = (spec.get('control') or '').upper()
+    if nombre_control not in ('', 'PI'):
+        raise ValueError('Unknown control {}, it must be PI or null for the elementary controller'.format(
+            spec['control']))
+    clase = _cargar(SOLVERS.get(spec.get('solver', 'RungeKutta_nd'), spec.get('solver')), spec['_directorio'])
+    tol = spec.get('tol', 1e-6)
+    kwargs = {'f': _derivada(spec)}
+    if 'tabla' in spec:
+        kwargs['tabla'] = spec['tabla']
+    if 'control' in spec or 'atol' in spec:
+        from Step_Control import Controlador, ControladorPI
+        control = ControladorPI if nombre_control == 'PI' else Controlador
+        kwargs['control'] = control(spec.get('atol', tol), tol)
+    if 'jac' in spec:
+        kwargs['jac'] = _cargar(spec['jac'], spec['_directorio'])
+    return clase(spec['t0'], spec['y0'], spec['tf'], spec.get('h'), tol, **kwargs)
+
+
+def _estadisticas(stats):
+    nombres = ('nfev', 'njev', 'aceptados', 'rechazados', 'h_min', 'h_max', 'h_medio', 'tiempo_total',
+               'tiempo_derivada', 'tiempo_jacobiano', 'tiempo_gestion')
+    return dict((nombre, float(getattr(stats, nombre))) for nombre in nombres)
+
+
+def _ruta(spec, archivo):
+    return os.path.abspath(archivo if os.path.isabs(archivo) else os.path.join(spec['_directorio'], archivo))
+
+
+def ejecutar(spec, graficas=True, protegidos=()):
+    """
+    Integrates the problem of a spec, writes its solution and its statistics and returns the statistics as a
+    dictionary.
+    protegidos: Paths of files that must not be written, besides the file of the spec (the spec files of a run).
+    Raises ValueError, before integrating, if an output of the spec is one of them.
+    """
+    salida = _ruta(spec, spec.get('salida', spec['nombre'] + '.npz'))
+    memoria = os.path.splitext(salida)[1] == ''
+    if memoria:
+        informe = os.path.join(salida, 'stats.json')
+        destinos = [salida, informe] + [os.path.join(salida, nombre) for nombre in
+                                        ('meta.json', 't.bin', 'y.bin', 'h.bin')]
+    else:
+        informe = salida + '.json'
+        destinos = [salida, informe]
+    if graficas and spec.get('grafica'):
+        destinos.append(_ruta(spec, spec['grafica']))
+    protegidos = set(os.path.realpath(archivo) for archivo in list(protegidos) + [spec.get('_archivo')] if archivo)
+    for destino in destinos:
+        if os.path.realpath(destino) in protegidos:
+            raise ValueError('The output {} would overwrite a spec file'.format(destino))
+
+    rk = construir(spec)
+    kwargs = {'estadisticas': True}
+    t_eval = spec.get('t_eval')
+    if t_eval is not None:
+        kwargs['t_eval'] = np.linspace(spec['t0'], spec['tf'], t_eval) if np.ndim(t_eval) == 0 else t_eval
+    if memoria:
+        from Memmap_Recorder import MemmapRecorder
+        kwargs['recorder'] = MemmapRecorder(salida, rk.estado.size)
+
+    inicio = timeit.default_timer()
+    rec = rk.integrar(**kwargs)
+    tiempo = timeit.default_timer() - inicio
+
+    if memoria:
+        rec.cerrar()
+    else:
+        directorio = os.path.dirname(salida)
+        if directorio and not os.path.isdir(directorio):
+            os.makedirs(directorio)
+        if salida.endswith('.csv'):
+            columnas = np.column_stack((rec.t, rec.y, rec.h))
+            cabecera = ','.join(['t'] + ['y{}'.format(i) for i in range(rec.y.shape[1])] + ['h'])
+            np.savetxt(salida, columnas, delimiter=',', header=cabecera, comments='')
+        else:
+            np.savez(salida, t=rec.t, y=rec.y, h=rec.h)
+    resultado = {'nombre': spec['nombre'], 'salida': salida, 'puntos': len(rec), 'tiempo': tiempo,
+                 't_final': float(rk.t), 'y_final': [float(v) for v in rk.estado],
+                 'estadisticas': _estadisticas(rec.estadisticas)}
+    with open(informe, 'w') as fichero:
+        json.dump(resultado, fichero, indent=2)
+
+    if graficas and spec.get('grafica'):
+        from Picture_1 import Picture
+        archivo = _ruta(spec, spec['grafica'])
+        items = [{'x': rec.t, 'y': rec.y[:, i], 'legend': 'y{}'.format(i)} for i in range(rec.y.shape[1])]
+        Picture({'items': items, 'title': spec['nombre'], 'xlabel': 't', 'file': archivo}, pyplot=False).show_plot()
+    return resultado
+
+
+def arranque(repeticiones=5):
+    """
+    Cold start of the runner: the best time, over repeticiones new processes, to import it with the explicit
+    solvers, minus the start of the interpreter alone. Also tells if matplotlib was imported.
+    """
+    codigo = 'import sys, Runner, Runge_Kutta, Step_Control; sys.stdout.write(str("matplotlib" in sys.modules))'
+    directorio = os.path.dirname(os.path.abspath(__file__))
+
+    def mejor(argumentos):
+        tiempos, salida = [], ''
+        for i in range(repeticiones):
+            inicio = timeit.default_timer()
+            salida = subprocess.check_output([sys.executable] + argumentos, cwd=directorio, universal_newlines=True)
+            tiempos.append(timeit.default_timer() - inicio)
+        return min(tiempos), salida
+
+    vacio, _ = mejor(['-c', 'pass'])
+    tiempo, matplotlib = mejor(['-c', codigo])
+    return tiempo - vacio, matplotlib == 'True'
+
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Runs the problems of JSON or TOML specs.')
+    parser.add_argument('specs', nargs='*', help='JSON or TOML files with the specs')
+    parser.add_argument('--no-plot', action='store_true', help='do not make the figures of the specs')
+    parser.add_argument('-q', '--quiet', action='store_true', help='do not write a line per problem')
+    parser.add_argument('--cold-start', nargs='?', type=float, const=PRESUPUESTO, metavar='BUDGET',
+                        help='measure the start time and fail if it is over BUDGET seconds ({} by default)'.format(
+                            PRESUPUESTO))
+    args = parser.parse_args()
+
+    if args.cold_start is not None:
+        tiempo, matplotlib = arranque()
+        print('Cold start {:.3f} s (budget {:.3f} s), matplotlib imported: {}'.format(
+            tiempo, args.cold_start, matplotlib))
+        sys.exit(0 if tiempo <= args.cold_start and not matplotlib else 1)
+    if not args.specs:
+        parser.error('no specs given')
+
+    fallos = 0
+    protegidos = [os.path.abspath(archivo) for archivo in args.specs]
+    for archivo in args.specs:
+        try:
+            specs = leer(archivo)
+        except Exception as error:
+            fallos += 1
+            sys.stderr.write('{}: {}: {}\n'.format(archivo, type(error).__name__, error))
+            continue
+        for spec in specs:
+            try:
+                r = ejecutar(spec, graficas=not args.no_plot, protegidos=protegidos)
+            except Exception as error:
+                fallos += 1
+                sys.stderr.write('{}: {}: {}\n'.format(spec['nombre'], type(error).__name__, error))
+                continue
+            if not args.quiet:
+                e = r['estadisticas']
+                print('{}: {} points, {:.0f} nfev, {:.0f} accepted, {:.0f} rejected, {:.3f} s -> {}'.format(
+                    r['nombre'], r['puntos'], e['nfev'], e['aceptados'], e['rechazados'], r['tiempo'], r['salida']))
+    sys.exit(1 if fallos else 0)
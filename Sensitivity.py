@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Method RungeKutta_sensibilidad and function adjunto.
+Derivatives of the solution of y' = f(t, y, p) with respect to the parameters p, to fit them to measured data with a
+gradient method instead of one finite difference solve per parameter, whose adaptive steps change with p and make
+the differences noisy.
+RungeKutta_sensibilidad solves the sensitivities S = dy/dp (forward sensitivity analysis) together with the state, as
+one system with the error control of both:
+S' = df/dy S + df/dp
+so integrar gives dy/dp at every recorded time along with y.
+adjunto gives the gradient of a function of the solution at some times, G = sum(g_i(y(t_i))), with one forward solve
+and one backward solve of the adjoint equations, lambda' = -(df/dy)^T lambda, whatever the number of parameters.
+The Jacobians df/dy and df/dp may be given (Symbolic.Sistema generates them); otherwise they are computed by finite
+differences.
+"""
+
+import numpy as np
+from Runge_Kutta import RungeKutta_nd
+from Stiff import EPS, jacobiano_fd
+
+
+
+class RungeKutta_sensibilidad(RungeKutta_nd):
+    """
+    Builder of RungeKutta_sensibilidad class. It takes the same data as RungeKutta_nd and:
+    f: Function f(t, y, p) with the parameters p as an array.
+    p: Values of the parameters.
+    jac: Function jac(t, y, p) that returns df/dy as an (n, n) array, or None.
+    jac_p: Function jac_p(t, y, p) that returns df/dp as an (n, len(p)) array, or None.
+    y0_p: Derivatives of the initial state with respect to the parameters, (n, len(p)), zero by default (the initial
+    state does not depend on them).
+    Without jac, df/dy S is computed for every column of S as a directional finite difference, one evaluation of f per
+    parameter and stage (also for df/dp if jac_p is not given either).
+    The state is y and S joined, y and S.ravel(); separar gives them back from the states of the Recorder.
+    """
+    def __init__(self, t, y, tf, h, error, f=None, p=(), jac=None, jac_p=None, y0_p=None, tabla='RKF45',
+                 control=None, *args, **kwargs):
+        y = np.atleast_1d(np.array(y, dtype=float))
+        self.p = np.atleast_1d(np.array(p, dtype=float))
+        self.n = y.size
+        S = np.zeros((y.size, self.p.size)) if y0_p is None else np.reshape(np.array(y0_p, dtype=float), (y.size, -1))
+        super(RungeKutta_sensibilidad, self).__init__(t, np.concatenate((y, S.ravel())), tf, h, error, f, tabla,
+                                                      control, *args, **kwargs)
+        self.jac = jac
+        self.jac_p = jac_p
+
+    def separar(self, z):
+        """
+        States and sensitivities, shapes (..., n) and (..., n, len(p)), of the states z of the Recorder.
+        """
+        z = np.asarray(z)
+        return z[..., :self.n], z[..., self.n:].reshape(z.shape[:-1] + (self.n, self.p.size))
+
+    @property
+    def sensibilidad(self):
+        return self.separar(self.estado)[1]
+
+    def derivada(self, t, z):
+        y, S = self.separar(z)
+        fy = np.asarray(self.f(t, y, self.p), dtype=float)
+        if self.jac is not None:
+            dS = np.dot(self.jac(t, y, self.p), S)
+            if self.jac_p is None:
+                dS += jacobiano_fd(lambda t, q: np.asarray(self.f(t, y, q), dtype=float), t, self.p, fy)
+        else:
+            #Directional differences of f along (S[:, j], e_j): df/dy S[:, j] + df/dp[:, j], or only df/dy S[:, j]
+            #if jac_p is given.
+            dS = np.empty_like(S)
+            for j in range(self.p.size):
+                p = self.p.copy()
+                escala = max(1., np.max(np.abs(y)), abs(p[j]) if self.jac_p is None else 0.)
+                delta = np.sqrt(EPS) * escala / max(1., np.max(np.abs(S[:, j])))
+                if self.jac_p is None:
+                    p[j] += delta
+                dS[:, j] = (np.asarray(self.f(t, y + delta * S[:, j], p)) - fy) / delta
+        if self.jac_p is not None:
+            dS += self.jac_p(t, y, self.p)
+        return np.concatenate((fy, dS.ravel()))
+
+
+
+def adjunto(f, t, y, tf, p, tiempos, dg, jac=None, jac_p=None, y0_p=None, error=1e-8, tabla='RKF45'):
+    """
+    Gradient with respect to p of G = sum(g_i(y(t_i))), a function of the solution of y' = f(t, y, p) at the times
+    tiempos (increasing, inside [t, tf]), by the adjoint method. Returns (gradient, solver of the forward solve).
+    dg: Function dg(i, y) that returns dg_i/dy at the state y(t_i), an array (n,).
+    jac, jac_p, y0_p: As in RungeKutta_sensibilidad. Without them, the Jacobians are computed by finite differences,
+    which costs n + len(p) evaluations of f per stage of the backward solve.
+    The forward solve keeps its dense output, the backward one uses it for y(t). Both use the tolerance error. The
+    dense output is the continuous extension of the tableau (all the registered ones have it), as accurate as the
+    steps, so the adjoint gradient is at least as accurate as the one of the forward sensitivities with the same
+    tolerance. A tableau without extension falls back to the cubic Hermite polynomials, whose O(h^4) error is then
+    the limit of the gradient.
+    """
+    p = np.atleast_1d(np.array(p, dtype=float))
+    tiempos = np.atleast_1d(np.asarray(tiempos, dtype=float))
+    adelante = RungeKutta_nd(t, y, tf, None, error, f=lambda t, y: np.asarray(f(t, y, p), dtype=float), tabla=tabla)
+    adelante.integrar(dense_output=True)
+    n = adelante.estado.size
+
+    def estado(t):
+        return adelante.sol(t)[0]
+
+    def derivadas(t, y):
+        fy = adelante.derivada(t, y)
+        J = jac(t, y, p) if jac is not None else jacobiano_fd(adelante.derivada, t, y, fy)
+        Jp = jac_p(t, y, p) if jac_p is not None else jacobiano_fd(lambda t, q: np.asarray(f(t, y, q)), t, p, fy)
+        return np.asarray(J), np.asarray(Jp)
+
+    def atras(s, z):
+        #In the reversed time s = tf - t: lambda' = J^T lambda and the integral of lambda^T Jp accumulates in mu.
+        J, Jp = derivadas(tf - s, estado(tf - s))
+        return np.concatenate((np.dot(J.T, z[:n]), np.dot(Jp.T, z[:n])))
+
+    def integrar(s0, z, s1):
+        rk = RungeKutta_nd(s0, z, s1, None, error, f=atras, tabla=tabla)
+        rk.integrar()
+        return rk.estado
+
+    z = np.zeros(n + p.size)
+    s = 0.
+    for i in range(len(tiempos) - 1, -1, -1):
+        s_i = tf - tiempos[i]
+        if s_i > s:
+            z = integrar(s, z, s_i)
+            s = s_i
+        z[:n] += dg(i, estado(tiempos[i]))
+    if tf - t > s:
+        z = integrar(s, z, tf - t)
+    gradiente = z[n:]
+    if y0_p is not None:
+        gradiente = gradiente + np.dot(np.reshape(y0_p, (n, -1)).T, z[:n])
+    return gradiente, adelante
+
+
+
+if __name__ == '__main__':
+    """
+    Fit of the damping coefficient mu of the van der Pol problem of Exe_runge_kutta_2D (mu = 4 in f_1) to noisy
+    measurements of x, by Gauss-Newton with the forward sensitivities. The gradient of the sum of squares is also
+    computed by the adjoint method and by finite differences of two solves.
+    """
+    def f(t, y, p): return np.array([y[1], p[0] * (1. - y[0] ** 2) * y[1] - y[0]])
+    def jac(t, y, p): return np.array([[0., 1.], [-2. * p[0] * y[0] * y[1] - 1., p[0] * (1. - y[0] ** 2)]])
+    def jac_p(t, y, p): return np.array([[0.], [(1. - y[0] ** 2) * y[1]]])
+
+    t_datos = np.linspace(0.5, 20., 40)
+    verdadero = RungeKutta_nd(0., [2., 0.], 20., None, 1e-10, f=lambda t, y: f(t, y, [4.]))
+    datos = verdadero.integrar(t_eval=t_datos).y[:, 0] + 0.01 * np.random.RandomState(0).randn(len(t_datos))
+
+    mu = 3.
+    for iteracion in range(10):
+        rk = RungeKutta_sensibilidad(0., [2., 0.], 20., None, 1e-8, f=f, p=[mu], jac=jac, jac_p=jac_p)
+        y, S = rk.separar(rk.integrar(t_eval=t_datos).y)
+        residuo, derivada = y[:, 0] - datos, S[:, 0, 0]
+        print('Iteration {}: mu = {:.6f}, sum of squares {:.3e}'.format(iteracion, mu, np.sum(residuo ** 2)))
+        paso = np.dot(derivada, residuo) / np.dot(derivada, derivada)
+        mu -= paso
+        if abs(paso) < 1e-8:
+            break
+
+    def suma(mu):
+        rec = RungeKutta_nd(0., [2., 0.], 20., None, 1e-8, f=lambda t, y: f(t, y, [mu])).integrar(t_eval=t_datos)
+        return np.sum((rec.y[:, 0] - datos) ** 2)
+
+    mu = 3.5
+    rk = RungeKutta_sensibilidad(0., [2., 0.], 20., None, 1e-8, f=f, p=[mu])
+    y, S = rk.separar(rk.integrar(t_eval=t_datos).y)
+    print('Gradient at mu = {}:'.format(mu))
+    print('  forward sensitivities (finite difference Jacobians) {:.8f}'.format(
+        2. * np.dot(S[:, 0, 0], y[:, 0] - datos)))
+    gradiente, adelante = adjunto(f, 0., [2., 0.], 20., [mu], t_datos,
+                                  lambda i, y: np.array([2. * (y[0] - datos[i]), 0.]), jac=jac, jac_p=jac_p)
+    print('  adjoint {:.8f}'.format(gradiente[0]))
+    rk = RungeKutta_sensibilidad(0., [2., 0.], 20., None, 1e-12, f=f, p=[mu], jac=jac, jac_p=jac_p)
+    y, S = rk.separar(rk.integrar(t_eval=t_datos).y)
+    print('  reference, forward sensitivities with tolerance 1e-12 {:.8f}'.format(
+        2. * np.dot(S[:, 0, 0], y[:, 0] - datos)))
+    for delta in (1e-4, 1e-6, 1e-8):
+        print('  finite differences, delta {:.0e}: {:.8f}'.format(delta, (suma(mu + delta) - suma(mu)) / delta))
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Method Estadisticas.
+It collects the statistics of an integration: the evaluations of f (nfev) and of the Jacobian (njev), the accepted
+and rejected steps, the smallest, largest and mean accepted step, and the wall time split between f, the Jacobian and
+the rest (the work of the solver itself). RungeKutta_nd.integrar(estadisticas=True) attaches one to the Recorder it
+returns, as recorder.estadisticas.
+The evaluations are counted by replacing derivada (and jacobiano) of the solver object by timed versions only while
+the integration runs, so nothing is added to the solver when the statistics are not asked for.
+"""
+
+import timeit
+
+import numpy as np
+
+
+
+class Estadisticas(object):
+    """
+    Builder of Estadisticas class. All the counters start at zero; iniciar and terminar are called by the solver at
+    the beginning and at the end of the integration, and the object itself is called after every accepted step.
+    """
+    def __init__(self):
+        self.nfev = 0
+        self.njev = 0
+        self.aceptados = 0
+        self.rechazados = 0
+        self.h_min = np.inf
+        self.h_max = 0.
+        self.h_suma = 0.
+        self.tiempo_total = 0.
+        self.tiempo_derivada = 0.
+        self.tiempo_jacobiano = 0.
+
+    def _medir(self, funcion, contador, tiempo):
+        """
+        Counted and timed version of funcion. The time of the evaluations made inside it (f in a finite difference
+        Jacobian) is given only to them.
+        """
+        reloj = timeit.default_timer
+
+        def medida(*args):
+            medido = self.tiempo_derivada + self.tiempo_jacobiano
+            inicio = reloj()
+            try:
+                return funcion(*args)
+            finally:
+                dentro = self.tiempo_derivada + self.tiempo_jacobiano - medido
+                setattr(self, tiempo, getattr(self, tiempo) + reloj() - inicio - dentro)
+                setattr(self, contador, getattr(self, contador) + 1)
+        return medida
+
+    def iniciar(self, rk):
+        """
+        Starts measuring the integration of the solver rk. The derivada and jacobiano set on the object itself, if any,
+        are measured and kept to be given back by terminar.
+        """
+        self._propios = dict((nombre, rk.__dict__[nombre]) for nombre in ('derivada', 'jacobiano')
+                             if nombre in rk.__dict__)
+        rk.derivada = self._medir(rk.derivada, 'nfev', 'tiempo_derivada')
+        if hasattr(rk, 'jacobiano'):
+            rk.jacobiano = self._medir(rk.jacobiano, 'njev', 'tiempo_jacobiano')
+        self._rechazados = rk.control.rechazados
+        self._inicio = timeit.default_timer()
+
+    def terminar(self, rk):
+        """
+        Stops measuring and gives back to rk its own derivada and jacobiano: the ones set on the object before iniciar,
+        or else the methods of its class.
+        """
+        self.tiempo_total += timeit.default_timer() - self._inicio
+        self.rechazados += rk.control.rechazados - self._rechazados
+        for nombre in ('derivada', 'jacobiano'):
+            if nombre in self._propios:
+                setattr(rk, nombre, self._propios[nombre])
+            else:
+                rk.__dict__.pop(nombre, None)
+
+    def __call__(self, rk):
+        h = abs(rk.h_ultimo)
+        self.aceptados += 1
+        self.h_min = min(self.h_min, h)
+        self.h_max = max(self.h_max, h)
+        self.h_suma += h
+
+    @property
+    def h_medio(self):
+        return self.h_suma / self.aceptados if self.aceptados else np.nan
+
+    @property
+    def tiempo_gestion(self):
+        """
+        Wall time not spent in f or in the Jacobian.
+        """
+        return self.tiempo_total - self.tiempo_derivada - self.tiempo_jacobiano
+
+    def __str__(self):
+        return ('nfev: {}, njev: {}, accepted steps: {}, rejected steps: {}\n'
+                'h: min {:.3e}, max {:.3e}, mean {:.3e}\n'
+                'time: {:.4f} s, f {:.4f} s, Jacobian {:.4f} s, solver {:.4f} s').format(
+                    self.nfev, self.njev, self.aceptados, self.rechazados, self.h_min, self.h_max, self.h_medio,
+                    self.tiempo_total, self.tiempo_derivada, self.tiempo_jacobiano, self.tiempo_gestion)
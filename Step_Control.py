@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Methods Controlador and ControladorPI and function paso_minimo.
+They decide if a step is accepted and which step comes next, from the error estimate of the step. The error of every
+component is measured against its own tolerance, atol + rtol * |y|, so the step is accepted when the scaled error is
+not larger than 1. The change of the step is bounded by fac_min and fac_max, and after a rejected step the step is
+not allowed to grow, neither in the retries nor in the first accepted step after them (fac_max = 1 there, as in the
+codes of Hairer). An error that is not finite (f returned nan or inf) gives a nan step, which the solvers report.
+Controlador is the elementary controller, ControladorPI the PI controller of Gustafsson, which
+also uses the error of the previous accepted step and avoids the oscillations of the step size (and the rejected
+steps they cause).
+All the methods work with numbers or with NumPy arrays (one value per member of an ensemble).
+"""
+
+import numpy as np
+
+
+
+def paso_minimo(t):
+    """
+    Smallest step allowed at the time t (a number or an array): ten times the distance between t and the next
+    floating point number. A smaller step would not move t, or would move it by a few roundings.
+    """
+    return 10. * np.spacing(np.abs(t))
+
+
+
+class Controlador(object):
+    """
+    Builder of Controlador class:
+    atol: Absolute tolerance, a number or an array with one value per component.
+    rtol: Relative tolerance, a number or an array with one value per component.
+    seguridad: Safety factor applied to the optimal step.
+    fac_min, fac_max: Bounds of the factor between the new and the old step.
+    self.aceptados and self.rechazados count the accepted and rejected steps, and self.rechazado tells if the last
+    step proposed by a single solver was rejected.
+    """
+    def __init__(self, atol=1e-6, rtol=1e-6, seguridad=0.9, fac_min=0.2, fac_max=10.):
+        self.atol = np.asarray(atol, dtype=float)
+        self.rtol = np.asarray(rtol, dtype=float)
+        self.seguridad = seguridad
+        self.fac_min = fac_min
+        self.fac_max = fac_max
+        self.aceptados = 0
+        self.rechazados = 0
+        self.rechazado = False
+
+    def escala(self, y, y_nou):
+        """
+        Tolerance of every component for a step from y to y_nou.
+        """
+        return self.atol + self.rtol * np.maximum(np.abs(y), np.abs(y_nou))
+
+    def factor(self, err, k):
+        """
+        Optimal factor for a scaled error err of a method whose local error is O(h^k), bounded by fac_min, fac_max.
+        """
+        with np.errstate(divide='ignore'):
+            fac = np.where(err > 0., self.seguridad * np.asarray(err, dtype=float) ** (-1. / k), self.fac_max)
+        return np.clip(fac, self.fac_min, self.fac_max)
+
+    def proponer(self, h, err, k, rechazado=None):
+        """
+        Decides if the step h with scaled error err is accepted, counts it and returns (accepted, new step). The new
+        step is nan if err is not finite.
+        rechazado: If the previous try was rejected, then the new step is not larger than h even if this one is
+        accepted. By default it is self.rechazado, the result of the last call, which is right for a single solver;
+        an ensemble gives it as an array, one value per member.
+        """
+        aceptado = err <= 1.
+        if rechazado is None:
+            rechazado = self.rechazado
+        fac = self.factor(err, k)
+        fac = np.where(aceptado & np.logical_not(rechazado), fac, np.minimum(fac, 1.))
+        fac = np.where(np.isfinite(err), fac, np.nan)
+        self.aceptados += int(np.sum(aceptado))
+        self.rechazados += int(np.size(aceptado) - np.sum(aceptado))
+        if np.ndim(aceptado) == 0:
+            self.rechazado = not aceptado
+            return bool(aceptado), float(h * fac)
+        return aceptado, h * fac
+
+    def reiniciar(self):
+        """
+        Forgets the history of the controller, for instance when the method changes.
+        """
+        self.rechazado = False
+
+    def paso_inicial(self, f, t, y, f0, k):
+        """
+        Initial step from the size of the state, its derivative f0 = f(t, y) and an estimate of the second derivative
+        (Hairer, Norsett and Wanner, Solving ODE I, II.4), for a method whose local error is O(h^k). It costs one
+        evaluation of f.
+        """
+        escala = self.atol + self.rtol * np.abs(y)
+        d0 = np.max(np.abs(y) / escala, axis=-1)
+        d1 = np.max(np.abs(f0) / escala, axis=-1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            h0 = np.where((d0 < 1e-5) | (d1 < 1e-5), 1e-6, 0.01 * d0 / d1)
+            f1 = f(t + h0, y + h0[..., None] * f0)
+            d2 = np.max(np.abs(f1 - f0) / escala, axis=-1) / h0
+            h1 = np.where(np.maximum(d1, d2) <= 1e-15, np.maximum(1e-6, h0 * 1e-3),
+                          (0.01 / np.maximum(d1, d2)) ** (1. / k))
+        h = np.minimum(100. * h0, h1)
+        return float(h) if np.ndim(h) == 0 else h
+
+
+
+class ControladorPI(Controlador):
+    """
+    Builder of ControladorPI class. It takes the same data as Controlador and:
+    alfa, beta: Exponents of the controller, multiplied by 1 / k. The new step is
+    h * seguridad * err^(-alfa / k) * err_previo^(beta / k), with err_previo the error of the last accepted step.
+    After a rejected step it works as the elementary controller, and the first accepted step after it does not let the
+    step grow.
+    """
+    def __init__(self, atol=1e-6, rtol=1e-6, seguridad=0.9, fac_min=0.2, fac_max=5., alfa=0.7, beta=0.4):
+        super(ControladorPI, self).__init__(atol, rtol, seguridad, fac_min, fac_max)
+        self.alfa = alfa
+        self.beta = beta
+        self.err_previo = 1.
+
+    def proponer(self, h, err, k, rechazado=None):
+        if not np.isfinite(err):
+            self.rechazados += 1
+            self.rechazado = True
+            return False, np.nan
+        rechazado = self.rechazado if rechazado is None else rechazado
+        if not err <= 1.:
+            self.rechazados += 1
+            self.rechazado = True
+            return False, h * min(float(self.factor(err, k)), 1.)
+        self.aceptados += 1
+        self.rechazado = False
+        err = max(err, 1e-10)
+        fac = self.seguridad * err ** (-self.alfa / k) * self.err_previo ** (self.beta / k)
+        self.err_previo = err
+        return True, h * min(max(fac, self.fac_min), 1. if rechazado else self.fac_max)
+
+    def reiniciar(self):
+        super(ControladorPI, self).reiniciar()
+        self.err_previo = 1.
@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Methods Rosenbrock_nd and RungeKutta_auto.
+Rosenbrock_nd is an implicit (linearly implicit) solver for stiff problems, the Rosenbrock 2(3) method of Shampine
+and Reichelt (ode23s). It is L-stable, so its step is limited only by the accuracy, while the step of the explicit
+Fehlberg method collapses when the problem is stiff. It needs the Jacobian of f, given by the user or computed by
+finite differences.
+RungeKutta_auto integrates with the Fehlberg method while the problem is not stiff, detects when the step becomes
+limited by the stability instead of the accuracy and then switches to Rosenbrock_nd, and back when it is no longer
+limited.
+Both work as RungeKutta_nd: they share integrar, iterar, the dense output and the events.
+"""
+
+import numpy as np
+from Dense_Output import hermite_coeficientes
+from Runge_Kutta import RungeKutta_nd
+
+EPS = np.finfo(float).eps
+
+"""
+Coefficients of ode23s.
+"""
+D = 1. / (2. + np.sqrt(2.))
+E32 = 6. + np.sqrt(2.)
+
+def jacobiano_fd(f, t, y, fy):
+    """
+    Jacobian of f at (t, y) by forward finite differences, with fy = f(t, y). Costs one evaluation of f per component.
+    It is (fy.size, y.size), so it also gives the derivatives with respect to the parameters.
+    """
+    jac = np.empty((np.size(fy), y.size))
+    for j in range(y.size):
+        delta = np.sqrt(EPS) * max(abs(y[j]), 1.)
+        yj = y.copy()
+        yj[j] += delta
+        jac[:, j] = (f(t, yj) - fy) / delta
+    return jac
+
+
+
+class Rosenbrock_nd(RungeKutta_nd):
+    """
+    Builder of Rosenbrock_nd class. It takes the same data as RungeKutta_nd and:
+    jac: Function jac(t, y) that returns the Jacobian of f as an (n, n) array. If it is None, it is computed by finite
+    differences.
+    autonomo: If True, f does not depend on t and the evaluation of df/dt is skipped.
+    """
+    def __init__(self, t, y, tf, h, error, f=None, jac=None, autonomo=False, *args, **kwargs):
+        super(Rosenbrock_nd, self).__init__(t, y, tf, h, error, f, *args, **kwargs)
+        self.jac = jac
+        self.autonomo = autonomo
+        self.J = None  #Jacobian at the current point, kept while the step is retried.
+        self.J_paso = None  #Jacobian used by the last accepted step.
+
+    def jacobiano(self, t, y, fy):
+        if self.jac is not None:
+            return np.asarray(self.jac(t, y), dtype=float)
+        return jacobiano_fd(self.derivada, t, y, fy)
+
+    def intentar(self):
+        """
+        Tries one step of ode23s. The first stage (f at the current point) is kept in self.k[0], as in the explicit
+        method, so it is reused when the step is retried, and so is the Jacobian. The error estimate is of order 2,
+        its local error O(h^3). Returns (accepted, proposed step) as RungeKutta_nd.intentar.
+        """
+        self.calcular_etapa(0)
+        t, y, h, f0 = self.t, self.estado, self.h, self.k[0]
+        if self.J is None:
+            self.J = self.jacobiano(t, y, f0)
+        if self.autonomo:
+            T = 0.
+        else:
+            dt = np.sqrt(EPS) * max(abs(t), abs(h))
+            T = (self.derivada(t + dt, y) - f0) / dt
+        W = np.linalg.inv(np.eye(y.size) - h * D * self.J)
+
+        k1 = np.dot(W, f0 + h * D * T)
+        f1 = self.derivada(t + 0.5 * h, y + 0.5 * h * k1)
+        k2 = np.dot(W, f1 - k1) + k1
+        y_nou = y + h * k2
+        f2 = self.derivada(t + h, y_nou)
+        k3 = np.dot(W, f2 - E32 * (k2 - f1) - 2. * (k1 - f0) + h * D * T)
+        err = np.max(np.abs(h / 6. * (k1 - 2. * k2 + k3)) / self.control.escala(y, y_nou))
+        self.y_nou, self.f_nou = y_nou, f2
+        return self.control.proponer(h, err, 3)
+
+    def actualizar_estado(self):
+        """
+        Advances to the solution of the accepted step, whose f becomes the first stage of the next one.
+        """
+        self.t, self.estado = self.t + self.h, self.y_nou
+        self.k[0] = self.f_nou
+        self.etapa = 1
+        self.J_paso, self.J = self.J, None
+
+    def interpolante(self, t0, y0, f0):
+        """
+        The stages of ode23s are not the ones of a Butcher tableau: the steps are interpolated with the cubic Hermite
+        polynomial, of the order of the method.
+        """
+        return hermite_coeficientes(self.h_ultimo, y0, self.estado, f0, self.k[0])
+
+
+
+class RungeKutta_auto(Rosenbrock_nd):
+    """
+    Builder of RungeKutta_auto class. It takes the same data as Rosenbrock_nd and:
+    pasos_cambio: Number of consecutive accepted steps that must show (or stop showing) stiffness before the method
+    is switched.
+    The explicit steps use the tableau tabla (Fehlberg by default). It needs a stage at t + h other than the FSAL one,
+    to estimate the stiffness, and the steps are stable while h * rho is below the limite_estabilidad of the tableau.
+    self.rigido tells the method in use (False for Fehlberg, True for Rosenbrock) and self.cambios keeps the times
+    of the switches.
+    """
+    def __init__(self, t, y, tf, h, error, f=None, jac=None, autonomo=False, pasos_cambio=15, *args, **kwargs):
+        super(RungeKutta_auto, self).__init__(t, y, tf, h, error, f, jac, autonomo, *args, **kwargs)
+        self.pasos_cambio = pasos_cambio
+        finales = [i for i in range(1, self.tabla.etapas) if self.tabla.C[i] == 1. and
+                   not (self.tabla.fsal and i == self.tabla.etapas - 1)]
+        if not finales:
+            raise ValueError('The tableau {} has no stage at t + h to detect stiffness'.format(self.tabla.nombre))
+        self.etapa_final = finales[-1]
+        self.rigido = False
+        self.rigido_paso = False
+        self.contador = 0
+        self.cambios = []
+
+    def _contar(self, limitado):
+        """
+        Counts the consecutive steps that are in the opposite situation to the current method (stability limited
+        while explicit, not limited while implicit) and switches the method when there are pasos_cambio of them.
+        """
+        self.contador = self.contador + 1 if limitado != self.rigido else 0
+        if self.contador >= self.pasos_cambio:
+            self.rigido = not self.rigido
+            self.contador = 0
+            self.J = None
+            self.control.reiniciar()
+            self.cambios.append(self.t)
+
+    def intentar(self):
+        if self.rigido:
+            return Rosenbrock_nd.intentar(self)
+        return RungeKutta_nd.intentar(self)
+
+    def interpolante(self, t0, y0, f0):
+        if self.rigido_paso:
+            return Rosenbrock_nd.interpolante(self, t0, y0, f0)
+        return RungeKutta_nd.interpolante(self, t0, y0, f0)
+
+    def actualizar_estado(self):
+        if self.rigido:
+            Rosenbrock_nd.actualizar_estado(self)
+        else:
+            RungeKutta_nd.actualizar_estado(self)
+
+    def paso(self):
+        """
+        With the explicit method, the largest eigenvalue is estimated for free after every accepted step from a stage
+        at t + h on an intermediate state (the 5th one with Fehlberg) and f at the new point:
+        rho = |f(t + h, y_nou) - k4| / |y_nou - y4|.
+        With Rosenbrock it is bounded by the norm of the Jacobian of the step.
+        """
+        self.rigido_paso = self.rigido  #The method of the step, the one of its interpolant.
+        if self.rigido:
+            RungeKutta_nd.paso(self)
+            rho = np.linalg.norm(self.J_paso, np.inf)
+            self._contar(self.h * rho >= self.tabla.limite_estabilidad)
+            return True
+
+        self.paso_inicial()
+        self.calcular_etapa(0)
+        y, j, k0 = self.estado, self.etapa_final, self.k[0].copy()
+        RungeKutta_nd.paso(self)
+        h = self.h_ultimo
+        k = self.k[:j].copy()
+        k[0] = k0  #With a FSAL tableau the first stage was already replaced by f at the new point.
+        y4 = y + h * np.dot(self.tabla.A[j, :j], k)
+        k4 = self.k[j].copy()
+        self.calcular_etapa(0)
+        den = np.linalg.norm(self.estado - y4)
+        rho = np.linalg.norm(self.k[0] - k4) / den if den > 0. else 0.
+        self._contar(h * rho >= 0.9 * self.tabla.limite_estabilidad)
+        return True
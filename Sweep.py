@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Function barrido.
+It runs many independent integrations (a parameter sweep) in a pool of processes. Every problem is given as a spec,
+a dictionary that tells how to build the integrator object:
+{
+    'clase': RungeKutta_2d,                  (optional, RungeKutta_nd by default)
+    'args': (0., 2., 0., 50., 0.5, 1e-6),    (arguments of the builder)
+    'kwargs': {},                            (optional)
+    'atributos': {'f': f_1, 'g': g},         (optional, attributes set after building the object)
+}
+The functions must be picklable (defined at module level, or functools.partial of them). All the problems are
+sampled on the same t_eval, and every worker writes its solution straight into a shared memory array, so the results
+are not pickled back to the main process.
+"""
+
+import multiprocessing
+import sys
+import traceback
+from multiprocessing import shared_memory
+
+import numpy as np
+from Runge_Kutta import RungeKutta_nd
+
+
+"""
+State of every worker process, set once by _iniciar: the specs, t_eval and the shared arrays.
+"""
+_trabajo = {}
+
+
+
+def _construir(spec):
+    rk = spec.get('clase', RungeKutta_nd)(*spec['args'], **spec.get('kwargs', {}))
+    for nombre, valor in spec.get('atributos', {}).items():
+        setattr(rk, nombre, valor)
+    return rk
+
+
+def _iniciar(specs, t_eval, nombre, forma):
+    _trabajo['specs'] = specs
+    _trabajo['t_eval'] = t_eval
+    _trabajo['memoria'] = shared_memory.SharedMemory(name=nombre)
+    _trabajo['y'] = np.ndarray(forma, dtype=float, buffer=_trabajo['memoria'].buf)
+
+
+def _ejecutar(i):
+    """
+    Integrates the problem i and writes its solution in the row i of the shared array. Returns (i, None), or
+    (i, traceback) if the integration failed.
+    """
+    try:
+        rk = _construir(_trabajo['specs'][i])
+        rec = rk.integrar(t_eval=_trabajo['t_eval'])
+        _trabajo['y'][i, :len(rec)] = rec.y
+        return i, None
+    except Exception:
+        return i, traceback.format_exc()
+
+
+def _informar(hechas, total, fallos):
+    if hechas % max(1, total // 100) and hechas != total:
+        return
+    sys.stderr.write('\r{}/{} problems, {} failed'.format(hechas, total, fallos))
+    if hechas == total:
+        sys.stderr.write('\n')
+
+
+def barrido(specs, t_eval, procesos=None, chunksize=None, progreso=_informar):
+    """
+    Runs all the specs in a pool of procesos processes (all the cores by default) and returns (y, fallos):
+    y: Array of shape (number of specs, len(t_eval), n) with the solutions. The rows of the failed problems, and the
+    times after the end of a problem stopped by a terminal event, are NaN.
+    fallos: Dictionary {index of the spec: traceback} of the problems that raised an exception.
+    chunksize: Number of problems given to a process at once. By default there are about four chunks per process, to
+    balance the load when the problems take different times.
+    progreso: Function progreso(hechas, total, fallos) called when every problem ends, or None.
+    Raises ValueError if specs is empty, since the number of components is taken from its first problem.
+    """
+    if len(specs) == 0:
+        raise ValueError('barrido needs at least one spec')
+    t_eval = np.asarray(t_eval, dtype=float)
+    procesos = procesos or multiprocessing.cpu_count()
+    chunksize = chunksize or max(1, len(specs) // (4 * procesos))
+    n = _construir(specs[0]).estado.size
+    forma = (len(specs), len(t_eval), n)
+
+    memoria = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(forma)) * 8))
+    try:
+        y = np.ndarray(forma, dtype=float, buffer=memoria.buf)
+        y[:] = np.nan
+        fallos = {}
+        pool = multiprocessing.Pool(procesos, _iniciar, (specs, t_eval, memoria.name, forma))
+        try:
+            for hechas, (i, fallo) in enumerate(pool.imap_unordered(_ejecutar, range(len(specs)), chunksize), 1):
+                if fallo is not None:
+                    fallos[i] = fallo
+                    y[i] = np.nan
+                if progreso is not None:
+                    progreso(hechas, len(specs), len(fallos))
+        finally:
+            pool.close()
+            pool.join()
+        resultado = np.array(y)
+        del y
+    finally:
+        memoria.close()
+        memoria.unlink()
+    return resultado, fallos
+
+
+
+"""
+Functions of the example below. They are defined at module level so that the worker processes can unpickle them.
+"""
+def _van_der_pol(t, x, v, mu): return mu * (1. - x ** 2.) * v - x
+def _g(t, x, v): return v
+
+
+
+if __name__ == '__main__':
+    """
+    Sweep of the two van der Pol problems of Exe_runge_kutta_2D over damping coefficients, tolerances and h.
+    """
+    import functools
+    from Runge_Kutta import RungeKutta_2d
+
+    specs = [{'clase': RungeKutta_2d, 'args': (0., x0, v0, 50., h, error),
+              'atributos': {'f': functools.partial(_van_der_pol, mu=mu), 'g': _g}}
+             for x0, v0 in ((2., 0.), (0.01, 0.01))
+             for mu in np.linspace(1., 4., 10)
+             for error in (1e-4, 1e-6, 1e-8)
+             for h in (0.5, 0.1)]
+    y, fallos = barrido(specs, np.linspace(0., 50., 501))
+    print('{} problems, {} failed, x(50) between {:.3f} and {:.3f}'.format(
+        len(specs), len(fallos), np.nanmin(y[:, -1, 0]), np.nanmax(y[:, -1, 0])))
@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Method Sistema.
+It defines a problem y' = f(t, y) from the expressions of its right hand side, given as strings or SymPy objects,
+and generates from them the functions the solvers need, as NumPy code:
+f(t, y, *args): The derivative. The common subexpressions of all the components are computed once (SymPy cse) and
+every component is one NumPy expression, so there is one Python call per evaluation instead of one per component.
+jac(t, y, *args): The exact Jacobian, for Rosenbrock_nd and RungeKutta_auto (jac=...), instead of the finite
+differences, which cost n evaluations of f.
+f_en_sitio(t, y, out, *args): f writing in out, for RungeKutta_inplace.
+They work for one state, y of shape (n,), with numbers inside (as fast as a function of numbers), and for a block of
+states of shape (m, n), as RungeKutta_ensemble gives, with arrays inside. args are the values of the parameters that
+are not fixed (argumentos), numbers or arrays with one value per state of the block.
+With compilar=True the functions are compiled with Numba, if it is installed.
+SymPy is optional: the rest of the package does not need it, only this module.
+Example, the van der Pol problem of Exe_runge_kutta_2D:
+sis = Sistema(['v', 'mu * (1 - x**2) * v - x'], 'x v', parametros={'mu': 4.})
+rk = RungeKutta_nd(0., [2., 0.], 50., None, 1e-6, f=sis.f)
+"""
+
+import numpy as np
+
+try:
+    import sympy
+    from sympy.printing.numpy import NumPyPrinter
+except ImportError:
+    sympy = None
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+SYMPY = sympy is not None
+
+
+
+def _simbolos(nombres):
+    if isinstance(nombres, str):
+        nombres = nombres.replace(',', ' ').split()
+    return [sympy.Symbol(nombre) if isinstance(nombre, str) else nombre for nombre in nombres]
+
+
+
+class Sistema(object):
+    """
+    Builder of Sistema class:
+    expresiones: The components of f, a sequence of strings or SymPy expressions (or one of them for a single
+    equation).
+    variables: Names of the components of the state, in order: a string 'x v' or a sequence of names or symbols.
+    t: Name of the time.
+    parametros: Dictionary of parameters with fixed values, {name: value}. They are replaced before the code is
+    generated, so their operations are folded.
+    argumentos: Names of the parameters given to the functions after y, as RungeKutta_ensemble gives its params.
+    compilar: If True, the functions are compiled with Numba (when it is installed).
+    The expressions are kept in self.expresiones and the Jacobian in self.jacobiana (SymPy objects), and the generated
+    code in self.codigo.
+    """
+    def __init__(self, expresiones, variables, t='t', parametros=None, argumentos=(), compilar=False):
+        if not SYMPY:
+            raise ImportError('Sistema needs SymPy')
+        if isinstance(expresiones, (str, sympy.Basic)):
+            expresiones = [expresiones]
+        self.variables = _simbolos(variables)
+        self.t = _simbolos([t])[0]
+        self.argumentos = _simbolos(argumentos)
+        nombres = dict((str(s), s) for s in self.variables + self.argumentos + [self.t])
+        sustituciones = dict((nombres.get(nombre, sympy.Symbol(nombre)), valor)
+                             for nombre, valor in (parametros or {}).items())
+        self.expresiones = [sympy.sympify(e, locals=nombres).subs(sustituciones) for e in expresiones]
+        if len(self.expresiones) != len(self.variables):
+            raise ValueError('{} expressions for {} variables'.format(len(self.expresiones), len(self.variables)))
+        self.jacobiana = sympy.Matrix(self.expresiones).jacobian(self.variables)
+
+        n = len(self.variables)
+        entradas = [(i, j) for i in range(n) for j in range(n) if self.jacobiana[i, j] != 0]  #out starts with zeros.
+        self.codigo = '\n'.join((
+            self._funcion('f', '_out = numpy.empty(_y.shape)', ['_out.T[{}]'.format(i) for i in range(n)],
+                          self.expresiones, '_out'),
+            self._funcion('f_en_sitio', '', ['_out.T[{}]'.format(i) for i in range(n)], self.expresiones, None,
+                          '_out'),
+            self._funcion('jac', '_out = numpy.zeros(_y.shape + ({},))'.format(n),
+                          ['_out.T[{}, {}]'.format(j, i) for i, j in entradas],
+                          [self.jacobiana[i, j] for i, j in entradas], '_out')))
+        espacio = {'numpy': np}
+        exec(compile(self.codigo, '<Sistema>', 'exec'), espacio)
+        for nombre in ('f', 'f_en_sitio', 'jac'):
+            funcion = espacio[nombre]
+            if compilar and numba is not None:
+                funcion = numba.njit(funcion)
+            setattr(self, nombre, funcion)
+
+    def _funcion(self, nombre, inicio, destinos, expresiones, resultado, salida=None):
+        """
+        Source of a function that stores the expressions in the destinos. The components of y are taken from y.T, so
+        they are numbers for a state and columns for a block of states (and out.T[i] is the column i of the result).
+        The arguments t, y and out are called _t, _y and _out, so they do not hide the variables of the problem.
+        """
+        printer = NumPyPrinter()
+        argumentos = ['_t', '_y'] + ([salida] if salida else []) + [str(a) for a in self.argumentos]
+        lineas = ['def {}({}):'.format(nombre, ', '.join(argumentos))]
+        for i, variable in enumerate(self.variables):
+            lineas.append('    {} = _y.T[{}]'.format(variable, i))
+        lineas.append('    {} = _t'.format(self.t))
+        if inicio:
+            lineas.append('    ' + inicio)
+        comunes, reducidas = sympy.cse(expresiones)
+        for simbolo, expresion in comunes:
+            lineas.append('    {} = {}'.format(simbolo, printer.doprint(expresion)))
+        for destino, expresion in zip(destinos, reducidas):
+            lineas.append('    {} = {}'.format(destino, printer.doprint(expresion)))
+        if resultado:
+            lineas.append('    return ' + resultado)
+        return '\n'.join(lineas) + '\n'
+
+
+
+if __name__ == '__main__':
+    """
+    The problems of Exe_runge_kutta_1D and Exe_runge_kutta_2D with the generated f, and the Robertson problem with
+    Rosenbrock_nd and the exact Jacobian or the finite differences one.
+    """
+    import timeit
+    from Exe_runge_kutta_1D import f as f_1d
+    from Exe_runge_kutta_2D import f_1, g
+    from Runge_Kutta import RungeKutta_nd
+    from Stiff import Rosenbrock_nd
+
+    def medir(nombre, crear):
+        rk = crear()
+        inicio = timeit.default_timer()
+        rec = rk.integrar(estadisticas=True)
+        print('{}: {} steps, {} evaluations of f, {} of the Jacobian, {:.3f} s'.format(
+            nombre, len(rec) - 1, rec.estadisticas.nfev, rec.estadisticas.njev, timeit.default_timer() - inicio))
+        return rk
+
+    uno = Sistema('-(1 / x**2 + 4 * (x - 6) * exp(-2 * (x - 6)**2))', 'y', t='x')
+    medir('1D, lambda', lambda: RungeKutta_nd(1., [1.], 10., None, 1e-8, f=lambda t, y: np.array([f_1d(t, y[0])])))
+    medir('1D, Sistema', lambda: RungeKutta_nd(1., [1.], 10., None, 1e-8, f=uno.f))
+
+    vdp = Sistema(['v', 'mu * (1 - x**2) * v - x'], 'x v', parametros={'mu': 4.})
+    medir('van der Pol, f and g', lambda: RungeKutta_nd(
+        0., [2., 0.], 50., None, 1e-8, f=lambda t, y: np.array([g(t, y[0], y[1]), f_1(t, y[0], y[1])])))
+    medir('van der Pol, Sistema', lambda: RungeKutta_nd(0., [2., 0.], 50., None, 1e-8, f=vdp.f))
+
+    rober = Sistema(['-0.04 * y1 + 1e4 * y2 * y3', '0.04 * y1 - 1e4 * y2 * y3 - 3e7 * y2**2', '3e7 * y2**2'],
+                    'y1 y2 y3')
+    exacto = medir('Robertson, exact Jacobian', lambda: Rosenbrock_nd(0., [1., 0., 0.], 1e5, None, 1e-6, f=rober.f,
+                                                                      jac=rober.jac, autonomo=True))
+    fd = medir('Robertson, finite differences', lambda: Rosenbrock_nd(0., [1., 0., 0.], 1e5, None, 1e-6, f=rober.f,
+                                                                      autonomo=True))
+    print('Largest difference of the final states: {:.1e}'.format(np.max(np.abs(exacto.estado - fd.estado))))
+    print('Batch of 3 states, f: {}, jac: {}'.format(rober.f(0., np.ones((3, 3))).shape,
+                                                     rober.jac(0., np.ones((3, 3))).shape))
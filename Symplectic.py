@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Method Simplectico.
+Fixed step integrators for separable Hamiltonians, H(q, p) = T(p) + V(q): q' = dT/dp (the velocity) and
+p' = -dV/dq (the force). They are symplectic, so the energy error stays bounded over any number of steps instead of
+drifting, and long simulations of orbits or oscillators can be run with big steps. Every method is a sequence of
+drifts (q += c * h * velocidad(p)) and kicks (p += d * h * fuerza(q)):
+'euler': Symplectic Euler, 1st order (the kick first, as vert_shot_ft in proves).
+'verlet': Velocity Verlet, 2nd order (half kick, drift, half kick).
+'leapfrog': Leapfrog, 2nd order (half drift, kick, half drift).
+'yoshida4', 'yoshida6': Compositions of Verlet steps by Yoshida, 4th and 6th order.
+q and p may be arrays of any shape, for instance (particles, dimensions): all the particles advance at once.
+"""
+
+import numpy as np
+from Recorder import Recorder
+
+
+def componer(pesos):
+    """
+    Sequence of operations of the composition of Verlet steps with the given weights. The kicks of consecutive steps
+    are merged, so a Verlet step costs only one evaluation of the force.
+    """
+    operaciones = []
+    for w in pesos:
+        for operacion in (('p', 0.5 * w), ('q', w), ('p', 0.5 * w)):
+            if operaciones and operaciones[-1][0] == operacion[0]:
+                operaciones[-1] = (operacion[0], operaciones[-1][1] + operacion[1])
+            else:
+                operaciones.append(operacion)
+    return tuple(operaciones)
+
+
+"""
+Weights of the compositions of Yoshida (Phys. Lett. A 150, 1990): the triple jump for the 4th order one and the
+solution A for the 6th order one.
+"""
+_X1 = 1. / (2. - 2. ** (1. / 3.))
+_X0 = 1. - 2. * _X1
+_W6 = (0.784513610477560, 0.235573213359357, -1.17767998417887)
+_W6 = _W6 + (1. - 2. * sum(_W6),) + _W6[::-1]
+
+METODOS = {
+    'euler': (('p', 1.), ('q', 1.)),
+    'verlet': componer((1.,)),
+    'leapfrog': (('q', 0.5), ('p', 1.), ('q', 0.5)),
+    'yoshida4': componer((_X1, _X0, _X1)),
+    'yoshida6': componer(_W6),
+}
+
+ORDENES = {'euler': 1, 'verlet': 2, 'leapfrog': 2, 'yoshida4': 4, 'yoshida6': 6}
+
+
+
+class Simplectico(object):
+    """
+    Builder of Simplectico class. We give the needed data in order to solve the problem:
+    t: Initial time.
+    q: Initial positions, an array of any shape.
+    p: Initial momenta, with the shape of q.
+    tf: Final time. The last step is shortened to end at tf.
+    h: Integration step, fixed.
+    fuerza: Function fuerza(q) = -dV/dq, with the shape of q.
+    velocidad: Function velocidad(p) = dT/dp. By default p / masa.
+    masa: Mass, a number or an array that broadcasts with p, used by the default velocidad.
+    metodo: Name of the method in METODOS, 'verlet' by default.
+    The force at the current positions is kept in self.a, so it is not computed again by the first kick of a step.
+    """
+    def __init__(self, t, q, p, tf, h, fuerza, velocidad=None, masa=1., metodo='verlet', *args, **kwargs):
+        self.t = t
+        self.q = np.array(q, dtype=float)
+        self.p = np.array(p, dtype=float)
+        self.tf = tf
+        self.h = h
+        self.fuerza = fuerza
+        self.velocidad = velocidad if velocidad is not None else lambda p: p / masa
+        if metodo not in METODOS:
+            raise ValueError('Unknown method {}, the available ones are {}'.format(metodo, sorted(METODOS)))
+        self.metodo = metodo
+        self.operaciones = METODOS[metodo]
+        self.a = None
+        self.pasos = 0
+
+    def paso(self, h=None):
+        """
+        Advances one step of length h (self.h by default).
+        """
+        h = self.h if h is None else h
+        for variable, coeficiente in self.operaciones:
+            if variable == 'q':
+                self.q = self.q + coeficiente * h * self.velocidad(self.p)
+                self.a = None
+            else:
+                if self.a is None:
+                    self.a = self.fuerza(self.q)
+                self.p = self.p + coeficiente * h * self.a
+        self.t = self.t + h
+        self.pasos += 1
+
+    @property
+    def estado(self):
+        return np.concatenate((self.q.ravel(), self.p.ravel()))
+
+    def separar(self, y):
+        """
+        Positions and momenta, with their shape, of the states y recorded by integrar (one per row).
+        """
+        y = np.asarray(y)
+        return (y[..., :self.q.size].reshape(y.shape[:-1] + self.q.shape),
+                y[..., self.q.size:].reshape(y.shape[:-1] + self.p.shape))
+
+    def integrar(self, cada=1):
+        """
+        Integrates until tf and returns a Recorder with the initial point and the state every cada steps (and at tf).
+        The states are q and p flattened and joined, separar gives them back with their shape.
+        """
+        rec = Recorder(self.q.size + self.p.size)
+        rec.append(self.t, self.estado, self.h)
+        t0, i = self.t, 0
+        n = int(np.ceil((self.tf - t0) / self.h * (1. - 1e-12)))
+        while i < n:
+            i += 1
+            self.paso(min(self.h, self.tf - self.t))
+            self.t = t0 + i * self.h if i < n else self.tf  #Avoids the accumulation of rounding errors in t.
+            if i % cada == 0 or i == n:
+                rec.append(self.t, self.estado, self.h)
+        return rec
+
+
+
+if __name__ == '__main__':
+    """
+    Kepler orbit with eccentricity 0.6 for 100 periods: energy error of the symplectic methods with a fixed step,
+    and of RKF45 with a tight tolerance.
+    """
+    import timeit
+    from Runge_Kutta import RungeKutta_nd
+
+    def fuerza(q): return -q / np.sum(q ** 2, axis=-1, keepdims=True) ** 1.5
+    def energia(q, p): return 0.5 * np.sum(p ** 2, axis=-1) - 1. / np.sqrt(np.sum(q ** 2, axis=-1))
+
+    e = 0.6
+    q0, p0 = np.array([1. - e, 0.]), np.array([0., np.sqrt((1. + e) / (1. - e))])
+    tf = 100. * 2. * np.pi
+    for metodo, h in (('verlet', 0.005), ('yoshida4', 0.02), ('yoshida6', 0.04)):
+        sim = Simplectico(0., q0, p0, tf, h, fuerza, metodo=metodo)
+        inicio = timeit.default_timer()
+        q, p = sim.separar(sim.integrar(cada=10).y)
+        print('{}: h {}, {} steps, max energy error {:.2e}, {:.2f} s'.format(
+            metodo, h, sim.pasos, np.max(np.abs(energia(q, p) - energia(q0, p0))), timeit.default_timer() - inicio))
+
+    rk = RungeKutta_nd(0., np.concatenate((q0, p0)), tf, None, 1e-10,
+                       f=lambda t, y: np.concatenate((y[2:], fuerza(y[:2]))))
+    inicio = timeit.default_timer()
+    rec = rk.integrar()
+    print('RKF45: tol 1e-10, {} steps, max energy error {:.2e}, {:.2f} s'.format(
+        len(rec) - 1, np.max(np.abs(energia(rec.y[:, :2], rec.y[:, 2:]) - energia(q0, p0))),
+        timeit.default_timer() - inicio))
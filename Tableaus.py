@@ -0,0 +1,385 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Method ButcherTableau and the registry of tableaus.
+An explicit Runge Kutta method with an embedded error estimate is given by its Butcher tableau: the weights A of the
+stages, their time fractions C, the weights B of the solution and the weights E of the error estimate. Here the
+tableaus are data, registered by name, and the integrators (RungeKutta_nd, RungeKutta_ensemble) are built with one
+of them:
+RKF45: Fehlberg 4(5), the method of the original RungeKutta classes. It advances with the 4th order solution.
+DOPRI5: Dormand-Prince 5(4). It advances with the 5th order solution and its last stage is f at the new point, which
+is the first stage of the next step (first same as last, FSAL), so it costs 6 evaluations per accepted step.
+BS32: Bogacki-Shampine 3(2), FSAL, 3 evaluations per step. For loose tolerances.
+DOP853: Dormand-Prince 8(5,3), FSAL, 12 evaluations per step. For tight tolerances (1e-10 and below). Its error
+estimate combines a 5th and a 3rd order estimate, as in the original code of Hairer.
+Every tableau also has a continuous extension (dense output) built from the stages of the step, with the order of the
+method or one less, so the solution between the steps is as accurate as at the steps: of order 4 for RKF45 and
+DOPRI5, 3 for BS32 and 7 for DOP853, which needs 3 more evaluations of f per step for it.
+New tableaus are added with registrar.
+"""
+
+import numpy as np
+
+
+
+class ButcherTableau(object):
+    """
+    Builder of ButcherTableau class:
+    nombre: Name used in the registry.
+    A: Array (s, s), A[i, :i] are the weights of the previous stages in the argument of stage i.
+    B: Weights of the solution the method advances with.
+    C: Time fractions of the stages.
+    E: Weights of the error estimate (difference between the weights of the two solutions of the pair).
+    orden: Order of the solution the method advances with.
+    orden_error: Order of the error estimate: its local error is O(h^(orden_error + 1)), which gives the exponent of
+    the step control.
+    E3: Weights of the second error estimate of DOP853, or None.
+    P: Coefficients of the continuous extension, or None. The state at t + s h, for s in [0, 1], is
+    y + h sum_i K_i sum_j P[i, j] s^(j + 1), where K are the stages of the step followed by f at the new point (when
+    the tableau is not FSAL, otherwise it is already the last stage) and by the extra stages.
+    A_extra, C_extra: Weights and time fractions of the extra stages the continuous extension needs, each one computed
+    from all the K before it, or None.
+    If the last stage is f at the new point (C = 1 and its row of A equal to B) the tableau is FSAL.
+    """
+    def __init__(self, nombre, A, B, C, E, orden, orden_error, E3=None, P=None, A_extra=None, C_extra=None):
+        self.nombre = nombre
+        self.A = np.array(A, dtype=float)
+        self.B = np.array(B, dtype=float)
+        self.C = np.array(C, dtype=float)
+        self.E = np.array(E, dtype=float)
+        self.E3 = None if E3 is None else np.array(E3, dtype=float)
+        self.orden = orden
+        self.orden_error = orden_error
+        self.etapas = len(self.C)
+        self.fsal = self.C[-1] == 1. and np.array_equal(self.A[-1], self.B)
+        self.P = None if P is None else np.array(P, dtype=float)
+        self.A_extra = np.zeros((0, 0)) if A_extra is None else np.array(A_extra, dtype=float)
+        self.C_extra = np.zeros(0) if C_extra is None else np.array(C_extra, dtype=float)
+        self._limite = None
+
+    def norma_error(self, k, h, escala=1., out=None):
+        """
+        Size of the local error estimate for the stages k, with every component divided by escala. k may also hold
+        the stages of many members, with shape (s, m, n) and h of shape (m,); then it returns one size per member.
+        out: Array of shape (n,) used as workspace for stages of shape (s, n), so that no array is allocated.
+        """
+        err = self._norma(self.E, k, h, escala, out)
+        if self.E3 is None:
+            return err
+        err3 = self._norma(self.E3, k, h, escala, out)
+        with np.errstate(invalid='ignore'):
+            return np.where(err > 0., err ** 2 / np.sqrt(err ** 2 + 0.01 * err3 ** 2), 0.)
+
+    def _norma(self, pesos, k, h, escala, out):
+        if out is None:
+            return np.max(np.abs(np.asarray(h)[..., None] * np.tensordot(pesos, k, axes=1)) / escala, axis=-1)
+        np.dot(pesos, k, out=out)
+        out *= h
+        np.abs(out, out=out)
+        out /= escala
+        return out.max()
+
+    def estabilidad(self, z):
+        """
+        Stability function R(z): the factor of one step on y' = lambda y, with z = h lambda.
+        """
+        unos = np.ones(self.etapas)
+        return 1. + z * np.dot(self.B, np.linalg.solve(np.eye(self.etapas) - z * self.A, unos))
+
+    @property
+    def limite_estabilidad(self):
+        """
+        Length of the stability interval on the negative real axis: the steps are stable while h * rho is below it,
+        with rho the largest eigenvalue of the Jacobian in absolute value.
+        """
+        if self._limite is None:
+            z = 0.
+            while abs(self.estabilidad(z - 0.01)) <= 1.:
+                z -= 0.01
+            self._limite = -z
+        return self._limite
+
+
+
+"""
+Registry of the tableaus by name.
+"""
+TABLAS = {}
+
+
+def registrar(tabla):
+    TABLAS[tabla.nombre] = tabla
+    return tabla
+
+
+def obtener(tabla):
+    """
+    Returns the tableau registered with the name tabla, or tabla itself if it is already a ButcherTableau.
+    """
+    if isinstance(tabla, ButcherTableau):
+        return tabla
+    try:
+        return TABLAS[tabla]
+    except KeyError:
+        raise ValueError('Unknown tableau {}, the registered ones are {}'.format(tabla, sorted(TABLAS)))
+
+
+
+FEHLBERG = registrar(ButcherTableau(
+    'RKF45',
+    A=[[0., 0., 0., 0., 0., 0.],
+       [1. / 4., 0., 0., 0., 0., 0.],
+       [3. / 32., 9. / 32., 0., 0., 0., 0.],
+       [1932. / 2197., -7200. / 2197., 7296. / 2197., 0., 0., 0.],
+       [439. / 216., -8., 3680. / 513., -845. / 4104., 0., 0.],
+       [-8. / 27., 2., -3544. / 2565., 1859. / 4104., -11. / 40., 0.]],
+    B=[25. / 216., 0., 1408. / 2565., 2197. / 4104., -1. / 5., 0.],
+    C=[0., 1. / 4., 3. / 8., 12. / 13., 1., 1. / 2.],
+    E=[1. / 360., 0., -128. / 4275., -2197. / 75240., 1. / 50., 2. / 55.],
+    orden=4, orden_error=4,
+    #Continuous extension of order 4 with the 6 stages and f at the new point. It matches the state and f at both
+    #ends of the step and, of the family of order 4 that does it, it has the smallest error terms of order 5.
+    P=[[1., -1475077. / 587760., 6565433. / 2644920., -1510921. / 1763280.],
+       [0., 0., 0., 0.],
+       [0., 5868096. / 1163275., -247913344. / 31408425., 35571904. / 10469475.],
+       [0., -417963871. / 122841840., 4945374499. / 552788280., -1845741443. / 368525520.],
+       [0., 276849. / 244900., -374809. / 122450., 423789. / 244900.],
+       [0., -237441. / 134695., 474882. / 134695., -237441. / 134695.],
+       [0., 3. / 2., -4., 5. / 2.]]))
+
+
+DOPRI5 = registrar(ButcherTableau(
+    'DOPRI5',
+    A=[[0., 0., 0., 0., 0., 0., 0.],
+       [1. / 5., 0., 0., 0., 0., 0., 0.],
+       [3. / 40., 9. / 40., 0., 0., 0., 0., 0.],
+       [44. / 45., -56. / 15., 32. / 9., 0., 0., 0., 0.],
+       [19372. / 6561., -25360. / 2187., 64448. / 6561., -212. / 729., 0., 0., 0.],
+       [9017. / 3168., -355. / 33., 46732. / 5247., 49. / 176., -5103. / 18656., 0., 0.],
+       [35. / 384., 0., 500. / 1113., 125. / 192., -2187. / 6784., 11. / 84., 0.]],
+    B=[35. / 384., 0., 500. / 1113., 125. / 192., -2187. / 6784., 11. / 84., 0.],
+    C=[0., 1. / 5., 3. / 10., 4. / 5., 8. / 9., 1., 1.],
+    E=[-71. / 57600., 0., 71. / 16695., -71. / 1920., 17253. / 339200., -22. / 525., 1. / 40.],
+    orden=5, orden_error=4,
+    #Continuous extension of order 4 of Shampine (Hairer, Norsett and Wanner, Solving ODE I, II.6).
+    P=[[1., -8048581381. / 2820520608., 8663915743. / 2820520608., -12715105075. / 11282082432.],
+       [0., 0., 0., 0.],
+       [0., 131558114200. / 32700410799., -68118460800. / 10900136933., 87487479700. / 32700410799.],
+       [0., -1754552775. / 470086768., 14199869525. / 1410260304., -10690763975. / 1880347072.],
+       [0., 127303824393. / 49829197408., -318862633887. / 49829197408., 701980252875. / 199316789632.],
+       [0., -282668133. / 205662961., 2019193451. / 616988883., -1453857185. / 822651844.],
+       [0., 40617522. / 29380423., -110615467. / 29380423., 69997945. / 29380423.]]))
+
+
+BS32 = registrar(ButcherTableau(
+    'BS32',
+    A=[[0., 0., 0., 0.],
+       [1. / 2., 0., 0., 0.],
+       [0., 3. / 4., 0., 0.],
+       [2. / 9., 1. / 3., 4. / 9., 0.]],
+    B=[2. / 9., 1. / 3., 4. / 9., 0.],
+    C=[0., 1. / 2., 3. / 4., 1.],
+    E=[5. / 72., -1. / 12., -1. / 9., 1. / 8.],
+    orden=3, orden_error=2,
+    P=[[1., -4. / 3., 5. / 9.],
+       [0., 1., -2. / 3.],
+       [0., 4. / 3., -8. / 9.],
+       [0., -1., 1.]]))
+
+
+"""
+Coefficients of DOP853 (Hairer, Norsett and Wanner), the 12 stages and the FSAL stage.
+"""
+DOP853_C = np.array([0.0,
+                      0.526001519587677318785587544488e-01,
+                      0.789002279381515978178381316732e-01,
+                      0.118350341907227396726757197510,
+                      0.281649658092772603273242802490,
+                      0.333333333333333333333333333333,
+                      0.25,
+                      0.307692307692307692307692307692,
+                      0.651282051282051282051282051282,
+                      0.6,
+                      0.857142857142857142857142857142,
+                      1.0,
+                      1.0])
+
+DOP853_A = np.zeros((13, 13))
+DOP853_A[1, 0] = 5.26001519587677318785587544488e-2
+DOP853_A[2, 0] = 1.97250569845378994544595329183e-2
+DOP853_A[2, 1] = 5.91751709536136983633785987549e-2
+DOP853_A[3, 0] = 2.95875854768068491816892993775e-2
+DOP853_A[3, 2] = 8.87627564304205475450678981324e-2
+DOP853_A[4, 0] = 2.41365134159266685502369798665e-1
+DOP853_A[4, 2] = -8.84549479328286085344864962717e-1
+DOP853_A[4, 3] = 9.24834003261792003115737966543e-1
+DOP853_A[5, 0] = 3.7037037037037037037037037037e-2
+DOP853_A[5, 3] = 1.70828608729473871279604482173e-1
+DOP853_A[5, 4] = 1.25467687566822425016691814123e-1
+DOP853_A[6, 0] = 3.7109375e-2
+DOP853_A[6, 3] = 1.70252211019544039314978060272e-1
+DOP853_A[6, 4] = 6.02165389804559606850219397283e-2
+DOP853_A[6, 5] = -1.7578125e-2
+DOP853_A[7, 0] = 3.70920001185047927108779319836e-2
+DOP853_A[7, 3] = 1.70383925712239993810214054705e-1
+DOP853_A[7, 4] = 1.07262030446373284651809199168e-1
+DOP853_A[7, 5] = -1.53194377486244017527936158236e-2
+DOP853_A[7, 6] = 8.27378916381402288758473766002e-3
+DOP853_A[8, 0] = 6.24110958716075717114429577812e-1
+DOP853_A[8, 3] = -3.36089262944694129406857109825
+DOP853_A[8, 4] = -8.68219346841726006818189891453e-1
+DOP853_A[8, 5] = 2.75920996994467083049415600797e1
+DOP853_A[8, 6] = 2.01540675504778934086186788979e1
+DOP853_A[8, 7] = -4.34898841810699588477366255144e1
+DOP853_A[9, 0] = 4.77662536438264365890433908527e-1
+DOP853_A[9, 3] = -2.48811461997166764192642586468
+DOP853_A[9, 4] = -5.90290826836842996371446475743e-1
+DOP853_A[9, 5] = 2.12300514481811942347288949897e1
+DOP853_A[9, 6] = 1.52792336328824235832596922938e1
+DOP853_A[9, 7] = -3.32882109689848629194453265587e1
+DOP853_A[9, 8] = -2.03312017085086261358222928593e-2
+DOP853_A[10, 0] = -9.3714243008598732571704021658e-1
+DOP853_A[10, 3] = 5.18637242884406370830023853209
+DOP853_A[10, 4] = 1.09143734899672957818500254654
+DOP853_A[10, 5] = -8.14978701074692612513997267357
+DOP853_A[10, 6] = -1.85200656599969598641566180701e1
+DOP853_A[10, 7] = 2.27394870993505042818970056734e1
+DOP853_A[10, 8] = 2.49360555267965238987089396762
+DOP853_A[10, 9] = -3.0467644718982195003823669022
+DOP853_A[11, 0] = 2.27331014751653820792359768449
+DOP853_A[11, 3] = -1.05344954667372501984066689879e1
+DOP853_A[11, 4] = -2.00087205822486249909675718444
+DOP853_A[11, 5] = -1.79589318631187989172765950534e1
+DOP853_A[11, 6] = 2.79488845294199600508499808837e1
+DOP853_A[11, 7] = -2.85899827713502369474065508674
+DOP853_A[11, 8] = -8.87285693353062954433549289258
+DOP853_A[11, 9] = 1.23605671757943030647266201528e1
+DOP853_A[11, 10] = 6.43392746015763530355970484046e-1
+DOP853_A[12, 0] = 5.42937341165687622380535766363e-2
+DOP853_A[12, 5] = 4.45031289275240888144113950566
+DOP853_A[12, 6] = 1.89151789931450038304281599044
+DOP853_A[12, 7] = -5.8012039600105847814672114227
+DOP853_A[12, 8] = 3.1116436695781989440891606237e-1
+DOP853_A[12, 9] = -1.52160949662516078556178806805e-1
+DOP853_A[12, 10] = 2.01365400804030348374776537501e-1
+DOP853_A[12, 11] = 4.47106157277725905176885569043e-2
+
+DOP853_E5 = np.zeros(13)
+DOP853_E5[0] = 0.1312004499419488073250102996e-1
+DOP853_E5[5] = -0.1225156446376204440720569753e+1
+DOP853_E5[6] = -0.4957589496572501915214079952
+DOP853_E5[7] = 0.1664377182454986536961530415e+1
+DOP853_E5[8] = -0.3503288487499736816886487290
+DOP853_E5[9] = 0.3341791187130174790297318841
+DOP853_E5[10] = 0.8192320648511571246570742613e-1
+DOP853_E5[11] = -0.2235530786388629525884427845e-1
+
+DOP853_E3 = np.zeros(13)
+DOP853_E3[:12] = DOP853_A[12, :12]
+DOP853_E3[0] -= 0.244094488188976377952755905512
+DOP853_E3[8] -= 0.733846688281611857341361741547
+DOP853_E3[11] -= 0.220588235294117647058823529412e-1
+
+"""
+Continuous extension of DOP853 of order 7 (the dense output of the code of Hairer). It needs 3 extra stages, the rows
+of DOP853_A_EXTRA, after the 13 stages of the step. The code of Hairer gives the solution as
+y + s (F0 + (1 - s) (F1 + s (F2 + (1 - s) (F3 + s (F4 + (1 - s) (F5 + s F6)))))), with F0 = y_new - y,
+F1 = h f - F0, F2 = 2 F0 - h (f + f_new) and F3...F6 = h DOP853_D K. These F are combinations of the stages K, so it is
+written here as the P of the other tableaus.
+"""
+DOP853_C_EXTRA = np.array([0.1, 0.2, 0.777777777777777777777777777778])
+
+DOP853_A_EXTRA = np.zeros((3, 16))
+DOP853_A_EXTRA[0, 0] = 5.61675022830479523392909219681e-2
+DOP853_A_EXTRA[0, 6] = 2.53500210216624811088794765333e-1
+DOP853_A_EXTRA[0, 7] = -2.46239037470802489917441475441e-1
+DOP853_A_EXTRA[0, 8] = -1.24191423263816360469010140626e-1
+DOP853_A_EXTRA[0, 9] = 1.5329179827876569731206322685e-1
+DOP853_A_EXTRA[0, 10] = 8.20105229563468988491666602057e-3
+DOP853_A_EXTRA[0, 11] = 7.56789766054569976138603589584e-3
+DOP853_A_EXTRA[0, 12] = -8.298e-3
+DOP853_A_EXTRA[1, 0] = 3.18346481635021405060768473261e-2
+DOP853_A_EXTRA[1, 5] = 2.83009096723667755288322961402e-2
+DOP853_A_EXTRA[1, 6] = 5.35419883074385676223797384372e-2
+DOP853_A_EXTRA[1, 7] = -5.49237485713909884646569340306e-2
+DOP853_A_EXTRA[1, 10] = -1.08347328697249322858509316994e-4
+DOP853_A_EXTRA[1, 11] = 3.82571090835658412954920192323e-4
+DOP853_A_EXTRA[1, 12] = -3.40465008687404560802977114492e-4
+DOP853_A_EXTRA[1, 13] = 1.41312443674632500278074618366e-1
+DOP853_A_EXTRA[2, 0] = -4.28896301583791923408573538692e-1
+DOP853_A_EXTRA[2, 5] = -4.69762141536116384314449447206
+DOP853_A_EXTRA[2, 6] = 7.68342119606259904184240953878
+DOP853_A_EXTRA[2, 7] = 4.06898981839711007970213554331
+DOP853_A_EXTRA[2, 8] = 3.56727187455281109270669543021e-1
+DOP853_A_EXTRA[2, 12] = -1.39902416515901462129418009734e-3
+DOP853_A_EXTRA[2, 13] = 2.9475147891527723389556272149
+DOP853_A_EXTRA[2, 14] = -9.15095847217987001081870187138
+
+DOP853_D = np.zeros((4, 16))
+DOP853_D[0, 0] = -0.84289382761090128651353491142e+1
+DOP853_D[0, 5] = 0.56671495351937776962531783590
+DOP853_D[0, 6] = -0.30689499459498916912797304727e+1
+DOP853_D[0, 7] = 0.23846676565120698287728149680e+1
+DOP853_D[0, 8] = 0.21170345824450282767155149946e+1
+DOP853_D[0, 9] = -0.87139158377797299206789907490
+DOP853_D[0, 10] = 0.22404374302607882758541771650e+1
+DOP853_D[0, 11] = 0.63157877876946881815570249290
+DOP853_D[0, 12] = -0.88990336451333310820698117400e-1
+DOP853_D[0, 13] = 0.18148505520854727256656404962e+2
+DOP853_D[0, 14] = -0.91946323924783554000451984436e+1
+DOP853_D[0, 15] = -0.44360363875948939664310572000e+1
+DOP853_D[1, 0] = 0.10427508642579134603413151009e+2
+DOP853_D[1, 5] = 0.24228349177525818288430175319e+3
+DOP853_D[1, 6] = 0.16520045171727028198505394887e+3
+DOP853_D[1, 7] = -0.37454675472269020279518312152e+3
+DOP853_D[1, 8] = -0.22113666853125306036270938578e+2
+DOP853_D[1, 9] = 0.77334326684722638389603898808e+1
+DOP853_D[1, 10] = -0.30674084731089398182061213626e+2
+DOP853_D[1, 11] = -0.93321305264302278729567221706e+1
+DOP853_D[1, 12] = 0.15697238121770843886131091075e+2
+DOP853_D[1, 13] = -0.31139403219565177677282850411e+2
+DOP853_D[1, 14] = -0.93529243588444783865713862664e+1
+DOP853_D[1, 15] = 0.35816841486394083752465898540e+2
+DOP853_D[2, 0] = 0.19985053242002433820987653617e+2
+DOP853_D[2, 5] = -0.38703730874935176555105901742e+3
+DOP853_D[2, 6] = -0.18917813819516756882830838328e+3
+DOP853_D[2, 7] = 0.52780815920542364900561016686e+3
+DOP853_D[2, 8] = -0.11573902539959630126141871134e+2
+DOP853_D[2, 9] = 0.68812326946963000169666922661e+1
+DOP853_D[2, 10] = -0.10006050966910838403183860980e+1
+DOP853_D[2, 11] = 0.77771377980534432092869265740
+DOP853_D[2, 12] = -0.27782057523535084065932004339e+1
+DOP853_D[2, 13] = -0.60196695231264120758267380846e+2
+DOP853_D[2, 14] = 0.84320405506677161018159903784e+2
+DOP853_D[2, 15] = 0.11992291136182789328035130030e+2
+DOP853_D[3, 0] = -0.25693933462703749003312586129e+2
+DOP853_D[3, 5] = -0.15418974869023643374053993627e+3
+DOP853_D[3, 6] = -0.23152937917604549567536039109e+3
+DOP853_D[3, 7] = 0.35763911791061412378285349910e+3
+DOP853_D[3, 8] = 0.93405324183624310003907691704e+2
+DOP853_D[3, 9] = -0.37458323136451633156875139351e+2
+DOP853_D[3, 10] = 0.10409964950896230045147246184e+3
+DOP853_D[3, 11] = 0.29840293426660503123344363579e+2
+DOP853_D[3, 12] = -0.43533456590011143754432175058e+2
+DOP853_D[3, 13] = 0.96324553959188282948394950600e+2
+DOP853_D[3, 14] = -0.39177261675615439165231486172e+2
+DOP853_D[3, 15] = -0.14972683625798562581422125276e+3
+
+
+def _p_dop853():
+    B = np.zeros(16)
+    B[:13] = DOP853_A[12]
+    f, f_nou = np.eye(16)[0], np.eye(16)[12]
+    F = np.vstack((B, f - B, 2. * B - f - f_nou, DOP853_D))  #F = h * dot(F, K).
+    #Powers of s of the products s, s (1 - s), s (1 - s) s, ... that multiply F0, F1, F2, ...
+    potencias = np.zeros((7, 7))
+    producto = np.array([0., 1.])
+    for j in range(7):
+        potencias[j, :len(producto) - 1] = producto[1:]
+        producto = np.polynomial.polynomial.polymul(producto, [0., 1.] if j % 2 else [1., -1.])
+    return np.dot(F.T, potencias)
+
+
+DOP853 = registrar(ButcherTableau('DOP853', DOP853_A, DOP853_A[12], DOP853_C, DOP853_E5, orden=8, orden_error=7,
+                                  E3=DOP853_E3, P=_p_dop853(), A_extra=DOP853_A_EXTRA, C_extra=DOP853_C_EXTRA))
@@ -6,9 +6,10 @@
 
 
 import numpy as np
-import matplotlib.pyplot as plt
 
 from collections import namedtuple
+from Runge_Kutta import RungeKutta_nd
+from Events import Event
 
 
 # In[4]:
@@ -105,117 +106,136 @@ def vert_shot_analytic(x_0, v_0, dt, g = -9.81):
     return PosicionTiempo(pos, temps)
 
 
+# In[ ]:
+
+
+# Tiro vertical with the adaptive RKF45: the ground is a terminal event, so the impact is located exactly
+# whatever the size of the steps
+def vert_shot_rkf(x_0, v_0, h, g = -9.81, error = 1e-6):
+    suelo = Event(lambda t, y: y[0], terminal=True, direction=-1)
+    rk = RungeKutta_nd(0., [x_0, v_0], np.inf, h, error, f=lambda t, y: np.array([y[1], g]))
+    rec = rk.integrar(eventos=[suelo])
+    return PosicionTiempo(rec.y[:, 0], rec.t)
+
+
 # In[9]:
 
 
-x_0 = 0
-v_0 = 25
-dt = 0.1
-dt_2 = 0.5
-dt_3 = 0.01
+if __name__ == '__main__':
+    import matplotlib.pyplot as plt
 
+    x_0 = 0
+    v_0 = 25
+    dt = 0.1
+    dt_2 = 0.5
+    dt_3 = 0.01
 
-# In[10]:
 
+    # In[10]:
 
-pt1 = vert_shot(x_0, v_0, dt)
 
+    pt1 = vert_shot(x_0, v_0, dt)
 
-# In[11]:
 
+    # In[11]:
 
-pt2 = vert_shot_ft(x_0, v_0, dt)
 
+    pt2 = vert_shot_ft(x_0, v_0, dt)
 
-# In[12]:
 
+    # In[12]:
 
-pt3 = vert_shot_ct(x_0, v_0, dt)
 
+    pt3 = vert_shot_ct(x_0, v_0, dt)
 
-# In[13]:
 
+    # In[13]:
 
-pta = vert_shot_analytic(x_0, v_0, dt)
 
+    pta = vert_shot_analytic(x_0, v_0, dt)
 
-# In[17]:
 
+    # In[17]:
 
-pt1_2 = vert_shot(x_0, v_0, dt_2)
 
+    pt1_2 = vert_shot(x_0, v_0, dt_2)
 
-# In[18]:
 
+    # In[18]:
 
-pt2_2 = vert_shot_ft(x_0, v_0, dt_2)
 
+    pt2_2 = vert_shot_ft(x_0, v_0, dt_2)
 
-# In[19]:
 
+    # In[19]:
 
-pt3_2 = vert_shot_ct(x_0, v_0, dt_2)
 
+    pt3_2 = vert_shot_ct(x_0, v_0, dt_2)
 
-# In[20]:
 
+    # In[ ]:
 
-pt1_3 = vert_shot(x_0, v_0, dt_3)
 
+    pt4_2 = vert_shot_rkf(x_0, v_0, dt_2)
+    print("Impact time RKF45: {}, analytical: {}".format(pt4_2.tiempo[-1], 2. * v_0 / 9.81))
 
-# In[21]:
 
+    # In[20]:
 
-pt2_3 = vert_shot_ft(x_0, v_0, dt_3)
 
+    pt1_3 = vert_shot(x_0, v_0, dt_3)
 
-# In[22]:
 
+    # In[21]:
 
-pt3_3 = vert_shot_ct(x_0, v_0, dt_3)
 
+    pt2_3 = vert_shot_ft(x_0, v_0, dt_3)
 
-# In[23]:
 
+    # In[22]:
 
-plt.title("Vertical Shot, dt = 0.1")
-plt.xlabel("Time")
-plt.ylabel("Position")
-plt.plot(pt1.tiempo, pt1.posicion, label="Numerical Calc. BT")
-plt.plot(pt2.tiempo, pt2.posicion, label="Numerical Calc. FT")
-plt.plot(pt3.tiempo, pt3.posicion, label="Numerical Calc. CT")
-plt.plot(pta.tiempo, pta.posicion, label = "Analytical Solution")
-plt.legend()
-plt.show()
 
-# In[24]:
+    pt3_3 = vert_shot_ct(x_0, v_0, dt_3)
 
 
-plt.title("Vertical Shot, dt = 0.5")
-plt.xlabel("Time")
-plt.ylabel("Position")
-plt.plot(pt1_2.tiempo, pt1_2.posicion, label="Numerical Calc. BT")
-plt.plot(pt2_2.tiempo, pt2_2.posicion, label="Numerical Calc. FT")
-plt.plot(pt3_2.tiempo, pt3_2.posicion, label="Numerical Calc. CT")
-plt.plot(pta.tiempo, pta.posicion, label = "Analytical Solution")
-plt.legend()
-plt.show()
+    # In[23]:
 
-# In[25]:
 
+    plt.title("Vertical Shot, dt = 0.1")
+    plt.xlabel("Time")
+    plt.ylabel("Position")
+    plt.plot(pt1.tiempo, pt1.posicion, label="Numerical Calc. BT")
+    plt.plot(pt2.tiempo, pt2.posicion, label="Numerical Calc. FT")
+    plt.plot(pt3.tiempo, pt3.posicion, label="Numerical Calc. CT")
+    plt.plot(pta.tiempo, pta.posicion, label = "Analytical Solution")
+    plt.legend()
+    plt.show()
 
-plt.title("Vertical Shot, dt = 0.01")
-plt.xlabel("Time")
-plt.ylabel("Position")
-plt.plot(pt1_3.tiempo, pt1_3.posicion, label="Numerical Calc. BT")
-plt.plot(pt2_3.tiempo, pt2_3.posicion, label="Numerical Calc. FT")
-plt.plot(pt3_3.tiempo, pt3_3.posicion, label="Numerical Calc. CT")
-plt.plot(pta.tiempo, pta.posicion, label = "Analytical Solution")
-plt.legend()
-plt.show()
+    # In[24]:
 
-# In[ ]:
 
+    plt.title("Vertical Shot, dt = 0.5")
+    plt.xlabel("Time")
+    plt.ylabel("Position")
+    plt.plot(pt1_2.tiempo, pt1_2.posicion, label="Numerical Calc. BT")
+    plt.plot(pt2_2.tiempo, pt2_2.posicion, label="Numerical Calc. FT")
+    plt.plot(pt3_2.tiempo, pt3_2.posicion, label="Numerical Calc. CT")
+    plt.plot(pt4_2.tiempo, pt4_2.posicion, 'o--', label="Numerical Calc. RKF45")
+    plt.plot(pta.tiempo, pta.posicion, label = "Analytical Solution")
+    plt.legend()
+    plt.show()
+
+    # In[25]:
 
 
+    plt.title("Vertical Shot, dt = 0.01")
+    plt.xlabel("Time")
+    plt.ylabel("Position")
+    plt.plot(pt1_3.tiempo, pt1_3.posicion, label="Numerical Calc. BT")
+    plt.plot(pt2_3.tiempo, pt2_3.posicion, label="Numerical Calc. FT")
+    plt.plot(pt3_3.tiempo, pt3_3.posicion, label="Numerical Calc. CT")
+    plt.plot(pta.tiempo, pta.posicion, label = "Analytical Solution")
+    plt.legend()
+    plt.show()
 
+    # In[ ]:
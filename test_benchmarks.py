@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Tests of Benchmarks, on the cheapest problems.
+"""
+
+import io
+import json
+import os
+import subprocess
+import sys
+
+import Benchmarks
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_ejecutar_y_comparar():
+    salida = io.StringIO()
+    informe = Benchmarks.ejecutar(['1D', 'vertical shot'], ['RKF45', 'DOPRI5'], (1e-4, 1e-8), repeticiones=1,
+                                  salida=salida)
+    resultados = informe['results']
+    assert len(resultados) == 8 and len(salida.getvalue().splitlines()) == 8
+    for r in resultados:
+        assert r['accepted'] > 0 and r['nfev'] >= r['accepted'] and r['time'] > 0.
+        assert r['error'] < 1e3 * r['tol']
+    rkf = [r for r in resultados if r['problem'] == '1D' and r['solver'] == 'RKF45']
+    assert rkf[0]['nfev'] < rkf[1]['nfev'] and rkf[0]['error'] > rkf[1]['error']
+
+    filas = Benchmarks.comparar(informe, json.loads(json.dumps(informe)), salida=None)
+    assert len(filas) == 8 and all(fila[3] == fila[4] == 1. for fila in filas)
+
+
+def test_rigido():
+    r = Benchmarks.medir('Robertson', 'Rosenbrock', 1e-4, repeticiones=1)
+    assert r['njev'] > 0 and r['error'] < 1e-3
+
+
+def test_linea_de_comandos(tmp_path):
+    archivo = str(tmp_path / 'b.json')
+    subprocess.check_call([sys.executable, 'Benchmarks.py', '-p', '1D', '-s', 'BS32', '-t', '1e-5', '-r', '1', '-o',
+                           archivo], cwd=DIRECTORIO, stdout=subprocess.DEVNULL)
+    salida = subprocess.check_output([sys.executable, 'Benchmarks.py', '--compare', archivo, archivo],
+                                     cwd=DIRECTORIO, universal_newlines=True)
+    assert 'BS32' in salida and 'time x1.000, nfev x1.000' in salida
+    with open(archivo) as fichero:
+        assert [r['solver'] for r in json.load(fichero)['results']] == ['BS32']
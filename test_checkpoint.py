@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Tests of Checkpoint: an integration stopped by a crash and resumed from its last checkpoint makes the same steps.
+"""
+
+import numpy as np
+import pytest
+
+from Checkpoint import Checkpoint, reanudar
+from Dense_Output import DenseOutput
+from Memmap_Recorder import MemmapRecorder, abrir
+from Runge_Kutta import RungeKutta_nd
+
+
+def van_der_pol(t, y): return np.array([y[1], 4. * (1. - y[0] ** 2) * y[1] - y[0]])
+
+
+class Caida(Exception):
+    pass
+
+
+def caer_en(pasos):
+    contador = [0]
+
+    def caer(rk):
+        contador[0] += 1
+        if contador[0] == pasos:
+            raise Caida()
+    return caer
+
+
+def nuevo():
+    return RungeKutta_nd(0., [2., 0.], 20., None, 1e-6, f=van_der_pol)
+
+
+def test_reanudar(tmp_path):
+    archivo = str(tmp_path / 'vdp.npz')
+    completo = nuevo()
+    referencia = completo.integrar(dense_output=True)
+
+    rk = nuevo()
+    with pytest.raises(Caida):
+        rk.integrar(dense_output=True, hooks=[Checkpoint(archivo, pasos=20), caer_en(50)])  #Saved at the step 40.
+
+    rk = nuevo()
+    rec = reanudar(archivo, rk)
+    assert len(rec) == 41
+    rec = rk.integrar(recorder=rec, dense_output=True)
+    assert np.array_equal(rec.t, referencia.t)
+    assert np.array_equal(rec.y, referencia.y)
+    assert np.array_equal(rec.h, referencia.h)
+    #rk.sol only covers the steps after the checkpoint, the whole solution is rebuilt from the derivatives.
+    assert rk.sol.t[0] == referencia.t[40]
+    t = np.linspace(0., 20., 401)
+    assert np.allclose(DenseOutput(rec.t, rec.y, rec.dy)(t), completo.sol(t), rtol=0., atol=1e-3)
+
+
+def test_reanudar_memmap(tmp_path):
+    directorio = str(tmp_path / 'vdp')
+    archivo = str(tmp_path / 'vdp.npz')
+    referencia = nuevo().integrar()
+
+    rk = nuevo()
+    with pytest.raises(Caida):
+        rk.integrar(recorder=MemmapRecorder(directorio, 2, capacidad=16),
+                    hooks=[Checkpoint(archivo, pasos=20), caer_en(50)])
+    with np.load(archivo) as datos:
+        assert 'rec_t' not in datos.files and int(datos['rec_cuenta']) == 41
+
+    rk = nuevo()
+    rec = reanudar(archivo, rk)
+    assert isinstance(rec, MemmapRecorder) and len(rec) == 41
+    rk.integrar(recorder=rec)
+    leido = abrir(directorio)
+    assert np.array_equal(leido.t, referencia.t)
+    assert np.array_equal(leido.y, referencia.y)
@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Tests of Convergence.estudio.
+"""
+
+import functools
+import io
+
+import numpy as np
+import pytest
+
+import proves
+from Convergence import Adaptativo, PasoFijo, escalera, estudio, tabla
+
+
+def decaimiento(t, y): return -y
+def exacta(t): return np.exp(-t)
+def tiro(t): return 25. * t - 0.5 * 9.81 * t ** 2
+
+
+@pytest.mark.parametrize('nombre, orden', [('BS32', 3), ('RKF45', 4), ('DOPRI5', 5)])
+def test_orden_paso_fijo(nombre, orden):
+    filas = estudio(PasoFijo(decaimiento, 0., [1.], 2., nombre), exacta, escalera(0.2, 0.5, 4), procesos=1)
+    assert [fila['pasos'] for fila in filas] == [10, 20, 40, 80]
+    assert np.isnan(filas[0]['orden_parametro'])
+    for fila in filas[1:]:
+        assert fila['orden_parametro'] == pytest.approx(orden, abs=0.3)
+        assert fila['orden_pasos'] == pytest.approx(fila['orden_parametro'])
+
+
+def test_paralelo_y_tabla():
+    serie = estudio(Adaptativo(decaimiento, 0., [1.], 2.), exacta, escalera(1e-3, 0.1, 4), procesos=1)
+    paralelo = estudio(Adaptativo(decaimiento, 0., [1.], 2.), exacta, escalera(1e-3, 0.1, 4), procesos=2)
+    assert [(fila['pasos'], fila['error']) for fila in serie] == [(fila['pasos'], fila['error']) for fila in paralelo]
+    assert all(a['error'] > b['error'] and a['pasos'] < b['pasos'] for a, b in zip(serie, serie[1:]))
+    salida = io.StringIO()
+    tabla(serie, 'Adaptive RKF45', salida)
+    assert salida.getvalue().splitlines()[0] == 'Adaptive RKF45' and len(salida.getvalue().splitlines()) == 6
+
+
+def test_esquemas_de_proves():
+    #The vertical shot with forward time differences: first order in dt, in a PosicionTiempo.
+    filas = estudio(functools.partial(proves.vert_shot_ft, 0., 25.), tiro, escalera(0.05, 0.5, 3), procesos=1,
+                    componentes=[0])
+    assert filas[-1]['orden_parametro'] == pytest.approx(1., abs=0.1)
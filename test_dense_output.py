@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Tests of Dense_Output and of the dense output of integrar.
+"""
+
+import numpy as np
+import pytest
+
+from Dense_Output import DenseOutput, evaluar, hermite, hermite_coeficientes
+from Events import Event
+from Exe_runge_kutta_1D import f as f_1d, f_analytic
+from Runge_Kutta import RungeKutta_nd
+from Tableaus import TABLAS
+
+
+def f_escalar(t, y): return np.array([f_1d(t, y[0])])
+def oscilador(t, y): return np.array([y[1], -y[0]])
+
+
+def test_hermite_cubica():
+    #The cubic Hermite polynomial of a cubic is the cubic itself, in both forms.
+    def p(t): return 2. * t ** 3 - t ** 2 + 3. * t - 1.
+    def dp(t): return 6. * t ** 2 - 2. * t + 3.
+    t = np.linspace(0.5, 2., 7)
+    Q = hermite_coeficientes(1.5, np.array([p(0.5)]), np.array([p(2.)]), np.array([dp(0.5)]), np.array([dp(2.)]))
+    assert np.allclose(evaluar(0.5, 1.5, np.array([p(0.5)]), Q, t)[:, 0], p(t), rtol=1e-14)
+    assert np.allclose(hermite(0.5, 2., p(0.5), p(2.), dp(0.5), dp(2.), t)[:, 0], p(t), rtol=1e-14)
+    nodos = np.array([0., 1., 3.])
+    sol = DenseOutput(nodos, p(nodos)[:, None], dp(nodos)[:, None])
+    assert np.allclose(sol(np.linspace(0., 3., 31))[:, 0], p(np.linspace(0., 3., 31)), rtol=1e-13)
+
+
+@pytest.mark.parametrize('tabla', sorted(TABLAS))
+def test_entre_pasos(tabla):
+    #The continuous extension is as accurate between the steps as at them, and goes through the steps.
+    rk = RungeKutta_nd(1., [1.], 10., None, 1e-8, f=f_escalar, tabla=tabla)
+    rec = rk.integrar(dense_output=True)
+    t = np.linspace(1., 10., 1001)
+    assert np.max(np.abs(rk.sol(t)[:, 0] - f_analytic(t))) < 1e-6
+    assert np.allclose(rk.sol(rec.t)[:, 0], rec.y[:, 0], rtol=1e-13, atol=0.)
+
+
+def test_t_eval():
+    t_eval = np.linspace(0., 10., 37)
+    rk = RungeKutta_nd(0., [1., 0.], 10., None, 1e-8, f=oscilador)
+    rec = rk.integrar(t_eval=t_eval)
+    assert np.array_equal(rec.t, t_eval)
+    assert np.allclose(rec.y[:, 0], np.cos(t_eval), atol=1e-6)
+    denso = RungeKutta_nd(0., [1., 0.], 10., None, 1e-8, f=oscilador)
+    denso.integrar(dense_output=True)
+    #The same steps: the samples of t_eval are the dense output at those times.
+    assert np.allclose(rec.y, denso.sol(t_eval), rtol=0., atol=1e-14)
+
+
+def test_evento_terminal():
+    #The last polynomial is the one of the whole step, cut at the zero of the event.
+    rk = RungeKutta_nd(0., [1., 0.], 10., None, 1e-8, f=oscilador)
+    rk.integrar(dense_output=True, eventos=[Event(lambda t, y: y[0], terminal=True)])
+    assert rk.sol.t[-1] == rk.t == pytest.approx(np.pi / 2., abs=1e-6)
+    t = np.linspace(0., rk.t, 101)
+    assert np.allclose(rk.sol(t)[:, 0], np.cos(t), atol=1e-6)
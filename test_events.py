@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Tests of Events: zeros of event functions located inside the steps of integrar.
+"""
+
+import numpy as np
+import pytest
+
+import proves
+from Events import Event, brent
+from Runge_Kutta import RungeKutta_nd
+
+
+def oscilador(t, y): return np.array([y[1], -y[0]])
+
+
+def test_tiro_vertical():
+    x, t = proves.vert_shot_rkf(0., 25., 0.5)
+    assert t[-1] == pytest.approx(2. * 25. / 9.81, rel=1e-10)
+    assert abs(x[-1]) < 1e-10
+    assert np.all(x[1:-1] > 0.)
+
+
+def test_direcciones():
+    #x = cos(t) crosses zero at pi/2 + k pi, downwards for even k. The velocity is zero at k pi.
+    eventos = [Event(lambda t, y: y[0]), Event(lambda t, y: y[0], direction=-1), Event(lambda t, y: y[1], direction=1)]
+    rk = RungeKutta_nd(0., [1., 0.], 10., None, 1e-8, f=oscilador)
+    rk.integrar(eventos=eventos)
+    for i, ceros in enumerate((np.pi / 2. + np.pi * np.arange(3), np.pi / 2. + 2. * np.pi * np.arange(2),
+                               np.pi * np.array([1., 3.]))):
+        assert np.allclose(rk.eventos['t'][rk.eventos['evento'] == i], ceros, rtol=0., atol=1e-5)
+    assert np.all(np.diff(rk.eventos['t']) >= 0.)
+    assert rk.t == 10.
+    #The velocity starts at zero: that zero was not crossed, so it is not reported.
+    assert not np.any(rk.eventos['t'] == 0.)
+
+
+def test_terminal_con_t_eval():
+    t_eval = np.linspace(0., 10., 101)
+    rk = RungeKutta_nd(0., [1., 0.], 10., None, 1e-8, f=oscilador)
+    rec = rk.integrar(t_eval=t_eval, eventos=[Event(lambda t, y: y[0] + 0.5, terminal=True)])
+    assert rk.t == pytest.approx(2. * np.pi / 3., abs=1e-6)
+    assert rec.t[-1] <= rk.t < rec.t[-1] + 0.1
+    assert np.allclose(rec.y[:, 0], np.cos(rec.t), atol=1e-6)
+    assert len(rk.eventos) == 1 and rk.eventos['y'][0, 0] == pytest.approx(-0.5, abs=1e-10)
+
+
+def test_brent():
+    f = lambda t: np.cos(t) - t
+    t = brent(f, 0., 1., f(0.), f(1.))
+    assert abs(f(t)) < 1e-15
@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Tests of RungeKutta_nd.iterar, the step by step integration.
+"""
+
+import itertools
+
+import numpy as np
+
+from Runge_Kutta import RungeKutta_nd
+
+
+def van_der_pol(t, y): return np.array([y[1], 4. * (1. - y[0] ** 2) * y[1] - y[0]])
+
+
+def nuevo():
+    return RungeKutta_nd(0., [2., 0.], 20., None, 1e-6, f=van_der_pol)
+
+
+def test_igual_que_integrar():
+    referencia = nuevo().integrar()
+    pasos = [(t, y.copy(), h) for t, y, h in nuevo().iterar()]
+    assert np.array_equal([t for t, y, h in pasos], referencia.t)
+    assert np.array_equal([y for t, y, h in pasos], referencia.y)
+    assert np.array_equal([h for t, y, h in pasos], referencia.h)
+
+
+def test_bloques():
+    referencia = nuevo().integrar()
+    bloques = list(nuevo().iterar(chunk=64))
+    assert all(len(t) == 64 for t, y, h in bloques[:-1]) and 0 < len(bloques[-1][0]) <= 64
+    assert np.array_equal(np.concatenate([t for t, y, h in bloques]), referencia.t)
+    assert np.array_equal(np.concatenate([y for t, y, h in bloques]), referencia.y)
+
+
+def test_parada_temprana():
+    #The consumer stops when x first becomes negative: the solver has not gone further.
+    rk = nuevo()
+    t, y, h = next(itertools.dropwhile(lambda paso: paso[1][0] >= 0., rk.iterar()))
+    assert y[0] < 0. and rk.t == t < 20.
+
+
+def test_paso_fijo():
+    t = [t for t, y, h in RungeKutta_nd(0., [1.], 1., 0.25, 1., f=lambda t, y: -y).iterar(adaptativo=False)]
+    assert t == [0., 0.25, 0.5, 0.75, 1.]
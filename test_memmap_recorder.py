@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Tests of Memmap_Recorder.
+"""
+
+import json
+import os
+
+import numpy as np
+import pytest
+
+from Memmap_Recorder import MemmapRecorder, abrir
+from Runge_Kutta import RungeKutta_nd
+
+
+def van_der_pol(t, y): return np.array([y[1], 4. * (1. - y[0] ** 2) * y[1] - y[0]])
+
+
+def test_como_recorder(tmp_path):
+    #The same steps as the in-memory Recorder, written in chunks of 16, with the derivatives for dense output.
+    directorio = str(tmp_path / 'vdp')
+    referencia = RungeKutta_nd(0., [2., 0.], 20., None, 1e-6, f=van_der_pol).integrar(dense_output=True)
+    rk = RungeKutta_nd(0., [2., 0.], 20., None, 1e-6, f=van_der_pol)
+    rec = rk.integrar(dense_output=True, recorder=MemmapRecorder(directorio, 2, capacidad=16, derivadas=True))
+    for leido in (rec, abrir(directorio)):
+        assert len(leido) == len(referencia)
+        for nombre in ('t', 'y', 'h', 'dy'):
+            assert np.array_equal(getattr(leido, nombre), getattr(referencia, nombre))
+    with open(os.path.join(directorio, 'meta.json')) as fichero:
+        meta = json.load(fichero)
+    assert meta['cuenta'] == len(referencia) and meta['n'] == 2 and meta['columnas'] == ['t', 'y', 'h', 'dy']
+    assert os.path.getsize(os.path.join(directorio, 'y.bin')) == len(referencia) * 2 * 8
+    rec.cerrar()
+
+
+def test_vistas_hasta_flush(tmp_path):
+    directorio = str(tmp_path / 'datos')
+    with MemmapRecorder(directorio, 2, capacidad=4) as rec:
+        for i in range(6):
+            rec.append(float(i), [i, -i], 0.5)
+        #The first chunk is on disk, the last two steps are still in memory.
+        assert len(rec) == 6 and len(rec.t) == 4 and len(abrir(directorio)) == 4
+        rec.extend(np.arange(6., 16.), np.zeros((10, 2)), np.ones(10))  #Larger than a chunk: straight to disk.
+        assert len(rec.t) == 16
+        t = rec.t
+        with pytest.raises(ValueError):
+            t[0] = 1.
+    leido = abrir(directorio)
+    assert leido.t.tolist() == list(range(16)) and leido.y[5].tolist() == [5., -5.] and leido.dy is None
+
+
+def test_continuar(tmp_path):
+    #With cuenta, the steps after it are discarded and the new ones are appended.
+    directorio = str(tmp_path / 'datos')
+    with MemmapRecorder(directorio, 1, capacidad=4) as rec:
+        rec.extend(np.arange(10.), np.arange(10.)[:, None], np.ones(10))
+    with MemmapRecorder(directorio, 1, capacidad=4, cuenta=3) as rec:
+        rec.append(30., [30.], 2.)
+    leido = abrir(directorio)
+    assert leido.t.tolist() == [0., 1., 2., 30.] and leido.h.tolist() == [1., 1., 1., 2.]
+    assert leido.meta['cuenta'] == 4
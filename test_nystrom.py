@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Tests of the Runge Kutta Nystrom methods of Nystrom.
+"""
+
+import numpy as np
+import pytest
+
+from Exe_runge_kutta_2D import f_1, g
+from Nystrom import RungeKutta_nystrom
+from Runge_Kutta import RungeKutta_2d
+
+
+def oscilador(t, x): return -x  #x = cos(t), v = -sin(t) from x = 1, v = 0.
+
+
+@pytest.mark.parametrize('tabla', ['RKF45', 'DOPRI5'])
+def test_igual_que_runge_kutta_2d(tabla):
+    #van der Pol from x = 1, where (1 - x^2) v vanishes: the default method must still be the general one.
+    rk = RungeKutta_2d(0., 1., 0., 20., 0.5, 1e-6, tabla=tabla)
+    rk.f, rk.g = f_1, g
+    rec = rk.integrar()
+    argumentos = () if tabla == 'RKF45' else (tabla,)
+    rkn = RungeKutta_nystrom(0., 1., 0., 20., 0.5, 1e-6, None, *argumentos)
+    rkn.f = f_1  #Given after construction, as in the rest of the repo.
+    rec_n = rkn.integrar()
+    assert not rkn.tabla.especial
+    assert np.array_equal(rec.t, rec_n.t)
+    assert np.allclose(rec.y, rec_n.y, rtol=1e-12, atol=1e-12)
+
+
+def test_rkn43_adaptativo():
+    errores = []
+    for tol in (1e-6, 1e-8, 1e-10):
+        rkn = RungeKutta_nystrom(0., [1., 0.], [0., 1.], 10., None, tol, f=oscilador, tabla='RKN43')
+        rec = rkn.integrar(dense_output=True)
+        errores.append(np.max(np.abs(rec.y - np.column_stack((np.cos(rec.t), np.sin(rec.t), -np.sin(rec.t),
+                                                                np.cos(rec.t))))))
+        t = np.linspace(0., 10., 301)
+        assert np.max(np.abs(rkn.sol(t)[:, 0] - np.cos(t))) < 10. * errores[-1]
+    assert errores[0] < 1e-4 and errores[1] < 1e-6 and errores[2] < 1e-8
+    assert errores[0] > errores[1] > errores[2]
+
+
+def test_rkn4_orden():
+    errores = []
+    for h in (0.1, 0.05, 0.025):
+        rkn = RungeKutta_nystrom(0., 1., 0., 5., h, 1., f=oscilador, tabla='RKN4')
+        rkn.integrar(adaptativo=False)
+        errores.append(abs(rkn.x[0] - np.cos(5.)))
+    ordenes = np.log2(np.array(errores[:-1]) / errores[1:])
+    assert np.all(np.abs(ordenes - 4.) < 0.2)
+
+
+def test_especial_es_explicito():
+    #The especial methods take f(t, x): a velocity dependent f(t, x, v) cannot reach them.
+    rkn = RungeKutta_nystrom(0., 1., 0., 1., 0.1, 1e-6, f=f_1, tabla='RKN43')
+    with pytest.raises(TypeError):
+        rkn.integrar()
+    with pytest.raises(ValueError, match='needs the step'):
+        RungeKutta_nystrom(0., 1., 0., 1., None, 1e-6, f=oscilador, tabla='RKN4')
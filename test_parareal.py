@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Tests of Parareal.
+"""
+
+import numpy as np
+import pytest
+
+from Parareal import _duffing, _g, parareal
+from Runge_Kutta import RungeKutta_2d
+from Sweep import _construir
+
+ATRIBUTOS = {'f': _duffing, 'g': _g}
+FINO = {'clase': RungeKutta_2d, 'args': (0., 1., 0., 20., None, 1e-9), 'atributos': ATRIBUTOS}
+GRUESO = {'clase': RungeKutta_2d, 'args': (0., 1., 0., 20., None, 1.), 'atributos': ATRIBUTOS, 'pasos': 10}
+
+
+def serie():
+    rk = _construir(FINO)
+    rk.integrar()
+    return rk.estado
+
+
+@pytest.mark.parametrize('procesos', [1, 2])
+def test_converge_a_la_solucion_serie(procesos):
+    resultado = parareal(FINO, GRUESO, 0., [1., 0.], 20., 8, tol=1e-8, procesos=procesos)
+    assert resultado.iteraciones < 8
+    assert resultado.correcciones[-1] <= 1.
+    assert np.allclose(resultado.y[-1], serie(), rtol=0., atol=1e-7)
+    assert np.allclose(resultado.y_serie, serie(), rtol=0., atol=1e-12)
+    assert resultado.tiempo_serie > 0. and resultado.aceleracion > 0. and resultado.aceleracion_ideal > 0.
+
+
+def test_sin_integracion_serie():
+    resultado = parareal(FINO, GRUESO, 0., [1., 0.], 20., 8, tol=1e-8, procesos=1, serie=False, trayectoria=True)
+    assert resultado.y_serie is None
+    assert resultado.tiempo_serie > 0.
+    assert resultado.aceleracion == resultado.tiempo_serie / resultado.tiempo
+    t, y = resultado.trayectoria
+    assert t[0] == 0. and t[-1] == 20. and np.all(np.diff(t) > 0.)
+    assert np.allclose(y[-1], serie(), rtol=0., atol=1e-7)
+
+
+def test_max_iteraciones_da_la_solucion_fina():
+    #With one iteration per slice every slice is integrated by the fine propagator from an exact start.
+    resultado = parareal(FINO, GRUESO, 0., [1., 0.], 20., 4, tol=1e-30, procesos=1, serie=False)
+    assert resultado.iteraciones == 4
+    assert np.allclose(resultado.y[-1], serie(), rtol=0., atol=1e-7)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Tests of Picture_1: decimation of long series, headless and batch rendering, and live plotting.
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+import Picture_1
+from Picture_1 import LivePicture, Picture, en_vivo, lttb, minmax, render
+from Runge_Kutta import RungeKutta_nd
+
+matplotlib = pytest.importorskip('matplotlib')
+matplotlib.use('Agg')
+
+
+@pytest.fixture
+def sin_pantalla(tmp_path, monkeypatch):
+    monkeypatch.setitem(Picture_1._headless, 'directorio', str(tmp_path))
+    monkeypatch.setitem(Picture_1._headless, 'contador', 0)
+    return tmp_path
+
+
+def test_decimaciones():
+    x = np.linspace(0., 10., 100001)
+    y = np.sin(x) + (x == x[40000]) * 5.  #A peak of a single point.
+    for decimacion in (lttb, minmax):
+        indices = decimacion(x, y, 500)
+        assert len(indices) <= 502 and indices[0] == 0 and indices[-1] == len(x) - 1
+        assert np.all(np.diff(indices) > 0)
+        assert 40000 in indices
+    assert np.array_equal(lttb(x[:10], y[:10], 500), np.arange(10))
+    assert np.array_equal(minmax(x[:10], y[:10], 500), np.arange(10))
+
+
+def test_picture_decima():
+    x = np.linspace(0., 1., 50000)
+    figura = Picture({'items': [{'x': x, 'y': x ** 2, 'legend': 'a'}], 'max_points': 1000}, pyplot=False)
+    assert len(figura.ejes.lines[0].get_xdata()) == 1000
+    figura = Picture({'items': [{'x': x, 'y': x ** 2}], 'decimation': None}, pyplot=False)
+    assert len(figura.ejes.lines[0].get_xdata()) == 50000
+
+
+def test_headless(sin_pantalla):
+    for i in range(2):
+        Picture({'items': [{'x': [0, 1], 'y': [1, 0]}], 'title': 'Figura {}'.format(i)}).show_plot()
+    Picture({'items': [{'x': [0, 1], 'y': [1, 0]}], 'file': str(sin_pantalla / 'propia.png')}).show_plot()
+    assert sorted(os.listdir(str(sin_pantalla))) == ['figure_001.png', 'figure_002.png', 'propia.png']
+    assert not Picture_1._pyplot().get_fignums()
+
+
+def test_render(tmp_path):
+    archivos = render([{'items': [{'x': [0, 1], 'y': [1, 0]}]}, {'file': str(tmp_path / 'b.pdf')}],
+                      directorio=str(tmp_path), formato='svg')
+    assert archivos == [str(tmp_path / 'figure_001.svg'), str(tmp_path / 'b.pdf')]
+    assert all(os.path.getsize(archivo) > 0 for archivo in archivos)
+
+
+
+def van_der_pol(t, y): return np.array([y[1], 4. * (1. - y[0] ** 2) * y[1] - y[0]])
+
+
+def explosion(t, y): return y ** 2
+
+
+def test_live_picture(sin_pantalla):
+    figura = LivePicture({'items': [{'x': 't', 'y': 0}, {'x': 0, 'y': 1}], 'fps': 50})
+    rk = RungeKutta_nd(0., [2., 0.], 20., None, 1e-6, f=van_der_pol)
+    rec = en_vivo(rk, [figura])
+    assert figura.intervalo == 20 and not figura.cola
+    assert np.array_equal(figura.lineas[0].get_xdata(), rec.t)
+    assert np.array_equal(figura.lineas[1].get_ydata(), rec.y[:, 1])
+    assert os.listdir(str(sin_pantalla)) == ['figure_001.png']
+
+
+def test_en_vivo_con_hilo(monkeypatch):
+    #With a backend with windows the integration runs in a thread, and its exception is raised again in the caller.
+    figura = LivePicture({'items': [{'x': 't', 'y': 0}]})
+    pyplot = Picture_1._pyplot()
+    monkeypatch.setattr(Picture_1, '_pyplot', lambda: type('Ventanas', (object,), {
+        'get_backend': staticmethod(lambda: 'QtAgg'), 'show': staticmethod(lambda: None)}))
+    rk = RungeKutta_nd(0., [1.], 2., 0.1, 1e-6, f=explosion)
+    with np.errstate(over='ignore', invalid='ignore'), pytest.raises(RuntimeError, match='too small'):
+        en_vivo(rk, [figura])
+    assert len(figura.cola) > 10  #The steps until the failure, for the figure.
+    pyplot.close(figura.figura)
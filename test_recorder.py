@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Tests of Recorder.
+"""
+
+import numpy as np
+
+from Recorder import Recorder
+from Runge_Kutta import RungeKutta_2d
+
+
+def test_append_y_extend():
+    rec = Recorder(2, capacidad=1, derivadas=True)
+    rec.append(0., [1., 2.], 0.1, [3., 4.])
+    rec.extend(np.arange(1., 6.), np.ones((5, 2)), np.full(5, 0.2), np.zeros((5, 2)))
+    for i in range(6, 10):
+        rec.append(float(i), np.full(2, i), 0.3, np.full(2, -i))
+    assert len(rec) == 10 and len(rec._t) == 16
+    assert rec.t.tolist() == list(range(10))
+    assert rec.y[0].tolist() == [1., 2.] and rec.y[9].tolist() == [9., 9.]
+    assert rec.h.tolist() == [0.1] + [0.2] * 5 + [0.3] * 4
+    assert rec.dy[0].tolist() == [3., 4.] and rec.dy[-1].tolist() == [-9., -9.]
+    assert Recorder(2).dy is None
+
+
+def test_vistas():
+    rec = Recorder(1, capacidad=4)
+    rec.extend([0., 1.], [[0.], [1.]], [1., 1.])
+    t = rec.t
+    assert np.shares_memory(t, rec._t)
+    rec.append(2., [2.], 1.)
+    assert len(t) == 2 and len(rec.t) == 3
+
+
+def test_integrar():
+    #integrar records the initial point and every accepted step, as the lists of fill_lists.
+    rk = RungeKutta_2d(0., 2., 0., 10., None, 1e-6)
+    rk.f, rk.g = lambda t, x, v: 4. * (1. - x ** 2) * v - x, lambda t, x, v: v
+    rec = rk.integrar()
+    assert rec.t[0] == 0. and rec.t[-1] == 10. and np.all(np.diff(rec.t) > 0.)
+    assert rec.y[0].tolist() == [2., 0.] and rec.y[-1].tolist() == [rk.x, rk.y]
+    assert len(rec) == rk.control.aceptados + 1
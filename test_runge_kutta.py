@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Tests of the RungeKutta_nd engine and of the RungeKutta and RungeKutta_2d wrappers of the original classes. Every
+module around the engine has its own test_ file. They are run with pytest:
+python -m pytest -q
+"""
+
+import numpy as np
+import pytest
+
+from Exe_runge_kutta_1D import f as f_1d, f_analytic
+from Exe_runge_kutta_2D import f_1, g
+from Runge_Kutta import RungeKutta, RungeKutta_2d, RungeKutta_nd
+from Tableaus import TABLAS
+
+
+def explosion(t, y): return y ** 2  #y(t) = 1 / (1 - t) from y(0) = 1, infinite at t = 1.
+def raiz(t, y): return np.sqrt(1. - t) * y  #nan after t = 1.
+
+
+@pytest.mark.parametrize('tabla', sorted(TABLAS))
+def test_analitica_1d(tabla):
+    rk = RungeKutta_nd(1., [1.], 10., None, 1e-8, f=lambda t, y: np.array([f_1d(t, y[0])]), tabla=tabla)
+    rec = rk.integrar()
+    assert rk.t == 10.
+    assert np.max(np.abs(rec.y[:, 0] - f_analytic(rec.t))) < 1e-6
+
+
+@pytest.mark.parametrize('tabla', sorted(TABLAS))
+def test_sistema_lineal(tabla):
+    #y' = A y with 50 components and A symmetric negative definite: y(t) = V exp(L t) V^T y0.
+    estado = np.random.RandomState(1)
+    V = np.linalg.qr(estado.randn(50, 50))[0]
+    L = -np.logspace(-1., 1., 50)
+    A = np.dot(V * L, V.T)
+    y0 = estado.randn(50)
+    rk = RungeKutta_nd(0., y0, 2., None, 1e-9, f=lambda t, y: np.dot(A, y), tabla=tabla)
+    rec = rk.integrar()
+    exacta = np.dot(V * np.exp(np.outer(rec.t, L))[:, None, :], np.dot(V.T, y0))
+    assert rec.y.shape == (len(rec), 50)
+    assert np.max(np.abs(rec.y - exacta)) < 1e-7
+
+
+def test_wrapper_1d():
+    #The loop of the original RungeKutta, with the calcular_fi methods, takes the steps of integrar.
+    rk = RungeKutta(1, 1, 10, 0.01, 1e-6)
+    rk.f = f_1d
+    lista_x, lista_y, lista_h = [], [], []
+    rk.fill_lists(lista_x, lista_y, lista_h)
+    while rk.x < rk.xf:
+        rk.calcular_f0()
+        rk.calcular_f1()
+        rk.calcular_f2()
+        rk.calcular_f3()
+        rk.calcular_f4()
+        rk.calcular_f5()
+        assert np.array_equal([rk.f0, rk.f1, rk.f2, rk.f3, rk.f4, rk.f5], rk.k[:, 0])
+        rk.aux = True
+        rk.actualizar_paso_integracion()
+        if rk.aux:
+            rk.actualizar_posicion()
+            rk.actualizar_velocidad()
+            rk.fill_lists(lista_x, lista_y, lista_h)
+
+    nuevo = RungeKutta(1, 1, 10, 0.01, 1e-6)
+    nuevo.f = f_1d
+    rec = nuevo.integrar()
+    assert np.allclose(lista_x, rec.t, rtol=1e-12, atol=0.)
+    assert np.allclose(lista_y, rec.y[:, 0], rtol=1e-12, atol=0.)
+
+
+def test_wrapper_2d():
+    rk = RungeKutta_2d(0., 2., 0., 50., 0.5, 1e-6)
+    rk.f, rk.g = f_1, g
+    lista_t, lista_x, lista_y, lista_h = [], [], [], []
+    rk.fill_lists(lista_t, lista_x, lista_y, lista_h)
+    evaluaciones = [0]
+    f = rk.derivada
+
+    def contar(t, y):
+        evaluaciones[0] += 1
+        return f(t, y)
+    rk.derivada = contar
+    while rk.t < rk.tf:
+        for i in range(6):
+            getattr(rk, 'calcular_f{}'.format(i))()
+            getattr(rk, 'calcular_g{}'.format(i))()
+        assert np.array_equal([getattr(rk, 'g{}'.format(i)) for i in range(6)], rk.k[:, 0])
+        assert np.array_equal([getattr(rk, 'f{}'.format(i)) for i in range(6)], rk.k[:, 1])
+        rk.aux = True
+        rk.actualizar_paso_integracion()
+        if rk.aux:
+            rk.actualizar_tiempo()
+            rk.actualizar_posicion()
+            rk.actualizar_velocidad()
+            rk.fill_lists(lista_t, lista_x, lista_y, lista_h)
+
+    nuevo = RungeKutta_2d(0., 2., 0., 50., 0.5, 1e-6)
+    nuevo.f, nuevo.g = f_1, g
+    rec = nuevo.integrar()
+    assert len(lista_t) == len(rec)
+    assert np.allclose(lista_t, rec.t, rtol=1e-12, atol=0.)
+    assert np.allclose(np.column_stack((lista_x, lista_y)), rec.y, rtol=1e-9, atol=1e-12)
+    #calcular_fi and calcular_gi share the stage, so a step tried costs 6 evaluations, not 12.
+    assert evaluaciones[0] <= 6 * (len(rec) - 1 + rk.control.rechazados)
+
+
+@pytest.mark.parametrize('f, mensaje', [(raiz, 'not finite'), (explosion, 'too small')])
+def test_motor_no_finito(f, mensaje):
+    rk = RungeKutta_nd(0., [1.], 2., 0.1, 1e-6, f=f)
+    with np.errstate(invalid='ignore', over='ignore'), pytest.raises(RuntimeError, match=mensaje):
+        rk.integrar()
+    assert rk.t < 1.
@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Tests of RungeKutta_ensemble.
+"""
+
+import numpy as np
+
+from Runge_Kutta import RungeKutta_nd
+from Runge_Kutta_Ensemble import RungeKutta_ensemble
+
+
+def van_der_pol(t, y, mu): return np.stack((y[:, 1], mu * (1. - y[:, 0] ** 2) * y[:, 1] - y[:, 0]), axis=1)
+
+
+def test_igual_que_cada_miembro():
+    #Every member takes its own steps, the ones of RungeKutta_nd alone.
+    x0, mu = np.array([0.5, 2., 1., 0.01]), np.array([1., 4., 2., 3.])
+    y0 = np.stack((x0, np.zeros(4)), axis=1)
+    ens = RungeKutta_ensemble(0., y0, [20., 20., 10., 15.], None, 1e-6, f=van_der_pol, params=(mu,), tabla='DOPRI5')
+    ens.integrar()
+    assert ens.t.tolist() == [20., 20., 10., 15.]
+    for i in range(4):
+        rk = RungeKutta_nd(0., y0[i], ens.tf[i], None, 1e-6, f=lambda t, y: van_der_pol(t, y[None], mu[i])[0],
+                           tabla='DOPRI5')
+        rec = rk.integrar()
+        assert ens.pasos[i] == len(rec) - 1
+        assert ens.rechazos[i] == rk.control.rechazados
+        assert np.allclose(ens.estado[i], rk.estado, rtol=1e-10, atol=1e-12)
+
+
+def test_fallidos():
+    def f(t, y, a): return np.where(a[:, None] > 2., np.nan, -a[:, None] * y)
+
+    ens = RungeKutta_ensemble(0., np.ones((3, 1)), 2., 0.1, 1e-6, f=f, params=([1., 3., 2.],))
+    ens.integrar()
+    assert ens.fallidos.tolist() == [False, True, False]
+    assert ens.t.tolist() == [2., 0., 2.]
+    assert ens.estado[1, 0] == 1.
+    assert np.allclose(ens.estado[[0, 2], 0], np.exp([-2., -4.]), rtol=0., atol=1e-5)
+
+    def g(t, y, a): return a[:, None] * y ** 2
+
+    ens = RungeKutta_ensemble(0., np.ones((2, 1)), 2., 0.1, 1e-6, f=g, params=([0.1, 1.],))
+    with np.errstate(over='ignore', invalid='ignore'):
+        ens.integrar()
+    assert ens.fallidos.tolist() == [False, True]
+    assert ens.t[0] == 2. and ens.t[1] < 1.
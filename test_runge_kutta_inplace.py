@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Tests of RungeKutta_inplace.
+"""
+
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from Runge_Kutta import RungeKutta_nd
+from Runge_Kutta_Inplace import RungeKutta_inplace
+from Tableaus import TABLAS
+
+N = 2000
+DX = 1. / (N + 1)
+U0 = np.sin(np.pi * np.linspace(DX, 1. - DX, N))
+
+
+def calor(t, u):
+    du = np.empty_like(u)
+    du[1:-1] = u[:-2] - 2. * u[1:-1] + u[2:]
+    du[0], du[-1] = u[1] - 2. * u[0], u[-2] - 2. * u[-1]
+    return du / DX ** 2
+
+
+def calor_en_sitio(t, u, out):
+    #The arithmetic of calor in the same order.
+    np.multiply(u[1:-1], -2., out=out[1:-1])
+    out[1:-1] += u[:-2]
+    out[1:-1] += u[2:]
+    out[0], out[-1] = u[1] - 2. * u[0], u[-2] - 2. * u[-1]
+    out /= DX ** 2
+
+
+@pytest.mark.parametrize('tabla', sorted(TABLAS))
+def test_igual_que_runge_kutta_nd(tabla):
+    tf = 50. * DX ** 2
+    referencia = RungeKutta_nd(0., U0, tf, None, 1e-6, f=calor, tabla=tabla).integrar()
+    rk = RungeKutta_inplace(0., U0, tf, None, 1e-6, f=calor_en_sitio, tabla=tabla)
+    rec = rk.integrar()
+    assert np.array_equal(rec.t, referencia.t)
+    assert np.array_equal(rec.y, referencia.y)
+    assert np.array_equal(rk.estado, referencia.y[-1])
+
+
+def test_sin_reservas():
+    #After the first step, a step allocates nothing of the size of the state (N * 8 bytes).
+    rk = RungeKutta_inplace(0., U0, 1., DX ** 2 / 4, 1e-6, f=calor_en_sitio, tabla='DOPRI5')
+    rk.paso()
+    tracemalloc.start()
+    rk.paso()
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert pico < N * 8
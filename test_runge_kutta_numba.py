@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Tests of Runge_Kutta_Numba, on the compiled loop and on the pure Python fallback used without Numba.
+"""
+
+import numpy as np
+import pytest
+
+import Runge_Kutta_Numba
+from Exe_runge_kutta_1D import f as f_1d
+from Exe_runge_kutta_2D import f_1, g
+from Runge_Kutta import RungeKutta, RungeKutta_2d, RungeKutta_nd
+from Runge_Kutta_Numba import integrar_1d, integrar_2d, integrar_compilado
+from Step_Control import ControladorPI
+
+
+def van_der_pol(t, y): return np.array([y[1], 4. * (1. - y[0] ** 2) * y[1] - y[0]])
+def explosion(t, y): return y ** 2  #y(t) = 1 / (1 - t) from y(0) = 1, infinite at t = 1.
+def raiz(t, y): return np.sqrt(1. - t) * y  #nan after t = 1.
+
+
+@pytest.fixture(params=['numba', 'python'])
+def motor(request, monkeypatch):
+    if request.param == 'numba' and not Runge_Kutta_Numba.NUMBA:
+        pytest.skip('Numba is not installed')
+    monkeypatch.setattr(Runge_Kutta_Numba, 'NUMBA', request.param == 'numba')
+    return request.param
+
+
+@pytest.mark.parametrize('f, mensaje', [(raiz, 'not finite'), (explosion, 'too small')])
+def test_no_finito(motor, f, mensaje):
+    #The compiled loop fails as RungeKutta_nd does, which is the one used without Numba.
+    with np.errstate(invalid='ignore', over='ignore'), pytest.raises(RuntimeError, match=mensaje):
+        integrar_compilado(f, 0., [1.], 2., 0.1, 1e-6)
+
+
+@pytest.mark.parametrize('tabla', ['RKF45', 'DOPRI5'])
+def test_igual_que_python(motor, tabla):
+    rec = integrar_compilado(van_der_pol, 0., [2., 0.], 20., None, 1e-6, tabla=tabla)
+    referencia = RungeKutta_nd(0., [2., 0.], 20., None, 1e-6, f=van_der_pol, tabla=tabla).integrar()
+    assert len(rec) == len(referencia)
+    assert np.allclose(rec.t, referencia.t, rtol=1e-10, atol=0.)
+    assert np.allclose(rec.y, referencia.y, rtol=1e-8, atol=1e-10)
+
+
+def test_envoltorios(motor):
+    rk = RungeKutta(1., 1., 10., 0.01, 1e-6)
+    rk.f = f_1d
+    referencia = rk.integrar()
+    rec = integrar_1d(f_1d, 1., 1., 10., 0.01, 1e-6)
+    assert len(rec) == len(referencia) and np.allclose(rec.y, referencia.y, rtol=1e-9, atol=1e-12)
+
+    rk = RungeKutta_2d(0., 2., 0., 50., 0.5, 1e-6)
+    rk.f, rk.g = f_1, g
+    referencia = rk.integrar()
+    rec = integrar_2d(f_1, g, 0., 2., 0., 50., 0.5, 1e-6)
+    assert len(rec) == len(referencia) and np.allclose(rec.y, referencia.y, rtol=1e-8, atol=1e-10)
+
+
+def test_control_pi():
+    #The PI controller is not compiled: RungeKutta_nd integrates, with the same steps.
+    control = ControladorPI(1e-6, 1e-6)
+    rec = integrar_compilado(van_der_pol, 0., [2., 0.], 20., None, 1e-6, control=control)
+    referencia = RungeKutta_nd(0., [2., 0.], 20., None, 1e-6, f=van_der_pol, control=ControladorPI(1e-6, 1e-6))
+    assert np.array_equal(rec.y, referencia.integrar().y)
+    assert control.aceptados == len(rec) - 1
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Tests of the command line runner of Runner.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+import Runner
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+
+
+def escribir(ruta, datos):
+    with open(str(ruta), 'w') as fichero:
+        json.dump(datos, fichero)
+    return str(ruta)
+
+
+def van_der_pol(**extra):
+    spec = {'f': 'Exe_runge_kutta_2D:f_1', 'g': 'Exe_runge_kutta_2D:g', 'forma': 'txv', 't0': 0, 'tf': 5,
+            'y0': [2, 0]}
+    spec.update(extra)
+    return spec
+
+
+def test_informe_no_pisa_la_spec(tmp_path):
+    #Without salida the solution is p.npz and its report p.npz.json, never the spec p.json.
+    archivo = escribir(tmp_path / 'p.json', van_der_pol())
+    for vez in range(2):
+        salida = subprocess.run([sys.executable, '-m', 'Runner', archivo, '-q'], cwd=DIRECTORIO,
+                                stderr=subprocess.PIPE, universal_newlines=True)
+        assert salida.returncode == 0, salida.stderr
+    with open(archivo) as fichero:
+        assert json.load(fichero) == van_der_pol()
+    with open(str(tmp_path / 'p.npz.json')) as fichero:
+        informe = json.load(fichero)
+    assert informe['t_final'] == 5.
+    assert np.load(str(tmp_path / 'p.npz'))['t'][-1] == 5.
+
+
+@pytest.mark.parametrize('salida', ['p.json', 'otra.npz'])
+def test_no_escribe_sobre_las_specs(tmp_path, salida):
+    escribir(tmp_path / 'otra.npz.json', {})
+    archivo = escribir(tmp_path / 'p.json', van_der_pol(salida=salida))
+    spec, = Runner.leer(archivo)
+    with pytest.raises(ValueError, match='spec file'):
+        Runner.ejecutar(spec, graficas=False, protegidos=[str(tmp_path / 'otra.npz.json')])
+    assert not os.path.exists(str(tmp_path / 'otra.npz'))
+
+
+def test_control(tmp_path):
+    spec, = Runner.leer(escribir(tmp_path / 'p.json', van_der_pol(control=None, salida='p.csv')))
+    assert Runner.ejecutar(spec, graficas=False)['t_final'] == 5.
+    spec, = Runner.leer(escribir(tmp_path / 'q.json', van_der_pol(control='pid')))
+    with pytest.raises(ValueError, match='Unknown control'):
+        Runner.ejecutar(spec, graficas=False)
+
+
+def test_errores_por_spec(tmp_path):
+    buena = escribir(tmp_path / 'buena.json', van_der_pol())
+    mala = escribir(tmp_path / 'mala.json', {'problemas': [van_der_pol(), {'f': 'Exe_runge_kutta_2D:f_1'}]})
+    rota = tmp_path / 'rota.json'
+    rota.write_text(u'{')
+    salida = subprocess.run([sys.executable, '-m', 'Runner', buena, mala, str(rota), '-q'], cwd=DIRECTORIO,
+                            stderr=subprocess.PIPE, universal_newlines=True)
+    assert salida.returncode == 1
+    errores = salida.stderr.splitlines()
+    assert len(errores) == 2
+    assert 'mala_1: ValueError: The spec has no t0, y0, tf' in errores[0]
+    assert 'rota.json: JSONDecodeError' in errores[1]
+    assert os.path.exists(str(tmp_path / 'buena.npz')) and os.path.exists(str(tmp_path / 'mala_0.npz'))
+
+
+def test_importa_matplotlib_tarde():
+    #The runner and the modules of the problems do not import matplotlib until a figure is made.
+    codigo = 'import sys, Runner, Exe_runge_kutta_2D, Picture_1; assert "matplotlib" not in sys.modules'
+    subprocess.check_call([sys.executable, '-c', codigo], cwd=DIRECTORIO)
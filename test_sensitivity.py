@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Tests of Sensitivity: forward sensitivities and adjoint gradients of the van der Pol problem of its example.
+"""
+
+import numpy as np
+import pytest
+
+from Runge_Kutta import RungeKutta_nd
+from Sensitivity import RungeKutta_sensibilidad, adjunto
+
+
+def f(t, y, p): return np.array([y[1], p[0] * (1. - y[0] ** 2) * y[1] - y[0]])
+def jac(t, y, p): return np.array([[0., 1.], [-2. * p[0] * y[0] * y[1] - 1., p[0] * (1. - y[0] ** 2)]])
+def jac_p(t, y, p): return np.array([[0.], [(1. - y[0] ** 2) * y[1]]])
+
+
+T_DATOS = np.linspace(0.5, 20., 40)
+DATOS = (RungeKutta_nd(0., [2., 0.], 20., None, 1e-10, f=lambda t, y: f(t, y, [4.])).integrar(t_eval=T_DATOS).y[:, 0] +
+         0.01 * np.random.RandomState(0).randn(len(T_DATOS)))
+MU = 3.5
+
+
+def dg(i, y): return np.array([2. * (y[0] - DATOS[i]), 0.])
+
+
+def gradiente_directo(error, **jacobianos):
+    rk = RungeKutta_sensibilidad(0., [2., 0.], 20., None, error, f=f, p=[MU], **jacobianos)
+    y, S = rk.separar(rk.integrar(t_eval=T_DATOS).y)
+    return 2. * np.dot(y[:, 0] - DATOS, S[:, 0, 0])
+
+
+@pytest.fixture(scope='module')
+def referencia():
+    return gradiente_directo(1e-12, jac=jac, jac_p=jac_p)
+
+
+@pytest.mark.parametrize('jacobianos', [{'jac': jac, 'jac_p': jac_p}, {'jac': jac}, {'jac_p': jac_p}, {}])
+def test_sensibilidades_directas(referencia, jacobianos):
+    #With finite difference Jacobians or without, as the differences of two solves with a tight tolerance.
+    assert gradiente_directo(1e-8, **jacobianos) == pytest.approx(referencia, abs=1e-3)
+
+    def suma(mu):
+        rec = RungeKutta_nd(0., [2., 0.], 20., None, 1e-12, f=lambda t, y: f(t, y, [mu])).integrar(t_eval=T_DATOS)
+        return np.sum((rec.y[:, 0] - DATOS) ** 2)
+    delta = 1e-5
+    assert (suma(MU + delta) - suma(MU - delta)) / (2. * delta) == pytest.approx(referencia, rel=1e-5)
+
+
+@pytest.mark.parametrize('tabla', ['RKF45', 'DOPRI5'])
+def test_adjunto(referencia, tabla):
+    gradiente, adelante = adjunto(f, 0., [2., 0.], 20., [MU], T_DATOS, dg, jac=jac, jac_p=jac_p, error=1e-8,
+                                  tabla=tabla)
+    assert adelante.t == 20.
+    #At least as accurate as the forward sensitivities with the same tolerance.
+    assert abs(gradiente[0] - referencia) <= abs(gradiente_directo(1e-8, jac=jac, jac_p=jac_p) - referencia)
+    sin_jacobianos, adelante = adjunto(f, 0., [2., 0.], 20., [MU], T_DATOS, dg, error=1e-8, tabla=tabla)
+    assert sin_jacobianos[0] == pytest.approx(gradiente[0], abs=1e-4)
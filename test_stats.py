@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Tests of the statistics of an integration, Stats.Estadisticas.
+"""
+
+import numpy as np
+
+from Runge_Kutta import RungeKutta_nd
+from Stiff import Rosenbrock_nd
+
+
+def van_der_pol(t, y): return np.array([y[1], 4. * (1. - y[0] ** 2) * y[1] - y[0]])
+
+
+def test_cuenta_los_pasos_y_las_evaluaciones():
+    llamadas = [0]
+
+    def f(t, y):
+        llamadas[0] += 1
+        return van_der_pol(t, y)
+
+    rk = RungeKutta_nd(0., [2., 0.], 20., None, 1e-6, f=f)
+    rec = rk.integrar(estadisticas=True)
+    e = rec.estadisticas
+    assert e.nfev == llamadas[0]
+    assert e.aceptados == len(rec) - 1
+    assert e.rechazados == rk.control.rechazados
+    assert e.h_min <= e.h_medio <= e.h_max
+    assert np.isclose(e.h_medio, 20. / e.aceptados)
+    assert 0. <= e.tiempo_derivada <= e.tiempo_total
+    assert 'derivada' not in rk.__dict__
+
+
+def test_devuelve_la_derivada_propia():
+    #A derivada set on the object before integrar is measured and given back, not deleted.
+    rk = RungeKutta_nd(0., [2., 0.], 5., None, 1e-6, f=van_der_pol)
+    propias = [0]
+
+    def derivada(t, y):
+        propias[0] += 1
+        return van_der_pol(t, y)
+    rk.derivada = derivada
+    rec = rk.integrar(estadisticas=True)
+    assert rk.__dict__['derivada'] is derivada
+    assert rec.estadisticas.nfev == propias[0] > 0
+    rk.tf = 6.
+    rk.integrar()
+    assert rk.derivada is derivada
+
+
+def test_jacobiano():
+    rk = Rosenbrock_nd(0., [2., 0.], 5., None, 1e-6, f=van_der_pol)
+    jacobiano = rk.jacobiano
+    rec = rk.integrar(estadisticas=True)
+    assert rec.estadisticas.njev > 0
+    assert rec.estadisticas.tiempo_jacobiano > 0.
+    assert 'jacobiano' not in rk.__dict__ and rk.jacobiano == jacobiano
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Tests of the step controllers of Step_Control and of how RungeKutta_nd clips its steps to tf.
+"""
+
+import numpy as np
+import pytest
+
+from Runge_Kutta import RungeKutta_nd
+from Runge_Kutta_Ensemble import RungeKutta_ensemble
+from Runge_Kutta_Numba import integrar_compilado
+from Step_Control import Controlador, ControladorPI, paso_minimo
+
+
+def decaimiento(t, y): return -y
+def van_der_pol(t, y): return np.array([y[1], 4. * (1. - y[0] ** 2) * y[1] - y[0]])
+
+
+def test_paso_dado_mayor_que_el_intervalo():
+    rec = RungeKutta_nd(0., [1.], 0.3, 0.5, 1e-6, f=decaimiento).integrar()
+    assert rec.t[-1] == 0.3 and np.all(rec.t <= 0.3)
+    assert integrar_compilado(decaimiento, 0., [1.], 0.3, 0.5, 1e-6).t[-1] == 0.3
+    ens = RungeKutta_ensemble(0., np.ones((2, 1)), 0.3, 0.5, 1e-6, f=lambda t, y: -y)
+    ens.integrar()
+    assert ens.t.tolist() == [0.3, 0.3]
+
+
+@pytest.mark.parametrize('h, t', [(0.3, [0., 0.3, 0.6, 0.9, 1.]), (0.1, np.linspace(0., 1., 11))])
+def test_paso_fijo_termina_en_tf(h, t):
+    #The last step is shortened to end at tf, or stretched by the rounding of the sum of the steps.
+    rk = RungeKutta_nd(0., [1.], 1., h, 1e-6, f=decaimiento)
+    rec = rk.integrar(adaptativo=False)
+    assert rec.t[-1] == 1. and len(rec) == len(t)
+    assert np.allclose(rec.t, t, rtol=0., atol=1e-14)
+    assert rk.h == h
+    assert rec.y[-1, 0] == pytest.approx(np.exp(-1.), abs=1e-5)
+
+
+@pytest.mark.parametrize('control', [Controlador(1e-8, 1e-8), ControladorPI(1e-8, 1e-8)])
+def test_controladores(control):
+    rk = RungeKutta_nd(0., [2., 0.], 20., None, 1e-8, f=van_der_pol, control=control)
+    rec = rk.integrar()
+    referencia = RungeKutta_nd(0., [2., 0.], 20., None, 1e-12, f=van_der_pol).integrar()
+    assert rec.t[-1] == 20.
+    assert np.max(np.abs(rec.y[-1] - referencia.y[-1])) < 1e-4
+    assert control.aceptados == len(rec) - 1
+
+
+def test_proponer():
+    control = Controlador(1e-6, 1e-6)
+    aceptado, h = control.proponer(0.1, 4., 5)
+    assert not aceptado and h < 0.1
+    #After a rejected step the step does not grow, even if the next one is accepted with a tiny error.
+    aceptado, h = control.proponer(h, 1e-6, 5)
+    assert aceptado and h <= 0.1 * 0.9 * 4. ** -0.2
+    aceptado, h = control.proponer(0.1, np.nan, 5)
+    assert not aceptado and np.isnan(h)
+    aceptados, h = control.proponer(np.full(3, 0.1), np.array([0.5, 2., np.inf]), 5, rechazado=np.zeros(3, bool))
+    assert aceptados.tolist() == [True, False, False]
+    assert h[0] > 0.1 and h[1] < 0.1 and np.isnan(h[2])
+    assert (control.aceptados, control.rechazados) == (2, 4)
+    assert paso_minimo(1e6) > 1e-10 > paso_minimo(1.)
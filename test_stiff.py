@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Tests of Stiff: Rosenbrock_nd and the automatic switch of RungeKutta_auto.
+"""
+
+import numpy as np
+import pytest
+
+from Runge_Kutta import RungeKutta_nd
+from Stiff import Rosenbrock_nd, RungeKutta_auto, jacobiano_fd
+
+
+def robertson(t, y):
+    return np.array([-0.04 * y[0] + 1e4 * y[1] * y[2], 0.04 * y[0] - 1e4 * y[1] * y[2] - 3e7 * y[1] ** 2,
+                     3e7 * y[1] ** 2])
+
+
+def jac_robertson(t, y):
+    return np.array([[-0.04, 1e4 * y[2], 1e4 * y[1]], [0.04, -1e4 * y[2] - 6e7 * y[1], -1e4 * y[1]],
+                     [0., 6e7 * y[1], 0.]])
+
+
+def van_der_pol(t, y): return np.array([y[1], 1000. * (1. - y[0] ** 2) * y[1] - y[0]])
+
+
+def test_lineal():
+    #y' = -1000 (y - cos t) - sin t, y = cos t from y(0) = 1: the step follows cos t, not the scale 1e-3 of the decay,
+    #while the explicit steps stay below the stability limit.
+    def f(t, y): return -1000. * (y - np.cos(t)) - np.sin(t)
+    rk = Rosenbrock_nd(0., [1.], 10., None, 1e-4, f=f)
+    rec = rk.integrar(dense_output=True)
+    assert rk.t == 10.
+    assert 2. * len(rec) < len(RungeKutta_nd(0., [1.], 10., None, 1e-4, f=f).integrar())
+    assert np.max(np.abs(rec.y[:, 0] - np.cos(rec.t))) < 1e-3
+    t = np.linspace(0., 10., 501)
+    assert np.max(np.abs(rk.sol(t)[:, 0] - np.cos(t))) < 1e-3
+
+
+@pytest.mark.parametrize('jac', [jac_robertson, None])
+def test_robertson(jac):
+    rk = Rosenbrock_nd(0., [1., 0., 0.], 1e5, None, 1e-6, f=robertson, jac=jac, autonomo=True)
+    rec = rk.integrar()
+    assert rk.t == 1e5 and len(rec) < 500
+    assert np.allclose(rec.y.sum(axis=1), 1., rtol=0., atol=1e-6)
+    assert rk.estado[0] == pytest.approx(0.0179, abs=1e-3)
+
+
+def test_cambio_de_metodo():
+    rk = RungeKutta_auto(0., [2., 0.], 3000., None, 1e-6, f=van_der_pol)
+    rec = rk.integrar()
+    referencia = Rosenbrock_nd(0., [2., 0.], 3000., None, 1e-8, f=van_der_pol).integrar()
+    assert rk.t == 3000. and len(rk.cambios) >= 2
+    assert abs(rec.y[-1, 0] - referencia.y[-1, 0]) < 1e-3
+    #Explicit at the start, while the problem is not stiff yet, and Rosenbrock on the slow branch: fewer steps over
+    #the whole interval than Fehlberg alone over its first hundredth.
+    assert rk.cambios[0] > 0.
+    assert len(rec) < len(RungeKutta_nd(0., [2., 0.], 30., None, 1e-6, f=van_der_pol).integrar())
+
+
+def test_jacobiano_fd():
+    A = np.array([[-2., 1., 0.], [1e3, -1e3, 5.]])
+    y = np.array([0.5, -3., 2e3])
+    assert np.allclose(jacobiano_fd(lambda t, y: np.dot(A, y), 0., y, np.dot(A, y)), A, rtol=1e-6, atol=1e-6)
+    with pytest.raises(ValueError, match='no stage at t \\+ h'):
+        RungeKutta_auto(0., [1.], 1., None, 1e-6, f=lambda t, y: -y, tabla='BS32')
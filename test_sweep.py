@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Tests of Sweep.barrido.
+"""
+
+import functools
+
+import numpy as np
+import pytest
+
+from Runge_Kutta import RungeKutta_2d
+from Sweep import _g, _van_der_pol, barrido
+
+
+def decaimiento(t, y, a): return -a * y
+def falla(t, y): raise ArithmeticError('f failed')
+
+
+def test_barrido():
+    specs = [{'clase': RungeKutta_2d, 'args': (0., 2., 0., 10., None, 1e-6),
+              'atributos': {'f': functools.partial(_van_der_pol, mu=mu), 'g': _g}} for mu in (1., 2., 3.)]
+    specs.append({'args': (0., [1., 2.], 10., None, 1e-8), 'kwargs': {'f': functools.partial(decaimiento, a=0.5)}})
+    specs.append({'args': (0., [1., 2.], 10., None, 1e-8), 'atributos': {'f': falla}})
+    t_eval = np.linspace(0., 10., 21)
+    hechas = []
+    y, fallos = barrido(specs, t_eval, procesos=2, progreso=lambda hechas_, total, n: hechas.append(hechas_))
+    assert y.shape == (5, 21, 2) and hechas == [1, 2, 3, 4, 5]
+    assert list(fallos) == [4] and 'f failed' in fallos[4]
+    assert np.all(np.isnan(y[4]))
+    for i, mu in enumerate((1., 2., 3.)):
+        rk = RungeKutta_2d(0., 2., 0., 10., None, 1e-6)
+        rk.f, rk.g = functools.partial(_van_der_pol, mu=mu), _g
+        assert np.array_equal(y[i], rk.integrar(t_eval=t_eval).y)
+    assert np.allclose(y[3], np.exp(-0.5 * t_eval)[:, None] * [1., 2.], rtol=1e-5, atol=0.)
+
+
+def test_sin_specs():
+    with pytest.raises(ValueError, match='at least one spec'):
+        barrido([], np.linspace(0., 1., 5))
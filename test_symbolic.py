@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Tests of Symbolic.Sistema. They are skipped without SymPy.
+"""
+
+import numpy as np
+import pytest
+
+pytest.importorskip('sympy')
+
+from Exe_runge_kutta_2D import f_1, g
+from Runge_Kutta_Ensemble import RungeKutta_ensemble
+from Stiff import jacobiano_fd
+from Symbolic import Sistema
+
+
+def van_der_pol(t, y): return np.array([g(t, y[0], y[1]), f_1(t, y[0], y[1])])
+
+
+@pytest.mark.parametrize('compilar', [False, True])
+def test_van_der_pol(compilar):
+    sis = Sistema(['v', 'mu * (1 - x**2) * v - x'], 'x v', parametros={'mu': 4.}, compilar=compilar)
+    estados = np.random.RandomState(0).randn(5, 2)
+    for y in estados:
+        assert np.allclose(sis.f(0.3, y), van_der_pol(0.3, y), rtol=1e-14)
+        assert np.allclose(sis.jac(0.3, y), jacobiano_fd(van_der_pol, 0.3, y, van_der_pol(0.3, y)), rtol=1e-6,
+                           atol=1e-6)
+        out = np.empty(2)
+        sis.f_en_sitio(0.3, y, out)
+        assert np.array_equal(out, sis.f(0.3, y))
+    #A block of states gives one row per state.
+    assert np.allclose(sis.f(0.3, estados), [van_der_pol(0.3, y) for y in estados], rtol=1e-14)
+    assert np.allclose(sis.jac(0.3, estados), [sis.jac(0.3, y) for y in estados], rtol=1e-14)
+
+
+def test_argumentos_y_tiempo():
+    sis = Sistema(['-a * y + sin(t)'], 'y', argumentos='a')
+    assert sis.f(1., np.array([2.]), 3.)[0] == pytest.approx(-6. + np.sin(1.))
+    ens = RungeKutta_ensemble(0., np.ones((3, 1)), 1., None, 1e-8, f=sis.f, params=([1., 2., 3.],))
+    ens.integrar()
+    for i, a in enumerate((1., 2., 3.)):
+        exacta = (np.exp(-a) * (a ** 2 + 2.) + a * np.sin(1.) - np.cos(1.)) / (a ** 2 + 1.)
+        assert ens.estado[i, 0] == pytest.approx(exacta, rel=1e-6)
+
+
+def test_errores():
+    with pytest.raises(ValueError, match='2 expressions for 1 variables'):
+        Sistema(['x', 'x'], 'x')
@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Tests of Symplectic.Simplectico.
+"""
+
+import numpy as np
+import pytest
+
+from Symplectic import ORDENES, Simplectico
+
+
+def muelle(q): return -q
+
+
+@pytest.mark.parametrize('metodo', sorted(ORDENES))
+def test_orden(metodo):
+    #Harmonic oscillator, q = cos(t): the error at t = 5 falls as h^orden.
+    errores = []
+    for h in (0.1, 0.05):
+        sim = Simplectico(0., 1., 0., 5., h, muelle, metodo=metodo)
+        sim.integrar()
+        errores.append(np.hypot(sim.q - np.cos(5.), sim.p + np.sin(5.)))
+    assert np.log2(errores[0] / errores[1]) == pytest.approx(ORDENES[metodo], abs=0.25)
+
+
+def test_energia_acotada():
+    #Kepler orbit with eccentricity 0.6: the energy error does not grow over 100 periods.
+    def fuerza(q): return -q / np.sum(q ** 2, axis=-1, keepdims=True) ** 1.5
+    def energia(q, p): return 0.5 * np.sum(p ** 2, axis=-1) - 1. / np.sqrt(np.sum(q ** 2, axis=-1))
+
+    q0, p0 = np.array([0.4, 0.]), np.array([0., 2.])
+    sim = Simplectico(0., q0, p0, 200. * np.pi, 0.01, fuerza, metodo='yoshida4')
+    q, p = sim.separar(sim.integrar(cada=10).y)
+    error = np.abs(energia(q, p) - energia(q0, p0))
+    assert np.max(error) < 1e-5
+    assert np.max(error[len(error) // 2:]) < 2. * np.max(error[:len(error) // 2])
+
+
+def test_pasos_y_formas():
+    evaluaciones = [0]
+
+    def contar(q):
+        evaluaciones[0] += 1
+        return muelle(q)
+    #Particles of shape (3, 2). tf is not a multiple of h: the last step is shortened and the states end at tf.
+    q0 = np.arange(6.).reshape(3, 2)
+    sim = Simplectico(0., q0, np.zeros((3, 2)), 1., 0.3, contar)
+    rec = sim.integrar()
+    assert np.allclose(rec.t, [0., 0.3, 0.6, 0.9, 1.], rtol=0., atol=1e-15) and rec.t[-1] == 1.
+    q, p = sim.separar(rec.y)
+    assert q.shape == (5, 3, 2) and np.array_equal(q[0], q0)
+    assert np.allclose(q[-1], q0 * np.cos(1.), rtol=1e-2, atol=0.)
+    #Velocity Verlet merges the kicks of consecutive steps: one force per step and the one of the start.
+    assert evaluaciones[0] == sim.pasos + 1 == 5
+    with pytest.raises(ValueError, match='Unknown method'):
+        Simplectico(0., 1., 0., 1., 0.1, muelle, metodo='rk4')
@@ -0,0 +1,40 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Tests of the registry of Butcher tableaus.
+"""
+
+import math
+
+import numpy as np
+import pytest
+
+import Tableaus
+from Runge_Kutta import RungeKutta_nd
+from Tableaus import TABLAS, ButcherTableau, obtener, registrar
+
+
+@pytest.mark.parametrize('nombre', sorted(TABLAS))
+def test_condiciones(nombre):
+    tabla = obtener(nombre)
+    assert np.allclose(tabla.A.sum(axis=1), tabla.C, rtol=0., atol=1e-14)
+    assert tabla.B.sum() == pytest.approx(1., abs=1e-14) and tabla.E.sum() == pytest.approx(0., abs=1e-14)
+    #On y' = y the stability function is the Taylor series of exp(z) up to the order of the method.
+    cota = 2. * 0.2 ** (tabla.orden + 1) / math.factorial(tabla.orden + 1)
+    for z in (-0.2, 0.2):
+        assert abs(tabla.estabilidad(z) - np.exp(z)) < cota
+    assert tabla.fsal == (nombre != 'RKF45')
+
+
+def test_registrar(monkeypatch):
+    #Heun-Euler 2(1), FSAL-free, without continuous extension: the dense output is the cubic Hermite one.
+    monkeypatch.setattr(Tableaus, 'TABLAS', dict(TABLAS))
+    heun = registrar(ButcherTableau('HEUN21', [[0., 0.], [1., 0.]], [0.5, 0.5], [0., 1.], [-0.5, 0.5], 2, 1))
+    assert obtener('HEUN21') is heun and obtener(heun) is heun
+    rk = RungeKutta_nd(0., [1.], 2., None, 1e-6, f=lambda t, y: -y, tabla='HEUN21')
+    rec = rk.integrar(dense_output=True)
+    assert rk.t == 2. and np.max(np.abs(rec.y[:, 0] - np.exp(-rec.t))) < 1e-4
+    assert rk.sol(np.array([1.]))[0, 0] == pytest.approx(np.exp(-1.), abs=1e-4)
+    with pytest.raises(ValueError, match='Unknown tableau RK4'):
+        obtener('RK4')